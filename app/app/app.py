@@ -12,8 +12,11 @@ from app.app.errors.http_error import http_error_handler, validation_error_handl
 from app.app.errors.user_info_error import get_user_info_exception_handler, UserInfoException
 from app.app.routes import register_routers as register_routers
 from app.config.environment import Settings
-from app.infrastructure.database.db import create_db_and_tables, init_db
-from app.infrastructure.event_processor.process_manager import start_process_worker
+from app.infrastructure.database.db import create_db_and_tables, init_db, dispose_engines
+from app.infrastructure.event_processor.process_manager import migrate_trigger_event_table, start_process_worker, stop_process_worker
+from app.infrastructure.event_processor.ingestion_buffer import start_trigger_event_buffer, stop_trigger_event_buffer
+from app.infrastructure.LLM.http_clients import close_provider_clients
+from app.infrastructure.LLM.job_queue import start_llm_job_queue, stop_llm_job_queue
 
 class TemplateMiddleware(BaseHTTPMiddleware):
 
@@ -47,7 +50,15 @@ def init_database(app: FastAPI) -> FastAPI:
 def register_events(app: FastAPI) -> FastAPI:
     # TODO add events if applicable
     # app.on_event("startup")(create_db_and_tables) # This event can be removed if not seeding a database
+    app.on_event("startup")(migrate_trigger_event_table)
     app.on_event("startup")(start_process_worker)
+    app.on_event("startup")(start_trigger_event_buffer)
+    app.on_event("startup")(start_llm_job_queue)
+    app.on_event("shutdown")(stop_llm_job_queue)
+    app.on_event("shutdown")(stop_trigger_event_buffer)
+    app.on_event("shutdown")(stop_process_worker)
+    app.on_event("shutdown")(close_provider_clients)
+    app.on_event("shutdown")(dispose_engines)
 
     return app
 
@@ -0,0 +1,7 @@
+class BufferFullError(Exception):
+    def __init__(self, message: str, status_code: int = 503) -> None:
+        self.message = message
+        self.status_code = status_code
+
+    def __str__(self):
+        return f"Error: {self.message}"
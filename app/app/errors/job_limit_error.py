@@ -0,0 +1,7 @@
+class JobLimitError(Exception):
+    def __init__(self, message: str, status_code: int = 429) -> None:
+        self.message = message
+        self.status_code = status_code
+
+    def __str__(self):
+        return f"Error: {self.message}"
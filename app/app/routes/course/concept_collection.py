@@ -206,18 +206,18 @@ async def get_collection_concepts(
             message=str(e)
         )
 
-@router.delete("", name="Concept-to-Collection:remove-concept-from-collection")
+@router.delete("", name="Concept-to-Collection:remove-concept-from-collection", response_model=Union[int, ErrorResponse])
 async def remove_collection_concept(
     request: Request, 
     response: Response,
     junctions: List[ConceptToCollectionDelete],
     c_to_cc_service: CToCcServiceProtocol = Depends(ConceptService)
-    ) -> None:
+    ) -> Union[int, ErrorResponse]:
     """
-    Removes a concept from a module
+    Removes concepts from modules in a single transaction, returns the number of junctions removed
     """
     try:
-        await c_to_cc_service.delete_module_junctions(junctions=junctions)
+        return await c_to_cc_service.delete_module_junctions(junctions=junctions)
 
     except DBError as e:
         response.status_code = e.status_code
@@ -111,8 +111,8 @@ async def get_course_domain(
         concept_read_list = [ConceptRead(name=item.name) for item in concepts.values()]
         junctions = await concept_service.get_concept_junctions(concepts=concept_read_list)
         # TODO: modify concept_service.get_concept_junctions to have an option for excluding edges where the source and the target are not contained in the concept list
-        concept_read_list = [item.name for item in concept_read_list]
-        junctions = [item for item in junctions if item.concept_name in concept_read_list and item.prereq_name in concept_read_list]
+        concept_names = set(concepts.keys())
+        junctions = [item for item in junctions if item.concept_name in concept_names and item.prereq_name in concept_names]
 
     except DBError as e:
         return CourseDomain(collections=collections)
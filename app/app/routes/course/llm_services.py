@@ -94,31 +94,33 @@ async def generate_module_concepts(
         
         name_filterable_concepts = {item.get("name"): item for item in results if item.get("name")}
 
-        exists_check = await concept_service.check_if_concepts_exist(concept_names=list(name_filterable_concepts.keys()))
+        # Fuzzy matching so near duplicates ("For Loops" / "For-loops") are attached to the existing concept instead of creating a new one
+        exists_check = await concept_service.check_if_concepts_exist_fuzzy(concept_names=list(name_filterable_concepts.keys()))
         module_id = extra_params.get("module_id")
 
-        matched_concepts = exists_check.get("matched_concepts")
-        unmatched_concepts = exists_check.get("unmatched_concepts")
+        matched_concepts = {item.candidate: item.match for item in exists_check if item.match is not None}
+        unmatched_concepts = [item.candidate for item in exists_check if item.match is None]
 
         validation_request_list = []
 
         if matched_concepts:
-            for concept in matched_concepts:
+            for candidate, concept in matched_concepts.items():
                 try:
                     #Validates datstructure conforms to standard ConceptCreate format
-                    concept_full = ConceptCreate(**name_filterable_concepts[concept])
+                    concept_full = ConceptCreate(**name_filterable_concepts[candidate])
 
                     validation_request_list.append(ChangeRequestCreateClient(
                         entity_id=concept,
                         is_from_llm=True,
                         post_approval_procedure={'type': 'junction', 'target_table': 'module', 'target_id': module_id},
                         entity_type="concept",
-                        entity_data=concept_full.model_dump(),
+                        # the junction is made on entity_data's name, so it has to be the existing concept's
+                        entity_data={**concept_full.model_dump(), "name": concept},
                         validation_status=ValidationStatusEnum.draft
                     ))
                 
                 except ValidationError as e:
-                    logger.warn(msg=f"Validation request data format invalid, expected concept object, received: {name_filterable_concepts[concept]}")
+                    logger.warn(msg=f"Validation request data format invalid, expected concept object, received: {name_filterable_concepts[candidate]}")
                     continue
 
                 if len(validation_request_list) > 50:
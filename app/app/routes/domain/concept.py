@@ -1,16 +1,19 @@
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Optional, AsyncIterator
 
-from fastapi import APIRouter, Depends, Response, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Response, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.app.errors.db_error import DBError
 from app.domain.models.errors import ErrorResponse
 
 from app.domain.models.forms import ListOfCollectionIds, list_collection_ids
 
-from app.domain.models.concept import ConceptCreate, ConceptCreateBulkRead, ConceptRead, ConceptFilter, ConceptReadVerbose, ConceptReadPreformatted
+from app.domain.models.concept import ConceptCreate, ConceptCreateBulkRead, ConceptRead, ConceptFilter, ConceptReadVerbose, ConceptReadPreformatted, ConceptPage
 from app.domain.protocols.services.concept import ConceptService as ConceptServiceProtocol
 from app.domain.services.concept import ConceptService
+from app.domain.services.concept_graph import get_concept_graph
+from app.infrastructure.database.db import get_async_db
+from app.infrastructure.database.repositories.concept import ConceptRepository, ConceptToModuleRepository, ConceptToConceptRepository
 
 from fastapi_lti1p3 import enforce_auth
 
@@ -104,6 +107,62 @@ async def get_concept_filtered(
         )
 
 
+@router.get("/filter/page", name="Concept:get-concept-page-by-filter", response_model=Union[ConceptPage, ErrorResponse])
+async def get_concept_page_filtered(
+    request: Request, 
+    response: Response,
+    filter: ConceptFilter = Depends(ConceptFilter),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    concept_service: ConceptServiceProtocol = Depends(ConceptService)
+    ) -> Union[ConceptPage, ErrorResponse]:
+    """
+    Returns one page of the concepts matching the supplied filters, ordered by name
+    """
+    try:
+        return await concept_service.get_concept_page(filters=filter, after=after, limit=limit, read_mode="verbose")
+    
+    except DBError as e:
+        response.status_code = e.status_code
+        return ErrorResponse(
+            code=e.status_code,
+            type=e.type,
+            message=str(e)
+        )
+
+
+async def _stream_concepts_ndjson(filter: ConceptFilter) -> AsyncIterator[str]:
+    # Request scoped sessions are closed before a StreamingResponse body is sent, so the stream owns its session.
+    db = get_async_db()
+    try:
+        concept_service = ConceptService(
+            concept_repo=ConceptRepository(db=db),
+            c_to_m_repo=ConceptToModuleRepository(db=db),
+            c_to_c_repo=ConceptToConceptRepository(db=db),
+            concept_graph=get_concept_graph(),
+        )
+        async for concept in concept_service.stream_concepts(filters=filter, read_mode="verbose"):
+            yield concept.model_dump_json() + "\n"
+
+    except DBError:
+        # The status line has already been sent, the truncated body is the only signal left to the client.
+        pass
+
+    finally:
+        await db.close()
+
+
+@router.get("/filter/stream", name="Concept:stream-concepts-by-filter")
+async def stream_concepts_filtered(
+    request: Request,
+    filter: ConceptFilter = Depends(ConceptFilter),
+    ) -> StreamingResponse:
+    """
+    Streams all concepts matching the supplied filters as newline delimited JSON, ordered by name
+    """
+    return StreamingResponse(_stream_concepts_ndjson(filter=filter), media_type="application/x-ndjson")
+
+
 # @router.get("/from_modules", name="Concept:get-all-concepts-of-modules", response_model=Dict[str, ConceptReadPreformatted])
 # async def get_concepts_from_modules(
 #     request: Request,
@@ -6,24 +6,29 @@ from app.domain.models.errors import ErrorResponse
 
 from app.app.errors.db_error import DBError
 
-from app.domain.models.concept import ConceptToConceptCreate, ConceptRead, ConceptToConceptDelete, ConceptBulkRead, ConceptToConceptRead
+from app.domain.models.concept import ConceptToConceptCreate, ConceptRead, ConceptToConceptDelete, ConceptBulkRead, ConceptToConceptRead, ConceptToConceptBulkRead, ConceptToConceptTreeRead
 from app.domain.protocols.services.concept import ConceptToConceptService as CToCProtocol
 from app.domain.services.concept import ConceptService
 
 from app.domain.models.forms import list_concept_names
 
+from app.config.environment import get_settings
+
 
 router = APIRouter()
 
-@router.post("", name="ConceptToConcept:create-concept-to-concept-junction", response_model=Union[List[ConceptToConceptRead], ErrorResponse])
+_SETTINGS = get_settings()
+
+@router.post("", name="ConceptToConcept:create-concept-to-concept-junction", response_model=Union[ConceptToConceptBulkRead, ErrorResponse])
 async def create_cc_junction(
     request: Request, 
     response: Response,
     junctions: List[ConceptToConceptCreate],
     c_to_c_service: CToCProtocol = Depends(ConceptService)
-    ) -> Union[List[ConceptToConceptRead], ErrorResponse]:
+    ) -> Union[ConceptToConceptBulkRead, ErrorResponse]:
     """
-    Creates new ConceptToConcept junctions
+    Creates new ConceptToConcept junctions. Junctions that already exist or reference a missing concept are
+    returned under failed.
     """
     try:
         return await c_to_c_service.bulk_create_concept_junctions(junctions=junctions)
@@ -64,6 +69,40 @@ async def get_one_junction_set(
         )
 
 
+@router.get("/tree/{direction}/{concept_name}", name="ConceptToConcept:get-tree", response_model=Union[List[ConceptToConceptTreeRead], ErrorResponse])
+async def get_junction_tree(
+    request: Request, 
+    response: Response,
+    concept_name: str,
+    direction: Literal["up", "down"] = "down",
+    max_depth: int = Query(default=3, ge=1, le=_SETTINGS.CONCEPT_TREE_MAX_DEPTH),
+    c_to_c_service: CToCProtocol = Depends(ConceptService)
+    ) -> Union[List[ConceptToConceptTreeRead], ErrorResponse]:
+    """
+    Returns the full concept-to-concept tree of a concept up to max_depth levels in one request.
+    | Input | Required | Type | Description |
+    | :---- | :------- | :--- | :---------- |
+    | direction | True | str["up", "down"] | "down" returns the prerequisite tree of the supplied concept, "up" returns the tree of concepts depending on it |
+    | concept_name | True | str | The string name of a concept |
+    | max_depth | False | int | Number of levels to return, defaults to 3 |
+
+    """
+    try:
+        return await c_to_c_service.get_concept_junction_tree(
+            concepts=[ConceptRead(name=concept_name)], 
+            junction_direction=direction, 
+            max_depth=max_depth
+            )
+
+    except DBError as e:
+        response.status_code = e.status_code
+        return ErrorResponse(
+            code=e.status_code,
+            type=e.type,
+            message=str(e)
+        )
+
+
 @router.get("/many", name="ConceptToConcept:get-all-sets", response_model=Union[Dict[str, Dict[str, str]], ErrorResponse])
 async def get_many_junction_sets(
     request: Request, 
@@ -88,16 +127,15 @@ async def get_many_junction_sets(
         )
 
 
-#TODO: add return for success or failure to delete
-@router.delete("", name="ConceptToConcept:delete-concept-to-concept-junctions")
+@router.delete("", name="ConceptToConcept:delete-concept-to-concept-junctions", response_model=Union[int, ErrorResponse])
 async def delete_concept_junction(
     request: Request, 
     response: Response,
     junctions: List[ConceptToConceptDelete],
     c_to_c_service: CToCProtocol = Depends(ConceptService)
-    ) -> None:
+    ) -> Union[int, ErrorResponse]:
     """
-    Deletes one or many ConceptToConcept junctions
+    Deletes one or many ConceptToConcept junctions in a single transaction, returns the number of junctions deleted
     """
     try:
         return await c_to_c_service.delete_junctions(junctions=junctions)
@@ -17,11 +17,13 @@ from fastapi.responses import JSONResponse
 from loguru import logger
 from sqlmodel import Session
 
+from app.app.errors.buffer_full_error import BufferFullError
+from app.app.errors.job_limit_error import JobLimitError
 from app.domain.models.errors import ErrorResponse
 from app.domain.models.forms import ModuleForm, RegistrationForm
 from app.domain.models.llm_agent import ContingencyFunctions, Validator
+from app.domain.models.llm_job import LLMJobRead, LLMJobResult, LLMJobStatus
 from app.domain.models.question import QuestionCreate
-from app.domain.models.client import ClientCreate
 from app.domain.models.trigger_event import TriggerEventCreate
 from app.domain.protocols.routes.qas import (
     PersonalizedQuestionProtocol,
@@ -36,6 +38,9 @@ from app.domain.models.concept_collection import CollectionRead, CollectionSumma
 from app.domain.protocols.services.concept_collection import CollectionService as CollectionServiceProtocol
 from app.domain.services.concept_collection import CollectionService
 
+from app.domain.protocols.services.llm_job import LLMJobService as LLMJobServiceProtocol
+from app.domain.services.llm_job import LLMJobService
+
 from app.domain.protocols.services.personalization import KnowledgeStateParameters
 from app.utils.personalization import (
     convert_question_list_to_dataframe,
@@ -51,7 +56,7 @@ from app.domain.services.question import QuestionService
 from app.domain.services.quiz import QuizService
 from app.domain.services.client import ClientService
 from app.domain.services.trigger_event import TriggerEventService
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import get_session
 from app.infrastructure.LLM.contingencies.general import check_valid_json
 from app.infrastructure.LLM.contingencies.questions import (
     check_contents_question_list,
@@ -59,9 +64,11 @@ from app.infrastructure.LLM.contingencies.questions import (
     format_questions,
 )
 from app.infrastructure.LLM.llm_agent import LLMAgent
+from app.infrastructure.LLM.job_queue import detach_uploads
 from app.utils.anonymization import hash_string_using_sha256
 
 from fastapi_lti1p3 import enforce_auth
+from fastapi_lti1p3.errors import AuthValidationError, SessionExpiredError
 from fastapi_lti1p3.session_cache import SessionCache
 
 from ..errors.db_error import DBError
@@ -70,68 +77,104 @@ from ..errors.validation_error import ValidationError
 
 router = APIRouter()
 
-@router.post("/module", name="qas:create-module", response_model=Union[CollectionRead, ErrorResponse])
+async def session_course_id(request: Request) -> int:
+    """
+    Route dependency returning the course of the caller's LTI session, rejecting requests without one.
+    """
+    try:
+        session_data = await enforce_auth(request=request)
+    except (AuthValidationError, SessionExpiredError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return int(session_data.id_token.get("https://purl.imsglobal.org/spec/lti/claim/custom").get("course_id"))
+
+def job_error_response(e: Union[DBError, JobLimitError]) -> JSONResponse:
+    return JSONResponse(
+        status_code=e.status_code,
+        content={
+            "code": e.status_code,
+            "type": e.__class__.__name__ if e.__class__.__name__ != "DBError" else e.type,
+            "message": str(e)
+        }
+    )
+
+
+@router.post("/module", name="qas:create-module", status_code=202, response_model=Union[LLMJobRead, ErrorResponse])
 async def create_module(
     request: Request,
     response: Response,
     model_name: Literal["gpt-3.5-turbo", "gemini-1.5-pro-latest", "gpt-4o", "llama-3"],
     files: List[UploadFile] = File(...),
     form_data: ModuleForm = Depends(ModuleForm.as_form),
-    module_service: CollectionServiceProtocol = Depends(CollectionService)
-) -> Union[CollectionRead, ErrorResponse]:
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService)
+) -> Union[LLMJobRead, ErrorResponse]:
     """
     | Input | Required | Type | Description |
     | :---- | :------: | :--: | :---------- |
     | files | True | List of Files | Module contents either as an image or text file, used to generate content summary, module concepts, and prerequisite relationships |
     | title | True | Str | Title of Module |
     | course_id | True | ID of course module is being created for |  
+
+    Runs as an LLM job, poll qas:get-job with the returned id and fetch the module from qas:get-job-result.
     """
+    files = await detach_uploads(files)
+
+    async def handler(db):
+        return await CollectionService.for_session(db).create_collection(form_data=form_data, files=files, model_name=model_name)
+
     try:
-        result = await module_service.create_collection(form_data=form_data, files=files, model_name=model_name)
-        return result
-    except (DBError, ValidationError, LLMResponseError) as e:
-        return JSONResponse(
-            status_code=e.status_code, 
-            content={
-                "code": e.status_code, 
-                "type": e.__class__.__name__ if e.__class__.__name__ != "DBError" else e.type,
-                "message": str(e)
-            }
-        )
+        return await job_service.submit_job(kind="create-module", course_id=form_data.course_id, handler=handler)
+    except (DBError, JobLimitError) as e:
+        return job_error_response(e)
 
 
-@router.post("/module/generate-summary", name="qas:generate-module-summary", response_model=CollectionSummary)
+@router.post("/module/generate-summary", name="qas:generate-module-summary", status_code=202, response_model=Union[LLMJobRead, ErrorResponse])
 async def generate_module_summary(
     request: Request,
     response: Response,
     model_name: Literal["gpt-3.5-turbo", "gemini-1.5-pro-latest", "gpt-4o", "llama-3"],
     prompt: str,
+    bypass_cache: bool = False,
     files: List[UploadFile] = File(...),
     form_data: ModuleForm = Depends(ModuleForm.as_form),
-    module_service: CollectionServiceProtocol = Depends(CollectionService),
-) -> CollectionSummary:
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService),
+) -> Union[LLMJobRead, ErrorResponse]:
+    """
+    Runs as an LLM job, the job result is a CollectionSummary.
+    """
+    files = await detach_uploads(files)
+
+    async def handler(db):
+        return await CollectionService.for_session(db).generate_module_summary(model_name=model_name, form_data=form_data, files=files, prompt=prompt, bypass_cache=bypass_cache)
+
     try:
-        module_data = await module_service.generate_module_summary(model_name=model_name, form_data=form_data, files=files, prompt=prompt)
-        return module_data
-    except (DBError, ValidationError, LLMResponseError) as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e))
+        return await job_service.submit_job(kind="generate-module-summary", course_id=form_data.course_id, handler=handler)
+    except (DBError, JobLimitError) as e:
+        return job_error_response(e)
         
 
-@router.post("/module/generate-concepts", name="qas:generate-module-concepts", response_model=List[str])
+@router.post("/module/generate-concepts", name="qas:generate-module-concepts", status_code=202, response_model=Union[LLMJobRead, ErrorResponse])
 async def generate_module_concepts(
     request: Request,
     response: Response,
     model_name: Literal["gpt-3.5-turbo", "gemini-1.5-pro-latest", "gpt-4o", "llama-3"],
     prompt: str,
+    bypass_cache: bool = False,
     files: List[UploadFile] = File(...),
     form_data: ModuleForm = Depends(ModuleForm.as_form),
-    module_service: CollectionServiceProtocol = Depends(CollectionService)
-) -> List[str]:
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService)
+) -> Union[LLMJobRead, ErrorResponse]:
+    """
+    Runs as an LLM job, the job result is the list of generated concepts.
+    """
+    files = await detach_uploads(files)
+
+    async def handler(db):
+        return await CollectionService.for_session(db).generate_module_concepts(model_name=model_name, form_data=form_data, files=files, prompt=prompt, bypass_cache=bypass_cache)
+
     try:
-        module_data = await module_service.generate_module_concepts(model_name=model_name, form_data=form_data, files=files, prompt=prompt)
-        return module_data
-    except (DBError, ValidationError, LLMResponseError) as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e))
+        return await job_service.submit_job(kind="generate-module-concepts", course_id=form_data.course_id, handler=handler)
+    except (DBError, JobLimitError) as e:
+        return job_error_response(e)
 
 @router.post("/module/generate-prerequisites", name="qas:generate-module-prerequisites", response_model=Dict[str, List[Dict[str, List[str]]]])
 async def generate_module_prerequisites(
@@ -150,10 +193,14 @@ async def generate_module_prerequisites(
 @router.get(
     path="/quiz/{module_id}/{quiz_type}",
     name="qas:get-quiz-questions",
+    status_code=202,
+    response_model=Union[LLMJobRead, ErrorResponse],
     responses={
         404: {"model": ErrorResponse},
         400: {"model": ErrorResponse},
-        500: {"model": ErrorResponse}
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
     }
 )
 async def get_quiz_questions(
@@ -163,26 +210,77 @@ async def get_quiz_questions(
     quiz_type: Literal["prereq", "preview", "review"],
     prompt: str,
     num_questions: int,
-    db: Session = Depends(get_db)
-) -> List[QuestionCreate]:
+    bypass_cache: bool = False,
+    module_service: CollectionServiceProtocol = Depends(CollectionService),
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService)
+) -> Union[LLMJobRead, ErrorResponse]:
+    """
+    Runs as an LLM job, the job result is the list of generated questions.
+    """
+    async def handler(db):
+        llm_agent = LLMAgent(module_id=module_id, db=db)
+        
+        contingency_functions = ContingencyFunctions(
+            validators=[
+                Validator(order=1, function=check_valid_json),
+                Validator(order=2, function=check_has_key_questions),
+                Validator(order=3, function=check_contents_question_list)
+            ],
+            formatter=format_questions
+        )
+        return await llm_agent.execute(action="questions", contingency_functions=contingency_functions, params= {
+            "quiz_type": quiz_type,
+            "model_name": model_name,
+            "prompt": prompt,
+            "num_questions": num_questions,
+            "bypass_cache": bypass_cache
+        })
 
-    llm_agent = LLMAgent(module_id=module_id)
-    
-    contingency_functions = ContingencyFunctions(
-        validators=[
-            Validator(order=1, function=check_valid_json),
-            Validator(order=2, function=check_has_key_questions),
-            Validator(order=3, function=check_contents_question_list)
-        ],
-        formatter=format_questions
-    )
-    questions = await llm_agent.execute(action="questions", contingency_functions=contingency_functions, params= {
-        "quiz_type": quiz_type,
-        "model_name": model_name,
-        "prompt": prompt,
-        "num_questions": num_questions
-    })
-    return questions
+    try:
+        module = await module_service.get_collection(collection_id=module_id)
+        return await job_service.submit_job(kind="quiz-questions", course_id=module.course_id, handler=handler)
+    except (DBError, JobLimitError) as e:
+        return job_error_response(e)
+
+
+@router.get("/jobs/{job_id}", name="qas:get-job", response_model=Union[LLMJobRead, ErrorResponse])
+async def get_job(
+    job_id: str,
+    course_id: int = Depends(session_course_id),
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService)
+) -> Union[LLMJobRead, ErrorResponse]:
+    """
+    Returns the status, progress and current stage of an LLM job of the caller's course, and its error once failed.
+    """
+    try:
+        return await job_service.get_job(job_id=job_id, course_id=course_id)
+    except DBError as e:
+        return job_error_response(e)
+
+
+@router.get("/jobs/{job_id}/result", name="qas:get-job-result", response_model=Union[LLMJobResult, ErrorResponse])
+async def get_job_result(
+    response: Response,
+    job_id: str,
+    course_id: int = Depends(session_course_id),
+    job_service: LLMJobServiceProtocol = Depends(LLMJobService)
+) -> Union[LLMJobResult, ErrorResponse]:
+    """
+    Returns the result of a succeeded LLM job of the caller's course. Unfinished jobs answer 202 without a result,
+    failed jobs answer with the error of the job.
+    """
+    try:
+        job = await job_service.get_job_result(job_id=job_id, course_id=course_id)
+    except DBError as e:
+        return job_error_response(e)
+
+    if job.status == LLMJobStatus.failed:
+        error = job.error or {}
+        return JSONResponse(status_code=error.get("code", 500), content=error)
+
+    if job.status != LLMJobStatus.succeeded:
+        response.status_code = 202
+    return job
 
 
 @router.post(
@@ -197,7 +295,8 @@ async def get_quiz_questions(
 async def generate_personalized_quiz_for_all_students(
         quiz_params: PersonalizedQuizProtocol,
         question_service = Depends(QuestionService),
-        concept_service = Depends(ConceptService)
+        concept_service = Depends(ConceptService),
+        client_service = Depends(ClientService)
 ) -> Dict:
     # ---------- extracts concepts to be tested -----------------
     # TODO: Build a switch case for different quiz types.
@@ -233,10 +332,19 @@ async def generate_personalized_quiz_for_all_students(
     logger.info(f"{student_ids}")
     # ---------- End of Canvas Specific Code -----------------
 
+    # Loads the knowledge state of the whole class at once, students unknown to the system get the default score on every concept
+    platform_ids = {student: hash_string_using_sha256(str(student)) for student in student_ids}
+    client_ids = await client_service.resolve_client_ids(platform_ids=platform_ids.values())
+    knowledge_states = await client_service.get_knowledge_states(
+        student_ids=list(client_ids.values()),
+        concepts=concepts_to_be_tested
+    )
+    default_knowledge_state = {concept: 0.5 for concept in concepts_to_be_tested}
+
     for student in student_ids:
         logger.info(f"Quiz creation for {student} in progress...")
-        # TODO: Replace with student service DB Extraction.
-        student_knowledge_state = {}
+        client_id = client_ids.get(platform_ids[student])
+        student_knowledge_state = knowledge_states.get(client_id, default_knowledge_state)
 
         personalization_service = QuestionPersonalizationService(
             knowledge_state=KnowledgeStateParameters(
@@ -381,13 +489,16 @@ async def get_personalized_question(
     # Get student knowledge
     # TODO: Ask the team if we can store this in session data.
     if not session_data.knowledge_state:
-        student_knowledge_state = {}
-        for concept in concepts_to_be_tested:
-            c_to_k = await client_service.get_student_knowledge_score(
-                student_id=session_info.get('user_id'),
-                concept_name=concept
+        student_id = session_data.user_credentials.internal_id
+        if student_id is None:
+            student_id = await client_service.resolve_client_id(
+                platform_id=hash_string_using_sha256(session_info.get("user_id"))
             )
-            student_knowledge_state[concept] = 0.5 if not c_to_k else c_to_k
+
+        student_knowledge_state = await client_service.get_knowledge_state(
+            student_id=student_id,
+            concepts=concepts_to_be_tested
+        )
 
         session_data = await session_cache.set(
             cache_id=session_data.session_id,
@@ -493,11 +604,13 @@ async def clear_session_cache(request: Request) -> None:
         responses={
             404: {"model": ErrorResponse},
             400: {"model": ErrorResponse},
-            500: {"model": ErrorResponse}
+            500: {"model": ErrorResponse},
+            503: {"model": ErrorResponse}
             }
         )
 async def on_submit(
         request: Request,
+        response: Response,
         concept_name: str,
         value_of_question: Union[float, int],
         confidence_rating_of_question: float,
@@ -507,28 +620,29 @@ async def on_submit(
     session_data = await enforce_auth(request=request, accepted_roles={'StudentEnrollment'})
     session_info = session_data.id_token.get('https://purl.imsglobal.org/spec/lti/claim/custom')
 
-    # Prepare the student object
-    student = await client_service.get_student(
-        platform_id=hash_string_using_sha256(session_info.get("user_id"))
-    )
-    if not student:
-        logger.debug("Student not found. Creation in progress...")
-        student = await client_service.add_student(
-            client=ClientCreate(platform_id=hash_string_using_sha256(session_info.get("user_id")))
-        )
-        logger.debug(student.id)
-        await client_service.add_student_to_course(
-            client_id=student.id,
-            course_id=session_info.get('course_id')
+    # The client id is resolved at launch and kept as the internal id of the user credentials, sessions without it fall back to the client id cache
+    student_id = session_data.user_credentials.internal_id
+    if student_id is None:
+        student_id = await client_service.resolve_client_id(
+            platform_id=hash_string_using_sha256(session_info.get("user_id")),
+            create=True
         )
 
-    # Create a trigger event entry in the DB.
-    await trigger_event_service.add_event(
-        event = TriggerEventCreate(
-            datetime_stamp=datetime.datetime.now(),
-            student_id=student.id,
-            concept=concept_name,
-            value=value_of_question,
-            weight=confidence_rating_of_question
+    # Queue a trigger event entry, it is written to the DB with the next buffered batch.
+    try:
+        await trigger_event_service.queue_event(
+            event = TriggerEventCreate(
+                datetime_stamp=datetime.datetime.now(),
+                student_id=student_id,
+                concept=concept_name,
+                value=value_of_question,
+                weight=confidence_rating_of_question
+            )
         )
-    )
\ No newline at end of file
+    except BufferFullError as e:
+        response.status_code = e.status_code
+        return ErrorResponse(
+            code=e.status_code,
+            type=e.__class__.__name__,
+            message=str(e)
+        )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Request, Depends, Form, Response
 from fastapi.templating import Jinja2Templates
@@ -13,12 +13,18 @@ from app.domain.protocols.services.course import CourseService as CourseServiceP
 
 from app.domain.protocols.services.client import ClientService as ClientServiceProtocol
 from app.domain.services.client import ClientService
-from app.domain.models.client import ClientCreate, ClientToCourseCreate
+from app.domain.models.client import ClientToCourseCreate
 
 from fastapi_lti1p3 import enforce_auth, SessionCache
 from fastapi_lti1p3.errors import AuthValidationError, SessionExpiredError
 
-from app.utils.permissions import SMEInclusive
+from app.infrastructure.database.db import get_pool_stats
+from app.infrastructure.LLM.response_cache import get_llm_response_cache
+from app.infrastructure.LLM.admission import get_admission_controller
+from app.infrastructure.LLM.job_queue import get_llm_job_queue
+from app.infrastructure.event_processor.process_manager import get_process_worker_stats
+
+from app.utils.permissions import SMEInclusive, require_admin
 from app.utils.anonymization import hash_string_using_sha256
 
 router = APIRouter()
@@ -73,10 +79,7 @@ async def lti_launch(
     # Checks if user exists in system adds them if not
     try:
         hashed_id = hash_string_using_sha256(session_info.get('user_id'))
-        client = await client_service.get_client(platform_id=hashed_id)
-
-        if client is None:
-            client = await client_service.add_client(ClientCreate(platform_id=hashed_id))
+        client_id = await client_service.resolve_client_id(platform_id=hashed_id, create=True)
 
     except DBError as e:
         response.status_code = e.status_code
@@ -86,7 +89,7 @@ async def lti_launch(
             message=str(e)
         )
     
-    session_data.user_credentials.internal_id = client.id
+    session_data.user_credentials.internal_id = client_id
         
     # Updates user_credentials of the session cache for later reference
     await session_cache.set(cache_id=session_data.session_id, key="user_credentials", value=session_data.user_credentials, store='session')
@@ -96,7 +99,7 @@ async def lti_launch(
         if not course_is_new:
             await client_service.add_client_to_course(
                 junction=ClientToCourseCreate(
-                    client_id=client.id, 
+                    client_id=client_id, 
                     course_id=course.id, 
                     is_sme=bool(session_data.get_roles() & SMEInclusive())
                     )
@@ -115,7 +118,7 @@ async def lti_launch(
             )
         
     # adds the internal id of the client to the context data sent to the UI, used for filtering elements by ownership
-    session_info['aspire_id'] = client.id
+    session_info['aspire_id'] = client_id
     session_storage_key = _SETTINGS.SESSION_ID_STORAGE_KEY
     refresh_token_storage_key = _SETTINGS.REFRESH_TOKEN_STORAGE_KEY
 
@@ -175,6 +178,45 @@ async def lti_launch(
     return response
 
 
-
-
-
+@router.get("/health/db-pool", name="root:db-pool-stats", dependencies=[Depends(require_admin)])
+async def db_pool_stats() -> dict:
+    """
+    Returns connection pool usage for each database engine: pool size, checked in/out and overflow connections,
+    total checkouts, checkout timeouts, and the average/max time spent waiting for a connection. Admins only.
+    """
+    return get_pool_stats()
+
+
+@router.get("/health/trigger-events", name="root:trigger-event-stats", dependencies=[Depends(require_admin)])
+async def trigger_event_stats() -> List[dict]:
+    """
+    Returns, per trigger event worker of this process, throughput, failing batches, dead lettered events and partition
+    maintenance failures (maintenance_error is the last error, cleared by the next successful run). Admins only.
+    """
+    return get_process_worker_stats()
+
+
+@router.get("/health/llm-cache", name="root:llm-cache-stats", dependencies=[Depends(require_admin)])
+async def llm_cache_stats() -> dict:
+    """
+    Returns the size of the LLM response cache and its hit, miss and bypass counters since startup. Admins only.
+    """
+    return get_llm_response_cache().stats()
+
+
+@router.get("/health/llm-admission", name="root:llm-admission-stats", dependencies=[Depends(require_admin)])
+async def llm_admission_stats() -> dict:
+    """
+    Returns, per LLM provider, the calls in flight and waiting for admission, retry and failure counters, and the
+    average/max time calls spent queued before being sent. Admins only.
+    """
+    return get_admission_controller().stats()
+
+
+@router.get("/health/llm-jobs", name="root:llm-job-stats", dependencies=[Depends(require_admin)])
+async def llm_job_stats() -> dict:
+    """
+    Returns the LLM job queue of this process: workers, queued and running jobs, and submitted, succeeded, failed and
+    rejected counters since startup. Admins only.
+    """
+    return get_llm_job_queue().stats()
@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import Optional, List, Union
 
-from fastapi import APIRouter, Depends, Response, Request
+from fastapi import APIRouter, Depends, Response, Request, Query
 
 from fastapi_lti1p3 import enforce_auth, Session
 
@@ -15,12 +16,22 @@ from app.domain.models.trigger_event import TriggerEventCreate, TriggerEventRead
 
 from app.domain.protocols.services.client import ClientService as ClientServiceProtocol
 from app.domain.services.client import ClientService
-from app.domain.models.client import ClientRead, ClientCreate, ClientToCourseCreate, StudentKnowledgeRead
+from app.domain.models.client import (
+    ClientRead, 
+    ClientCreate, 
+    ClientToCourseCreate, 
+    StudentKnowledgeRead, 
+    HistoryResolution, 
+    StudentKnowledgeSeries
+    )
 
 from app.domain.models.forms import list_concept_names
 
 from app.domain.models.concept import ConceptReadPreformatted
 
+from app.utils.anonymization import hash_string_using_sha256
+from app.utils.permissions import require_admin
+
 
 router = APIRouter()
 
@@ -46,6 +57,27 @@ async def add_student(
             message=str(e)
         )
 
+@router.delete("/{client_id}", name="Student:delete-student", status_code=204, dependencies=[Depends(require_admin)], response_model=None)
+async def delete_student(
+    request: Request,
+    response: Response,
+    client_id: int,
+    client_service: ClientServiceProtocol = Depends(ClientService)
+    ) -> Union[None, ErrorResponse]:
+    """
+    Deletes a student, their course memberships, knowledge and events go with them. Admins only.
+    """
+    try:
+        await client_service.delete_client(client_id=client_id)
+
+    except DBError as e:
+        response.status_code = e.status_code
+        return ErrorResponse(
+            code=e.status_code,
+            type=e.type,
+            message=str(e)
+        )
+
 @router.post("/course", name="Student:add-student-to-course", response_model=Union[
     ClientToCourseCreate, ErrorResponse])
 async def add_student_to_course(    
@@ -118,7 +150,7 @@ async def get_student_model_for_course(
     concepts: List[str] = Depends(list_concept_names),
     client_service: ClientServiceProtocol = Depends(ClientService)
     ) -> List[StudentKnowledgeRead]:
-    session_data, _ = await enforce_auth(request=request, accepted_roles={"StudentEnrollment"})
+    session_data = await enforce_auth(request=request, accepted_roles={"StudentEnrollment"})
     user_id = session_data.id_token.get("https://purl.imsglobal.org/spec/lti/claim/custom").get("user_id")
 
     try:
@@ -131,3 +163,46 @@ async def get_student_model_for_course(
             type=e.type,
             message=str(e)
         )
+
+
+@router.get("/model/history", name="Student:get-student-knowledge-history", response_model=Union[List[StudentKnowledgeSeries], ErrorResponse])
+async def get_student_knowledge_history(
+    request: Request, 
+    response: Response,
+    concepts: Optional[str] = Query(default=None, description="Multiple names must be delimited by '|', all concepts when omitted"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: HistoryResolution = HistoryResolution.day,
+    client_service: ClientServiceProtocol = Depends(ClientService)
+    ) -> Union[List[StudentKnowledgeSeries], ErrorResponse]:
+    """
+    Returns the knowledge history of the logged in student per concept, for progress charts.
+    resolution 'raw' returns every update, 'day' and 'week' the last, min and max score of each day or week.
+    """
+    session_data = await enforce_auth(request=request, accepted_roles={"StudentEnrollment"})
+    session_info = session_data.id_token.get("https://purl.imsglobal.org/spec/lti/claim/custom")
+
+    try:
+        student_id = session_data.user_credentials.internal_id
+        if student_id is None:
+            student_id = await client_service.resolve_client_id(
+                platform_id=hash_string_using_sha256(session_info.get("user_id"))
+            )
+        if student_id is None:
+            return []
+
+        return await client_service.get_knowledge_history(
+            student_id=student_id,
+            concepts=concepts.split("|") if concepts else None,
+            start=start,
+            end=end,
+            resolution=resolution
+        )
+
+    except DBError as e:
+        response.status_code = e.status_code
+        return ErrorResponse(
+            code=e.status_code,
+            type=e.type,
+            message=str(e)
+        )
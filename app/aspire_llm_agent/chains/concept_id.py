@@ -11,8 +11,13 @@ from langchain.chains.llm import LLMChain
 from .custom.combine_json import CombineJSONDocsChain
 from .custom.map_reduce_extended import MRDExtended
 
+from app.config.environment import get_settings
+from app.infrastructure.LLM.http_clients import get_provider_clients
+
 from typing import List
 
+_SETTINGS = get_settings()
+
 
 async def concept_id_chain(
         documents: List[Document], 
@@ -23,7 +28,18 @@ async def concept_id_chain(
         ):
     api_key = os.getenv('TRITON_API_KEY')
 
-    llm = OpenAI(base_url="https://traip13.dsmlp.ucsd.edu/v1", model="llama-3", api_key=api_key, max_tokens=3000, temperature=0.0)
+    # Sent over the pooled Triton connections shared with the model registry, retries are left to the admission controller
+    provider_clients = get_provider_clients()
+    llm = OpenAI(
+        base_url=_SETTINGS.TRITON_BASE_URL,
+        model="llama-3",
+        api_key=api_key,
+        max_tokens=3000,
+        temperature=0.0,
+        max_retries=0,
+        http_client=provider_clients.get_sync("triton"),
+        http_async_client=provider_clients.get_async("triton")
+    )
     document_variable_name = "context"
 
     prefix_prompt = """You are a bot who is a subject matter expert in the following subject(s): "{subjects}"; 
@@ -70,7 +86,9 @@ Return nothing else except for an array of JSON objects representing concepts th
         reduce_documents_chain=reduce_documents_chain,
         verbose=True,
         tags=["map-reduce-docs-chain"],
-        additional_doc_vars=["context_concepts"]
+        additional_doc_vars=["context_concepts"],
+        admission_provider="triton",
+        completion_tokens=llm.max_tokens
     )
 
     from langchain_community.callbacks import get_openai_callback
@@ -1,16 +1,43 @@
+import asyncio
+
 from langchain.chains.combine_documents.map_reduce import MapReduceDocumentsChain
 from typing import Any, List, Optional, Tuple
 from langchain_core.callbacks import Callbacks
 from langchain_core.documents import Document
 
+from app.infrastructure.LLM.admission import estimate_tokens, get_admission_controller
+
 class MRDExtended(MapReduceDocumentsChain):
     """
     Extends MapReduceDocumentsChain to allow additional Document variables to be added to the mapping prompt. 
     When used with extentions of the Document class, allows for individualized document enrichment. 
 
     :param additional_doc_vars: Extra keys to append to the input variables list for prompt variable injection. 
+    :param admission_provider: When set, each document is mapped as its own call admitted (and retried) by the LLM
+        admission controller of that provider, instead of firing every document at once.
+    :param completion_tokens: Expected completion size of one map call, counted against the provider's token budget.
     """
     additional_doc_vars: Optional[List[str]] = []
+    admission_provider: Optional[str] = None
+    completion_tokens: int = 0
+
+    async def _amap(self, inputs: List[dict], callbacks: Callbacks) -> List[dict]:
+        if self.admission_provider is None:
+            # FYI - this is parallelized and so it is fast.
+            return await self.llm_chain.aapply(inputs, callbacks=callbacks)
+
+        admission = get_admission_controller()
+
+        async def map_one(input: dict) -> dict:
+            tokens = estimate_tokens(self.llm_chain.prompt.format(**input)) + self.completion_tokens
+            results = await admission.run(
+                self.admission_provider,
+                lambda: self.llm_chain.aapply([input], callbacks=callbacks),
+                tokens=tokens
+            )
+            return results[0]
+
+        return list(await asyncio.gather(*(map_one(input) for input in inputs)))
 
     async def acombine_docs(
         self,
@@ -24,8 +51,7 @@ class MRDExtended(MapReduceDocumentsChain):
         Combine by mapping first chain over all documents, then reducing the results.
         This reducing can be done recursively if needed (if there are many documents).
         """
-        map_results = await self.llm_chain.aapply(
-            # FYI - this is parallelized and so it is fast.
+        map_results = await self._amap(
             [{**{self.document_variable_name: d.page_content}, **{key: d.model_dump().get(key) for key in self.additional_doc_vars}, **kwargs} for d in docs],
             callbacks=callbacks,
         )
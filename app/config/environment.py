@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Dict, Literal
 
 from dotenv import load_dotenv
 from pydantic import Field, ConfigDict
@@ -21,6 +22,60 @@ class Settings(BaseSettings):
     SESSION_ID_STORAGE_KEY: str
     REFRESH_TOKEN_STORAGE_KEY: str
     TIMEZONE: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    CONCEPT_GRAPH_MAX_AGE: int = 300
+    CONCEPT_TREE_MAX_DEPTH: int = 10
+    CONCEPT_FUZZY_MATCH_THRESHOLD: float = 0.8
+    TRIGGER_EVENT_POLL_MIN_INTERVAL: float = 1.0
+    TRIGGER_EVENT_POLL_MAX_INTERVAL: float = 60.0
+    TRIGGER_EVENT_WAKEUP_DELAY: float = 0.5
+    TRIGGER_EVENT_WORKERS: int = 1
+    TRIGGER_EVENT_PARTITIONS: int = 16
+    TRIGGER_EVENT_BATCH_SIZE: int = 1000
+    TRIGGER_EVENT_MAX_BATCH_FAILURES: int = 5
+    TRIGGER_EVENT_BUFFER_SIZE: int = 10000
+    TRIGGER_EVENT_BUFFER_FLUSH_SIZE: int = 500
+    TRIGGER_EVENT_BUFFER_FLUSH_INTERVAL: float = 1.0
+    TRIGGER_EVENT_BUFFER_PUT_TIMEOUT: float = 2.0
+    TRIGGER_EVENT_BUFFER_SPILL_DIR: str = "/tmp/trigger_event_buffer"
+    TRIGGER_EVENT_BUFFER_MAX_RETRIES: int = 5
+    TRIGGER_EVENT_PROCESS_MODE: Literal["reduce", "engine", "per_group"] = "reduce"
+    KNOWLEDGE_UPDATE_STRATEGY: Literal["weighted_mean", "elo", "bkt"] = "weighted_mean"
+    TRIGGER_EVENT_PARTITION_DAYS_AHEAD: int = 3
+    TRIGGER_EVENT_RETENTION_DAYS: int = 30
+    TRIGGER_EVENT_ARCHIVE_MODE: Literal["detach", "drop"] = "detach"
+    TRIGGER_EVENT_MAINTENANCE_INTERVAL: int = 3600
+    CLIENT_ID_CACHE_SIZE: int = 50000
+    CLIENT_ID_CACHE_TTL: int = 300
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_response_cache.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_TTL: int = 7 * 24 * 3600
+    TRITON_BASE_URL: str = "https://traip13.dsmlp.ucsd.edu/v1"
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0
+    LLM_HTTP2: bool = True
+    LLM_PROVIDER_LIMITS: Dict[str, Dict[str, float]] = {
+        "default": {"max_in_flight": 4, "requests_per_minute": 60, "tokens_per_minute": 0},
+        "openai": {"max_in_flight": 8, "requests_per_minute": 500, "tokens_per_minute": 200000},
+        "google": {"max_in_flight": 4, "requests_per_minute": 60, "tokens_per_minute": 1000000},
+        "triton": {"max_in_flight": 4, "requests_per_minute": 0, "tokens_per_minute": 0},
+    }
+    LLM_RETRY_MAX_RETRIES: int = 5
+    LLM_RETRY_BASE_DELAY: float = 1.0
+    LLM_RETRY_MAX_DELAY: float = 30.0
+    LLM_JOB_WORKERS: int = 4
+    LLM_JOB_QUEUE_SIZE: int = 100
+    LLM_JOB_MAX_PER_COURSE: int = 2
+    LLM_JOB_HEARTBEAT_INTERVAL: float = 15.0
+    LLM_JOB_STALE_AFTER: float = 120.0
     
 @lru_cache # Cache settings
 def get_settings() -> Settings:
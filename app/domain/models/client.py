@@ -1,11 +1,12 @@
 from typing import Optional, List, Annotated, Literal, Dict, Union
-from datetime import datetime
+from datetime import date, datetime
 from sqlmodel import Field, SQLModel, Column, ARRAY, Integer, JSON, String, VARCHAR
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, REAL, Date
 from sqlalchemy import event
 from sqlalchemy.orm.attributes import flag_modified
 
+import enum
 import json
 
 class ClientBase(SQLModel):
@@ -74,6 +75,59 @@ class StudentKnowledgeCreate(StudentKnowledgeBase):
     pass
 
 
+class HistoryResolution(str, enum.Enum):
+    raw = "raw"
+    day = "day"
+    week = "week"
+
+
+class StudentKnowledgeHistory(SQLModel, table=True):
+    # Append-only, one row per write of a student_knowledge row. The primary key doubles as the index of range reads
+    # (one student, some concepts, a time window) and the score is stored as a 4 byte REAL.
+    __tablename__ = ("student_knowledge_history")
+    student_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("client.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    )
+    concept_name: str = Field(
+        sa_column=Column(VARCHAR, ForeignKey("concept.name", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    )
+    recorded_at: datetime = Field(primary_key=True)
+    score: float = Field(sa_column=Column(REAL, nullable=False))
+    no_of_inputs: int
+
+
+class StudentKnowledgeRollup(SQLModel, table=True):
+    # One row per (student, concept, resolution, bucket), folded in by the same statement that appends the history row.
+    __tablename__ = ("student_knowledge_rollup")
+    student_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("client.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    )
+    concept_name: str = Field(
+        sa_column=Column(VARCHAR, ForeignKey("concept.name", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    )
+    resolution: str = Field(sa_column=Column(VARCHAR(4), primary_key=True))
+    bucket: date = Field(sa_column=Column(Date, primary_key=True))
+    first_score: float = Field(sa_column=Column(REAL, nullable=False))
+    last_score: float = Field(sa_column=Column(REAL, nullable=False))
+    min_score: float = Field(sa_column=Column(REAL, nullable=False))
+    max_score: float = Field(sa_column=Column(REAL, nullable=False))
+    samples: int
+    no_of_inputs: int
+
+
+class StudentKnowledgePoint(SQLModel):
+    timestamp: datetime = Field(description="Time of the write for raw points, start of the day or week for rollups")
+    score: float = Field(description="Score at that time, the last score of the bucket for rollups")
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    no_of_inputs: int
+
+class StudentKnowledgeSeries(SQLModel):
+    concept_name: str
+    resolution: HistoryResolution
+    points: List[StudentKnowledgePoint]
+
+
 def update_change_history(mapper, connection, target):
     if target.change_history is None:
         target.change_history = []
@@ -1,6 +1,6 @@
 from typing import Optional, List, Union
 from sqlmodel import Field, SQLModel, Column, VARCHAR, Integer
-from sqlalchemy import ForeignKey, Column
+from sqlalchemy import ForeignKey, Column, Index, DDL, event, func
 from pydantic import field_validator
 
 from .errors import DBError
@@ -27,6 +27,17 @@ class ConceptBaseExtended(SQLModel):
 class Concept(ConceptBase, ConceptBaseExtended, table=True):
     pass
 
+# Case-insensitive lookups (ConceptRepository.exists) and trigram similarity search (ConceptRepository.exists_fuzzy).
+# GiST rather than GIN so the nearest match can be found with an index ordered scan on <->.
+event.listen(Concept.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+Index("ix_concept_name_lower", func.lower(Concept.__table__.c.name))
+Index(
+    "ix_concept_name_trgm", 
+    func.lower(Concept.__table__.c.name).label("name_lower"), 
+    postgresql_using="gist", 
+    postgresql_ops={"name_lower": "gist_trgm_ops"}
+    )
+
 class ConceptCreate(ConceptBase, ConceptBaseExtended):
     pass
 
@@ -47,9 +58,18 @@ class ConceptCreateBulkRead(SQLModel):
     success: Union[List[ConceptRead], None]
     failed: Union[List[DBError], None]
 
+class ConceptMatch(SQLModel):
+    candidate: str
+    match: Optional[str] = Field(default=None, description="Closest existing concept name, null when none is similar enough")
+    score: Optional[float] = None
+
 class ConceptBulkRead(SQLModel):
     concepts: List[ConceptRead]
 
+class ConceptPage(SQLModel):
+    items: Union[List[ConceptRead], List[ConceptReadVerbose]]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as 'after' to fetch the next page, null on the last page")
+
 class ConceptFilter(SQLModel):
     course_id: Optional[int] = None
     subjects: Optional[str] = Field(default=None, description="For multiple subjects, use '|' deliminator between values")
@@ -87,7 +107,8 @@ class ConceptToConceptBase(SQLModel):
 
 class ConceptToConcept(ConceptToConceptBase, table=True):
     __tablename__ = ("concept_to_concept")
-    pass
+    # Lookups by concept_name are served by the (concept_name, prereq_name) primary key
+    __table_args__ = (Index("ix_concept_to_concept_prereq_name", "prereq_name"),)
 
 class ConceptToConceptCreate(ConceptToConceptBase):
     pass
@@ -98,6 +119,13 @@ class ConceptToConceptRead(ConceptToConceptBase):
 class ConceptToConceptDelete(ConceptToConceptBase):
     pass
 
+class ConceptToConceptBulkRead(SQLModel):
+    success: List[ConceptToConceptRead]
+    failed: List[DBError] = Field(default=[], description="Rejected junctions, object_id is 'concept_name|prereq_name'")
+
+class ConceptToConceptTreeRead(ConceptToConceptBase):
+    depth: int = Field(description="Number of hops between the junction and the root concept(s), direct junctions have depth 1")
+
 
 class ConceptToCollectionBase(SQLModel):
     concept_name: str = Field(
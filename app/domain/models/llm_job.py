@@ -0,0 +1,48 @@
+import enum
+from typing import Any, Optional
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel, Column, Enum
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import JSON
+
+
+class LLMJobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class LLMJobBase(SQLModel):
+    kind: str = Field(max_length=64)
+    course_id: int = Field(foreign_key="course.id", ondelete="CASCADE")
+    status: LLMJobStatus = Field(default=LLMJobStatus.queued, sa_column=Column(Enum(LLMJobStatus), nullable=False))
+    progress: float = Field(default=0.0, ge=0.0, le=1.0)
+    stage: Optional[str] = None
+    error: Optional[Any] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class LLMJob(LLMJobBase, table=True):
+    # Queued and running jobs are counted per course on submit and swept for missed heartbeats by every worker process
+    __tablename__ = "llm_job"
+    __table_args__ = (
+        Index("ix_llm_job_active", "course_id", "status"),
+    )
+    id: str = Field(primary_key=True, max_length=32)
+    result: Optional[Any] = Field(default=None, sa_column=Column(JSON))
+    heartbeat_at: datetime = Field(default_factory=datetime.now)
+
+
+class LLMJobRead(LLMJobBase):
+    id: str
+
+
+class LLMJobResult(SQLModel):
+    id: str
+    status: LLMJobStatus
+    result: Optional[Any] = None
+    error: Optional[Any] = None
@@ -1,7 +1,7 @@
 from typing import Optional, List, Annotated, Literal
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Column, ARRAY, Integer, VARCHAR
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, DDL, event, text
 
 
 class TriggerEventBase(SQLModel):
@@ -17,8 +17,39 @@ class TriggerEventBase(SQLModel):
     weight: float
 
 class TriggerEvent(TriggerEventBase, table=True):
+    # Range partitioned by day, daily partitions are created ahead of time and old fully processed ones detached or dropped
+    # (TriggerEventRepository.maintain_partitions). Applied events are marked processed instead of deleted, the partial
+    # index keeps queue scans on the unprocessed rows.
     __tablename__ = ("trigger_event")
-    event_id: Optional[int] = Field(default=None, primary_key=True)
+    __table_args__ = (
+        Index("ix_trigger_event_unprocessed", "event_id", postgresql_where=text("processed_at IS NULL")),
+        {"postgresql_partition_by": "RANGE (datetime_stamp)"},
+    )
+    # The partition key has to be part of the primary key of a partitioned table
+    event_id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    datetime_stamp: datetime = Field(primary_key=True)
+    processed_at: Optional[datetime] = Field(default=None)
+
+# Catches events outside of the pre-created daily partitions
+event.listen(
+    TriggerEvent.__table__, 
+    "after_create", 
+    DDL("CREATE TABLE IF NOT EXISTS trigger_event_default PARTITION OF trigger_event DEFAULT")
+    )
+
+class TriggerEventDeadLetter(SQLModel, table=True):
+    # Events moved out of the queue because their batch kept failing (TriggerEventRepository.dead_letter_batch).
+    # No foreign keys, so they are kept whatever the cause. Replay them by inserting them back into trigger_event.
+    __tablename__ = ("trigger_event_dead_letter")
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_id: Optional[int] = None
+    datetime_stamp: datetime
+    student_id: int
+    concept: str
+    value: float
+    weight: float
+    error: str
+    failed_at: datetime
 
 class TriggerEventCreate(TriggerEventBase):
     pass
@@ -36,4 +67,12 @@ class TriggerEventProcess(SQLModel):
     )
     student_id: int = Field(foreign_key="client.id")
     numerator: float
-    denominator: float
\ No newline at end of file
+    denominator: float
+
+class TriggerEventReduceResult(SQLModel):
+    groups: int = Field(description="Number of (student_id, concept) pairs folded into student_knowledge")
+    events: int = Field(description="Number of trigger events consumed")
+
+class TriggerEventMaintenanceResult(SQLModel):
+    created: List[str] = []
+    archived: List[str] = []
@@ -1,4 +1,5 @@
-from typing import Protocol, List
+from datetime import datetime
+from typing import Protocol, List, Dict, Optional
 from app.domain.models.client import (
     ClientCreate,
     ClientRead,
@@ -6,6 +7,8 @@ from app.domain.models.client import (
     StudentKnowledgeRead, 
     ClientToCourseCreate,
     ClientToCourseRead,
+    HistoryResolution,
+    StudentKnowledgePoint,
     )
 
 
@@ -19,6 +22,18 @@ class ClientRepository(Protocol):
     async def get(self, platform_id: str) -> ClientRead:
         ...
 
+    async def get_ids(self, platform_ids: List[str]) -> Dict[str, int]:
+        """
+        Returns {platform_id: client_id} for the clients that exist among platform_ids, in one query
+        """
+        ...
+
+    async def delete(self, client_id: int) -> None:
+        """
+        Deletes a client, cascading to its course junctions, knowledge scores and trigger events
+        """
+        pass
+
 
 class ClientToCourseRepository(Protocol):
     async def add(self, junction: ClientToCourseCreate) -> ClientToCourseRead:
@@ -37,6 +52,13 @@ class StudentKnowledgeRepository(Protocol):
 
     async def bulk_get(self, student_id: int, concept_list: List) -> List[StudentKnowledgeRead]:
         ...
+
+    async def get_scores(self, student_ids: List[int], concept_list: List[str]) -> Dict[int, Dict[str, float]]:
+        """
+        Returns {student_id: {concept_name: score}} for every stored score of the students and concepts, in one query.
+        Every student_id is present in the result, concepts without a stored score are left out.
+        """
+        ...
     
     async def add(self, score: StudentKnowledgeCreate) -> StudentKnowledgeRead:
         """
@@ -48,4 +70,19 @@ class StudentKnowledgeRepository(Protocol):
         """
         Updates the concept_score of an existing StudentKnowledge entry matching the student_id and concept_name provided in the StudentKnowledgeCreate object
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def get_history(
+            self, 
+            student_id: int, 
+            concept_list: Optional[List[str]] = None, 
+            start: Optional[datetime] = None, 
+            end: Optional[datetime] = None, 
+            resolution: HistoryResolution = HistoryResolution.day
+    ) -> Dict[str, List[StudentKnowledgePoint]]:
+        """
+        Returns {concept_name: points} of a student between start and end, oldest first, with one indexed read.
+        resolution 'raw' returns every write, 'day' and 'week' one point per bucket (the buckets containing start and end included).
+        All concepts when concept_list is empty, unbounded when start or end is None.
+        """
+        ...
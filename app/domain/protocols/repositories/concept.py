@@ -1,4 +1,4 @@
-from typing import List, Protocol, Literal, Union
+from typing import AsyncIterator, List, Protocol, Literal, Union, Tuple, Dict, Optional, Iterable
 
 from app.domain.models.concept import (
     ConceptCreate, 
@@ -7,13 +7,17 @@ from app.domain.models.concept import (
     ConceptToCollectionCreate, 
     ConceptToCollectionRead,
     ConceptToConceptCreate,
+    ConceptToConceptBulkRead,
     ConceptToConceptRead,
     ConceptFilter,
     ConceptBulkRead,
     ConceptReadVerbose,
+    ConceptPage,
+    ConceptMatch,
+    ConceptReadPreformatted,
     ConceptToCollectionDelete,
     ConceptToConceptDelete,
-
+    ConceptToConceptTreeRead,
     )
 
 class ConceptRepository(Protocol):
@@ -48,6 +52,45 @@ class ConceptRepository(Protocol):
         """
         ...
 
+    async def get_page(self, filters: ConceptFilter, after: Optional[str] = None, limit: int = 100, read_mode: Literal["normal", "verbose"] = "normal") -> ConceptPage:
+        """
+        Returns one page of the concepts matching a set of filters, ordered by name.
+        :param filters: same as get_many.
+        :param after: name of the last concept of the previous page (the page's next_cursor), None for the first page.
+        :param limit: maximum number of concepts in the page.
+        """
+        ...
+
+    def stream(self, filters: ConceptFilter, read_mode: Literal["normal", "verbose"] = "normal", batch_size: int = 500) -> AsyncIterator[Union[ConceptRead, ConceptReadVerbose]]:
+        """
+        Yields every concept matching a set of filters, ordered by name, fetching rows from a server-side cursor in batches
+        so the full result set is never held in memory.
+        """
+        ...
+
+    async def get_many_by_collections(self, collection_ids: Iterable[int], course_id: Optional[int] = None) -> Dict[str, ConceptReadPreformatted]:
+        """
+        Returns all concepts contained in any of the supplied collections in a single query, keyed by concept name.
+        :param collection_ids: ids of the collections to return the concepts of.
+        :param course_id: when supplied, only collections belonging to this course are considered.
+        Each concept's 'module' field lists the supplied collection ids it belongs to.
+        """
+        ...
+
+    async def exists(self, concept_names: List[str]) -> dict:
+        """
+        Case-insensitive existence check.
+        Returns {'matched_concepts': existing names that match a candidate, 'unmatched_concepts': candidates without a match}.
+        """
+        ...
+
+    async def exists_fuzzy(self, concept_names: List[str], threshold: float = 0.6) -> List[ConceptMatch]:
+        """
+        Returns, for each candidate in input order, the most similar existing concept by trigram similarity of the
+        lower-cased names along with its score, or no match when nothing scores at least threshold.
+        """
+        ...
+
     async def delete_one(self, concept_name: str) -> None:
         """ This function deletes a single concept from the Database
 
@@ -88,7 +131,8 @@ class ConceptToModuleRepository(Protocol):
 
     async def bulk_add(self, junctions: List[ConceptToCollectionCreate]) -> List[ConceptToCollectionRead]:
         """
-        Creates many ConceptToModule junctions
+        Creates many ConceptToModule junctions in a single statement, skipping junctions that already exist.
+        Returns the junctions that were inserted.
         """
         ...
 
@@ -98,9 +142,9 @@ class ConceptToModuleRepository(Protocol):
         """
         ...
 
-    async def delete(self, junctions: List[ConceptToCollectionDelete]):
+    async def delete(self, junctions: List[ConceptToCollectionDelete]) -> int:
         """
-        Removes a concept from a module
+        Removes concepts from modules in a single statement, returns the number of junctions deleted
         """       
         ...
 
@@ -111,9 +155,16 @@ class ConceptToConceptRepository(Protocol):
         """
         ...
 
-    async def bulk_add(self, junctions: List[ConceptToConceptCreate]) -> List[ConceptToConceptRead]:
+    async def bulk_add(self, junctions: List[ConceptToConceptCreate]) -> ConceptToConceptBulkRead:
+        """
+        Adds many ConceptToConcept junctions in a single statement. Junctions that already exist (UniqueViolation)
+        or reference a concept that does not exist (ForeignKeyViolation) are skipped and returned as failed.
+        """
+        ...
+
+    async def get_all_junctions(self) -> List[Tuple[str, str]]:
         """
-        Adds many ConceptToConcept junctions
+        Returns every concept-to-concept junction as a (concept_name, prereq_name) tuple, used to build the in-memory concept graph index.
         """
         ...
 
@@ -132,9 +183,24 @@ class ConceptToConceptRepository(Protocol):
         """
         ...
 
-    async def delete(self, junctions: List[ConceptToConceptDelete]):
+    async def get_tree(
+            self, 
+            concepts: List[ConceptRead], 
+            junction_direction: Literal["up", "down"] = "down",
+            max_depth: int = 3
+    ) -> List[ConceptToConceptTreeRead]:
+        """
+        Returns every concept-to-concept junction reachable from the specified concepts within max_depth hops, in a single query.
+
+        :param junction_direction: ('up', 'down') 'down' walks the prerequisites of the supplied concepts, 'up' walks the concepts depending on them.
+
+        :param max_depth: Maximum number of hops from the supplied concepts. Cycles are not followed.
+        """
+        ...
+
+    async def delete(self, junctions: List[ConceptToConceptDelete]) -> int:
         """
-        Deletes one or many ConceptToConcept junctions
+        Deletes one or many ConceptToConcept junctions in a single statement, returns the number of junctions deleted
         """
         ...
 
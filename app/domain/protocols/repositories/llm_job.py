@@ -0,0 +1,27 @@
+from typing import Any, List, Optional, Protocol
+from datetime import datetime
+
+from app.domain.models.llm_job import LLMJob, LLMJobStatus
+
+
+class LLMJobRepository(Protocol):
+    async def add_within_course_limit(self, job: LLMJob, limit: int) -> Optional[LLMJob]:
+        ...
+
+    async def get_one(self, job_id: str) -> LLMJob:
+        ...
+
+    async def start(self, job_id: str) -> bool:
+        ...
+
+    async def report_progress(self, job_id: str, progress: float, stage: Optional[str] = None) -> None:
+        ...
+
+    async def finish(self, job_id: str, status: LLMJobStatus, result: Any = None, error: Any = None) -> None:
+        ...
+
+    async def heartbeat(self, job_ids: List[str]) -> None:
+        ...
+
+    async def fail_stale(self, stale_before: datetime) -> int:
+        ...
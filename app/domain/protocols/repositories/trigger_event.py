@@ -1,6 +1,6 @@
-from typing import List, Protocol
+from typing import Callable, Dict, List, Literal, Mapping, Optional, Protocol, Sequence
 
-from app.domain.models.trigger_event import TriggerEventCreate, TriggerEventRead, TriggerEventProcess
+from app.domain.models.trigger_event import TriggerEventCreate, TriggerEventRead, TriggerEventProcess, TriggerEventReduceResult, TriggerEventMaintenanceResult
 
 
 
@@ -17,15 +17,23 @@ class TriggerEventRepository(Protocol):
         """
         pass
     
+    async def bulk_insert(self, events: List[TriggerEventCreate]) -> int:
+        """
+        Adds multiple Trigger Events in one statement without reading them back. Events whose student or concept does not
+        exist are moved to TriggerEventDeadLetter instead. Returns the number of events written
+        """
+        pass
+    
     async def queue_check(self) -> bool:
         """
-        Checks if data is in the TriggerEvent table
-        Returns True if table has data else returns false
+        Checks if the TriggerEvent table has unprocessed events
+        Returns True if it has else returns false
         """
         pass
 
     async def get_queue(self, max_batch_size:int) -> List[TriggerEventProcess]:
         """
+        Does not claim the returned rows, only safe with a single consumer, see reduce_queue.
         Pre-processes data from the queue such that rows with matching pairs of concept and student_id values
         are grouped together, and the weights and values of these groups are aggregated and calculated as the numerator and denominator of the weighted average equation.
         Returns the numerator, denominator, student_id, concept, and list of event_ids for each of these groups up to max_batch_size.
@@ -36,4 +44,83 @@ class TriggerEventRepository(Protocol):
         """
         Deletes all trigger events where its event_id is in the list of event_ids
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def mark_processed(self, event_ids: list[int]) -> None:
+        """
+        Marks the trigger events with the given event_ids as processed, processed events are kept until their daily partition is archived
+        """
+        pass
+
+    async def reduce_queue(
+            self, 
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1, 
+            prior_numerator: float = 0.5, 
+            prior_denominator: float = 1.0
+    ) -> TriggerEventReduceResult:
+        """
+        Claims up to max_batch_size events of one partition (students are assigned to one of partitions by hash of student_id),
+        folds them into student_knowledge and marks them processed, in a single statement and transaction.
+        Safe to run concurrently from any number of workers: a partition is leased by one worker at a time and claimed rows are
+        skipped by others, returns zero events when the partition is leased elsewhere.
+        New student_knowledge rows start from the prior_numerator / prior_denominator estimate, existing rows accumulate the group's
+        numerator and denominator, and an entry is appended to change_history and to the knowledge history (with its day and
+        week rollups) for every row written.
+        Returns the number of groups and events consumed.
+        """
+        pass
+
+    async def apply_queue(
+            self, 
+            update: Callable[[Sequence[Mapping], Sequence[Mapping]], List[Dict]],
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1
+    ) -> TriggerEventReduceResult:
+        """
+        Claims a batch like reduce_queue and has update(events, knowledge_rows) compute the new student_knowledge rows,
+        where events are the claimed (event_id, student_id, concept, value, weight) rows and knowledge_rows the stored rows
+        of their (student_id, concept) pairs. Writes the returned rows and marks the events processed in one transaction.
+        """
+        pass
+
+    async def migrate_table(self, days_ahead: int = 3) -> bool:
+        """
+        Converts a TriggerEvent table created before partitioning into the partitioned table and moves its rows over.
+        Returns True when the table was converted.
+        """
+        pass
+
+    async def create_dead_letter_table(self) -> None:
+        """
+        Creates the TriggerEventDeadLetter table if it doesn't exist.
+        """
+        pass
+
+    async def dead_letter_batch(
+            self, 
+            error: str, 
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1, 
+            event_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Moves the given unprocessed events, or the next batch of the partition, out of the queue into TriggerEventDeadLetter.
+        Returns the number of events moved.
+        """
+        pass
+
+    async def maintain_partitions(
+            self, 
+            days_ahead: int = 3, 
+            retention_days: int = 30, 
+            archive_mode: Literal["detach", "drop"] = "detach"
+    ) -> TriggerEventMaintenanceResult:
+        """
+        Creates upcoming daily partitions of the TriggerEvent table and detaches or drops old ones that are fully processed.
+        Returns the names of the partitions created and archived.
+        """
+        pass
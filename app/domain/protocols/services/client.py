@@ -1,11 +1,14 @@
-from typing import  Protocol
+from datetime import datetime
+from typing import  Protocol, Optional, Dict, List, Iterable
 
 from app.domain.models.client import (
     ClientCreate,
     ClientRead,
     StudentKnowledgeRead,
     ClientToCourseCreate,
-    ClientToCourseRead
+    ClientToCourseRead,
+    HistoryResolution,
+    StudentKnowledgeSeries
 )
 
 
@@ -18,6 +21,25 @@ class ClientService(Protocol):
 
     async def get_client(self, platform_id: str) -> ClientRead:
         ...
+
+    async def resolve_client_id(self, platform_id: str, create: bool = False) -> Optional[int]:
+        """
+        Returns the internal id of the client with the hashed platform_id, served from an in-memory LRU/TTL cache when possible.
+        With create=True a missing client is added, otherwise None is returned.
+        """
+        ...
+
+    async def resolve_client_ids(self, platform_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Batch version of resolve_client_id, returns {platform_id: client_id} for existing clients with at most one query
+        """
+        ...
+
+    async def delete_client(self, client_id: int) -> None:
+        """
+        Deletes a client and drops it from the client id cache
+        """
+        pass
     
     async def add_client_to_course(self, junction: ClientToCourseCreate) -> ClientToCourseRead:
         """
@@ -29,4 +51,29 @@ class ClientService(Protocol):
         """
         Returns a single StudentKnowledge entry matching the student_id and concept_name
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def get_knowledge_state(self, student_id: Optional[int], concepts: List[str], default: float = 0.5) -> Dict[str, float]:
+        """
+        Returns a dense {concept: score} map for one student, concepts without a stored score (or an unknown student) get default
+        """
+        ...
+
+    async def get_knowledge_states(self, student_ids: List[int], concepts: List[str], default: float = 0.5) -> Dict[int, Dict[str, float]]:
+        """
+        Returns a dense {student_id: {concept: score}} map for many students with one query
+        """
+        ...
+
+    async def get_knowledge_history(
+            self, 
+            student_id: int, 
+            concepts: Optional[List[str]] = None, 
+            start: Optional[datetime] = None, 
+            end: Optional[datetime] = None, 
+            resolution: HistoryResolution = HistoryResolution.day
+    ) -> List[StudentKnowledgeSeries]:
+        """
+        Returns one series per concept of the student's knowledge between start and end, for progress charts
+        """
+        ...
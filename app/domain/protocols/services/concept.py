@@ -1,4 +1,4 @@
-from typing import List, Protocol, Literal, Union, Set, Optional, Dict
+from typing import AsyncIterator, List, Protocol, Literal, Union, Set, Optional, Dict
 
 from app.domain.models.concept import (
     ConceptRead, 
@@ -7,12 +7,16 @@ from app.domain.models.concept import (
     ConceptToCollectionCreate, 
     ConceptToCollectionRead,
     ConceptToConceptCreate,
+    ConceptToConceptBulkRead,
     ConceptToConceptRead,
     ConceptFilter,
     ConceptBulkRead,
     ConceptReadVerbose,
+    ConceptPage,
+    ConceptMatch,
     ConceptToCollectionDelete,
     ConceptToConceptDelete,
+    ConceptToConceptTreeRead,
     ConceptReadPreformatted
 )
 
@@ -50,12 +54,41 @@ class ConceptService(Protocol):
         """
         ...
 
-    async def get_all_concepts_from_collections(self, collection_ids:Set[int], course_id=Optional[int]) -> Dict[str, ConceptReadPreformatted]:
+    async def get_concept_page(self, filters: ConceptFilter, after: Optional[str] = None, limit: int = 100, read_mode: Literal["normal", "verbose"] = "normal") -> ConceptPage:
+        """
+        Returns one page of the concepts matching a set of filters, ordered by name.
+        :param filters: same as get_many.
+        :param after: name of the last concept of the previous page (the page's next_cursor), None for the first page.
+        :param limit: maximum number of concepts in the page.
+        """
+        ...
+
+    def stream_concepts(self, filters: ConceptFilter, read_mode: Literal["normal", "verbose"] = "normal") -> AsyncIterator[Union[ConceptRead, ConceptReadVerbose]]:
+        """
+        Yields every concept matching a set of filters, ordered by name, fetching rows from a server-side cursor in batches
+        so the full result set is never held in memory.
+        """
+        ...
+
+    async def get_all_concepts_from_collections(self, collection_ids:Set[int], course_id: Optional[int] = None) -> Dict[str, ConceptReadPreformatted]:
         """
         Returns all the concepts belonging to supplied collections, formatted as required for domain visualization and editing
         """
         ...
 
+    async def check_if_concepts_exist(self, concept_names: List[str]) -> dict:
+        """
+        Case-insensitive existence check, see ConceptRepository.exists
+        """
+        ...
+
+    async def check_if_concepts_exist_fuzzy(self, concept_names: List[str], threshold: Optional[float] = None) -> List[ConceptMatch]:
+        """
+        Returns the closest existing concept for each candidate name, see ConceptRepository.exists_fuzzy.
+        threshold defaults to the CONCEPT_FUZZY_MATCH_THRESHOLD setting.
+        """
+        ...
+
     async def init_module_concepts(
             self, 
             module_id: int, 
@@ -117,9 +150,9 @@ class ConceptToModuleService(Protocol):
         """
         ...
 
-    async def delete_module_junctions(self, junctions: List[ConceptToCollectionDelete]):
+    async def delete_module_junctions(self, junctions: List[ConceptToCollectionDelete]) -> int:
         """
-        Removes a concept from a module
+        Removes concepts from modules, returns the number of junctions deleted
         """
         ...
 
@@ -136,9 +169,9 @@ class ConceptToConceptService(Protocol):
         """
         ...
 
-    async def bulk_create_concept_junctions(self, junctions: List[ConceptToConceptCreate]) -> List[ConceptToConceptRead]:
+    async def bulk_create_concept_junctions(self, junctions: List[ConceptToConceptCreate]) -> ConceptToConceptBulkRead:
         """
-        Creates many ConceptToConcept junctions
+        Creates many ConceptToConcept junctions, returning the created ones and the rejected ones with their cause
         """
         ...
 
@@ -153,9 +186,23 @@ class ConceptToConceptService(Protocol):
         """
         ...
 
-    async def delete_junctions(self, junctions: List[ConceptToConceptDelete]):
+    async def get_concept_junction_tree(
+            self, 
+            concepts: List[ConceptRead], 
+            junction_direction: Literal["up", "down"] = "down",
+            max_depth: int = 3
+    ) -> List[ConceptToConceptTreeRead]:
+        """
+        Returns the concept-to-concept junctions reachable from the specified concepts within max_depth hops,
+        each annotated with the depth it was first reached at.
+
+        :param junction_direction: ('up', 'down') 'down' returns the prerequisite tree of the supplied concepts, 'up' returns the tree of dependent concepts.
+        """
+        ...
+
+    async def delete_junctions(self, junctions: List[ConceptToConceptDelete]) -> int:
         """
-        Deletes a ConceptToConcept junction.
+        Deletes ConceptToConcept junctions, returns the number of junctions deleted.
         """
         ...
 
@@ -0,0 +1,21 @@
+from typing import Protocol
+
+from app.domain.models.llm_job import LLMJobRead, LLMJobResult
+from app.infrastructure.LLM.job_queue import JobHandler
+
+
+class LLMJobService(Protocol):
+    async def submit_job(self, kind: str, course_id: int, handler: JobHandler) -> LLMJobRead:
+        ...
+
+    async def get_job(self, job_id: str, course_id: int) -> LLMJobRead:
+        """
+        Returns the job if it belongs to course_id, raises a 404 DBError otherwise.
+        """
+        ...
+
+    async def get_job_result(self, job_id: str, course_id: int) -> LLMJobResult:
+        """
+        Returns the result of the job if it belongs to course_id, raises a 404 DBError otherwise.
+        """
+        ...
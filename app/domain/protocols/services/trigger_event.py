@@ -12,4 +12,11 @@ class TriggerEventService(Protocol):
         """
         Adds many entrys to the TriggerEvent table 
         """
-        pass
\ No newline at end of file
+        pass
+    
+    async def queue_event(self, event: TriggerEventCreate) -> None:
+        """
+        Queues an entry in the write-behind buffer, it is written to the TriggerEvent table with the next batch.
+        Raises BufferFullError when the buffer stays full.
+        """
+        pass
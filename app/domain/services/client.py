@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Dict, Iterable
 from fastapi import Depends
 
 from app.domain.models.client import (
@@ -6,7 +7,9 @@ from app.domain.models.client import (
     ClientRead,
     StudentKnowledgeRead,
     ClientToCourseCreate,
-    ClientToCourseRead
+    ClientToCourseRead,
+    HistoryResolution,
+    StudentKnowledgeSeries
 )
 from app.infrastructure.database.repositories.client import (
     ClientRepository,
@@ -19,6 +22,7 @@ from app.domain.protocols.repositories.client import (
     ClientToCourseRepository as SToCRepoProtocol
     )
 from app.domain.protocols.services.client import ClientService as ClientServiceProtocol
+from app.domain.services.client_cache import ClientIdCache, get_client_id_cache
 
 from app.domain.models.concept import ConceptBulkRead
 
@@ -28,18 +32,58 @@ class ClientService(ClientServiceProtocol):
         self, 
         client_repo: ClientRepoProtocol = Depends(ClientRepository),
         s_k_repo: StudentKnowledgeRepoProtocol = Depends(StudentKnowledgeRepository),
-        s_to_c_repo: SToCRepoProtocol = Depends(ClientToCourseRepository)
+        s_to_c_repo: SToCRepoProtocol = Depends(ClientToCourseRepository),
+        client_id_cache: ClientIdCache = Depends(get_client_id_cache)
 
     ):
         self.client_repo = client_repo
         self.s_k_repo = s_k_repo
         self.s_to_c_repo = s_to_c_repo
+        self.client_id_cache = client_id_cache
 
     async def add_client(self, client: ClientCreate) -> ClientRead:
-        return await self.client_repo.add(client=client)
+        result = await self.client_repo.add(client=client)
+        self.client_id_cache.set(platform_id=result.platform_id, client_id=result.id)
+        return result
 
     async def get_client(self, platform_id: str) -> ClientRead:
         return await self.client_repo.get(platform_id=platform_id)
+
+    async def resolve_client_id(self, platform_id: str, create: bool = False) -> Optional[int]:
+        client_id = self.client_id_cache.get(platform_id)
+        if client_id is not None:
+            return client_id
+
+        client = await self.client_repo.get(platform_id=platform_id)
+        if client is None:
+            if not create:
+                return None
+            client = await self.client_repo.add(client=ClientCreate(platform_id=platform_id))
+
+        self.client_id_cache.set(platform_id=platform_id, client_id=client.id)
+        return client.id
+
+    async def resolve_client_ids(self, platform_ids: Iterable[str]) -> Dict[str, int]:
+        resolved = {}
+        missing = []
+        for platform_id in dict.fromkeys(platform_ids):
+            client_id = self.client_id_cache.get(platform_id)
+            if client_id is None:
+                missing.append(platform_id)
+            else:
+                resolved[platform_id] = client_id
+
+        if missing:
+            found = await self.client_repo.get_ids(platform_ids=missing)
+            for platform_id, client_id in found.items():
+                self.client_id_cache.set(platform_id=platform_id, client_id=client_id)
+            resolved.update(found)
+
+        return resolved
+
+    async def delete_client(self, client_id: int) -> None:
+        await self.client_repo.delete(client_id=client_id)
+        self.client_id_cache.invalidate_client(client_id)
     
     async def add_client_to_course(self, junction: ClientToCourseCreate) -> ClientToCourseRead:
         return await self.s_to_c_repo.add(
@@ -49,5 +93,32 @@ class ClientService(ClientServiceProtocol):
     async def get_student_knowledge_score(self, student_id: int, concept_name: str) -> StudentKnowledgeRead:
         return await self.s_k_repo.get(student_id=student_id, concept_name=concept_name)
     
+    async def get_knowledge_state(self, student_id: Optional[int], concepts: List[str], default: float = 0.5) -> Dict[str, float]:
+        states = await self.get_knowledge_states(student_ids=[] if student_id is None else [student_id], concepts=concepts, default=default)
+        return states.get(student_id, {concept: default for concept in concepts})
+
+    async def get_knowledge_states(self, student_ids: List[int], concepts: List[str], default: float = 0.5) -> Dict[int, Dict[str, float]]:
+        scores = await self.s_k_repo.get_scores(student_ids=student_ids, concept_list=concepts) if student_ids and concepts else {}
+        return {
+            student_id: {concept: scores.get(student_id, {}).get(concept, default) for concept in concepts}
+            for student_id in student_ids
+        }
+    
+    async def get_knowledge_history(
+            self, 
+            student_id: int, 
+            concepts: Optional[List[str]] = None, 
+            start: Optional[datetime] = None, 
+            end: Optional[datetime] = None, 
+            resolution: HistoryResolution = HistoryResolution.day
+    ) -> List[StudentKnowledgeSeries]:
+        history = await self.s_k_repo.get_history(
+            student_id=student_id, concept_list=concepts, start=start, end=end, resolution=resolution
+            )
+        return [
+            StudentKnowledgeSeries(concept_name=concept_name, resolution=resolution, points=points)
+            for concept_name, points in history.items()
+        ]
+    
     async def get_student_model_from_concepts(self, concepts: ConceptBulkRead, student_id: int) -> List[StudentKnowledgeRead]:
         return await self.s_k_repo.get_many(concepts=concepts, student_id=student_id)
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+from app.config.environment import get_settings
+
+_SETTINGS = get_settings()
+
+
+class ClientIdCache:
+    """
+    LRU cache with a TTL mapping hashed LTI platform ids to internal client ids.
+    A platform id only ever maps to one client, entries are dropped when that client is deleted through
+    ClientService.delete_client.
+
+    The cache is per process: deleting a client only invalidates the cache of the process that handled the
+    deletion, other workers keep the stale id until their entry expires, so the TTL bounds how long they do.
+    Events they write for the deleted client in that window are dead-lettered by TriggerEventRepository.bulk_insert.
+    """
+    def __init__(self, max_size: int = _SETTINGS.CLIENT_ID_CACHE_SIZE, ttl: float = _SETTINGS.CLIENT_ID_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._platform_ids: Dict[int, Set[str]] = {}
+        self._lock = Lock()
+
+    def get(self, platform_id: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(platform_id)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._pop(platform_id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(platform_id)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, platform_id: str, client_id: int):
+        with self._lock:
+            if platform_id in self._entries:
+                self._pop(platform_id)
+
+            self._entries[platform_id] = (client_id, time.monotonic() + self.ttl)
+            self._platform_ids.setdefault(client_id, set()).add(platform_id)
+
+            while len(self._entries) > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate_client(self, client_id: int):
+        with self._lock:
+            for platform_id in list(self._platform_ids.get(client_id, ())):
+                self._pop(platform_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._platform_ids.clear()
+
+    def _pop(self, platform_id: str):
+        client_id, _ = self._entries.pop(platform_id)
+        platform_ids = self._platform_ids.get(client_id)
+        if platform_ids is not None:
+            platform_ids.discard(platform_id)
+            if not platform_ids:
+                del self._platform_ids[client_id]
+
+
+_client_id_cache = ClientIdCache()
+
+
+def get_client_id_cache() -> ClientIdCache:
+    """
+    Returns the process-wide client id cache, usable as a FastAPI dependency.
+    """
+    return _client_id_cache
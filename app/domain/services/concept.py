@@ -1,4 +1,4 @@
-from typing import List, Union, Literal, Set, Optional, Dict
+from typing import AsyncIterator, List, Union, Literal, Set, Optional, Dict
 from fastapi import Depends
 
 from app.domain.models.concept import (
@@ -8,12 +8,16 @@ from app.domain.models.concept import (
     ConceptToCollectionRead,
     ConceptToCollectionCreate,
     ConceptToConceptCreate,
+    ConceptToConceptBulkRead,
     ConceptToConceptRead,
     ConceptBulkRead,
     ConceptFilter,
     ConceptReadVerbose,
+    ConceptPage,
+    ConceptMatch,
     ConceptToCollectionDelete,
     ConceptToConceptDelete,
+    ConceptToConceptTreeRead,
     ConceptReadPreformatted
     )
 from app.domain.protocols.repositories.concept import (
@@ -31,6 +35,10 @@ from app.infrastructure.database.repositories.concept import (
     ConceptToModuleRepository,
     ConceptToConceptRepository
     )
+from app.domain.services.concept_graph import ConceptGraphIndex, get_concept_graph
+from app.config.environment import get_settings
+
+_SETTINGS = get_settings()
 
 
 class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServiceProtocol):
@@ -39,11 +47,13 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
         concept_repo: ConceptRepoProtocol = Depends(ConceptRepository),
         c_to_m_repo: CToMRepoProtocol = Depends(ConceptToModuleRepository),
         c_to_c_repo: CToCRepoProtocol = Depends(ConceptToConceptRepository),
+        concept_graph: ConceptGraphIndex = Depends(get_concept_graph),
     ):
         
         self.concept_repo = concept_repo
         self.c_to_m_repo = c_to_m_repo
         self.c_to_c_repo = c_to_c_repo
+        self.concept_graph = concept_graph
     
 
     async def create_concept(self, concept: ConceptCreate) -> ConceptRead:
@@ -63,23 +73,27 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
         return await self.concept_repo.get_many(filters=filters, read_mode=read_mode)
 
 
+    async def get_concept_page(self, filters: ConceptFilter, after: Optional[str] = None, limit: int = 100, read_mode: Literal["normal", "verbose"] = "normal") -> ConceptPage:
+        return await self.concept_repo.get_page(filters=filters, after=after, limit=limit, read_mode=read_mode)
+
+
+    def stream_concepts(self, filters: ConceptFilter, read_mode: Literal["normal", "verbose"] = "normal") -> AsyncIterator[Union[ConceptRead, ConceptReadVerbose]]:
+        return self.concept_repo.stream(filters=filters, read_mode=read_mode)
+
+
     async def check_if_concepts_exist(self, concept_names: List[str]) -> dict:
         return await self.concept_repo.exists(concept_names=concept_names)
+
+
+    async def check_if_concepts_exist_fuzzy(self, concept_names: List[str], threshold: Optional[float] = None) -> List[ConceptMatch]:
+        threshold = _SETTINGS.CONCEPT_FUZZY_MATCH_THRESHOLD if threshold is None else threshold
+        return await self.concept_repo.exists_fuzzy(concept_names=concept_names, threshold=threshold)
     
 
-    async def get_all_concepts_from_collections(self, collection_ids:Set[int], course_id=Optional[int]) -> Dict[str, ConceptReadPreformatted]:
-        concepts = {}
-        for collection_id in collection_ids:
-            concept_filter = ConceptFilter(course_id=course_id, module_id=collection_id)
-            results_list = await self.concept_repo.get_many(filters=concept_filter, read_mode="verbose")
-            for concept_item in results_list:
-                if concepts.get(concept_item.name) is not None:
-                    concepts[concept_item.name].module.append(collection_id) 
-                    
-                else:
-                    concepts[concept_item.name] = ConceptReadPreformatted(**concept_item.model_dump(), module=[collection_id], id=concept_item.name)
-        
-        return concepts 
+    async def get_all_concepts_from_collections(self, collection_ids:Set[int], course_id: Optional[int] = None) -> Dict[str, ConceptReadPreformatted]:
+        if not collection_ids:
+            return {}
+        return await self.concept_repo.get_many_by_collections(collection_ids=collection_ids, course_id=course_id)
 
 
     async def init_module_concepts(
@@ -102,7 +116,9 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
         else:
             all_concepts = concept_results.success
 
-        module_junctions = [ConceptToCollectionCreate(concept_name=val.name, collection_id=module_id) for val in all_concepts if val.name in module_concepts]
+        # Both junction writers insert their whole batch in a single statement and skip existing junctions
+        module_concept_names = set(module_concepts)
+        module_junctions = [ConceptToCollectionCreate(concept_name=val.name, collection_id=module_id) for val in all_concepts if val.name in module_concept_names]
 
         await self.bulk_create_module_junctions(junctions=module_junctions)
 
@@ -112,12 +128,17 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
 
     async def delete_one_concept(self, concept_name: str) -> None:
         await self.concept_repo.delete_one(concept_name=concept_name)
+        # Junctions are removed by the FK cascade
+        self.concept_graph.invalidate()
 
     async def update_one_concept(self, concept_name: str, updated_concept: ConceptCreate) -> ConceptRead:
-        return await self.concept_repo.update_one(
+        result = await self.concept_repo.update_one(
             concept_name=concept_name,
             updated_concept_object=updated_concept
         )
+        # A rename is propagated to the junctions by the FK cascade
+        self.concept_graph.invalidate()
+        return result
 
     # ConceptToModule Service
     async def create_module_junction(self, junction: ConceptToCollectionCreate) -> ConceptToCollectionRead:
@@ -133,30 +154,44 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
 
     async def get_all_prereqs_of_module(self, module_id: int)-> ConceptBulkRead:
         module_concepts = await self.c_to_m_repo.get_all(module_id=module_id)
-        module_concept_junctions = await self.c_to_c_repo.get_some(concepts=module_concepts)
+        concept_graph = await self.concept_graph.ensure_loaded(self.c_to_c_repo)
 
-        module_concept_list = [val.name for val in module_concepts.concepts]
-        prereq_list = list(set([val.prereq_name for val in module_concept_junctions]))
+        # Concepts of the module are excluded from the result by the index
+        prereq_list = concept_graph.prerequisites([val.name for val in module_concepts.concepts])
 
-        return ConceptBulkRead(concepts=[ConceptRead(name=val) for val in prereq_list if val not in module_concept_list])
+        return ConceptBulkRead(concepts=[ConceptRead(name=val) for val in prereq_list])
 
 
-    async def delete_module_junctions(self, junctions: List[ConceptToCollectionDelete]):
-        await self.c_to_m_repo.delete(junctions=junctions)
+    async def delete_module_junctions(self, junctions: List[ConceptToCollectionDelete]) -> int:
+        return await self.c_to_m_repo.delete(junctions=junctions)
 
 
     # ConceptToConcept Service
     async def create_concept_junction(self, junction: ConceptToConceptCreate) -> ConceptToConceptRead:
-        return await self.c_to_c_repo.add(junction=junction)
-
-    async def bulk_create_concept_junctions(self, junctions: List[ConceptToConceptCreate]) -> List[ConceptToConceptRead]:
-        return await self.c_to_c_repo.bulk_add(junctions=junctions)
+        result = await self.c_to_c_repo.add(junction=junction)
+        self.concept_graph.add_edges([(result.concept_name, result.prereq_name)])
+        return result
+
+    async def bulk_create_concept_junctions(self, junctions: List[ConceptToConceptCreate]) -> ConceptToConceptBulkRead:
+        results = await self.c_to_c_repo.bulk_add(junctions=junctions)
+        self.concept_graph.add_edges([(val.concept_name, val.prereq_name) for val in results.success])
+        return results
     
     async def get_concept_junctions(self, concepts: List[ConceptRead], junction_direction: Literal["up", "down", "both"]="down") -> List[ConceptToConceptRead]:
         return await self.c_to_c_repo.get_some(concepts=concepts, junction_direction=junction_direction)
 
-    async def delete_junctions(self, junctions: List[ConceptToConceptDelete]):
-        await self.c_to_c_repo.delete(junctions=junctions)
+    async def get_concept_junction_tree(
+            self, 
+            concepts: List[ConceptRead], 
+            junction_direction: Literal["up", "down"] = "down",
+            max_depth: int = 3
+    ) -> List[ConceptToConceptTreeRead]:
+        return await self.c_to_c_repo.get_tree(concepts=concepts, junction_direction=junction_direction, max_depth=max_depth)
+
+    async def delete_junctions(self, junctions: List[ConceptToConceptDelete]) -> int:
+        deleted = await self.c_to_c_repo.delete(junctions=junctions)
+        self.concept_graph.remove_edges([(val.concept_name, val.prereq_name) for val in junctions])
+        return deleted
 
     async def update_one_junction(
             self,
@@ -175,6 +210,9 @@ class ConceptService(ConceptServiceProtocol, CToCcServiceProtocol, CToCServicePr
         Returns:
             Updated Concept to Concept Junction
         """
-        return await self.c_to_c_repo.update_one(
+        result = await self.c_to_c_repo.update_one(
             junction=junction, updated_junction=updated_junction
         )
+        self.concept_graph.remove_edges([(junction.concept_name, junction.prereq_name)])
+        self.concept_graph.add_edges([(result.concept_name, result.prereq_name)])
+        return result
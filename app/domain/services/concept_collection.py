@@ -12,6 +12,10 @@ from app.domain.models.concept_collection import CollectionCreate, CollectionRea
 from app.domain.models.concept import ConceptRead, ConceptToCollectionCreate
 from app.domain.protocols.services.concept import ConceptService as ConceptServiceProtocol, ConceptToModuleService as CToMProtocol
 from .concept import ConceptService
+from .concept_graph import get_concept_graph
+from app.infrastructure.database.db import DBSession
+from app.infrastructure.database.repositories.concept import ConceptRepository, ConceptToModuleRepository, ConceptToConceptRepository
+from app.infrastructure.database.repositories.course import CourseRepository
 
 from app.domain.protocols.services.course import CourseService as CourseServiceProtocol
 from app.domain.services.course import CourseService
@@ -36,12 +40,30 @@ class CollectionService(CollectionServiceProtocol):
         self.concept_service = concept_service
         self.course_service = course_service
 
+    @classmethod
+    def for_session(cls, db: DBSession) -> "CollectionService":
+        """
+        Builds the service and its dependencies on db, for use outside of a request (LLM jobs).
+        """
+        concept_service = ConceptService(
+            concept_repo=ConceptRepository(db=db),
+            c_to_m_repo=ConceptToModuleRepository(db=db),
+            c_to_c_repo=ConceptToConceptRepository(db=db),
+            concept_graph=get_concept_graph()
+        )
+        return cls(
+            collection_repo=CollectionRepository(db=db),
+            concept_service=concept_service,
+            course_service=CourseService(course_repo=CourseRepository(db=db), concept_service=concept_service)
+        )
+
     async def generate_module_summary(
             self,
             model_name: str,
             form_data: ModuleForm,
             prompt: str,
-            files: List[UploadFile]
+            files: List[UploadFile],
+            bypass_cache: bool = False
     ) -> str:
         llm_agent = LLMAgent(content_files=files)
         
@@ -49,7 +71,8 @@ class CollectionService(CollectionServiceProtocol):
         c_func = ContingencyFunctions(validators=validators, formatter=format_as_string)
         content_summary = await llm_agent.execute(action="summarize", contingency_functions=c_func, params = {
             "model_name": model_name,
-            "prompt": prompt})
+            "prompt": prompt,
+            "bypass_cache": bypass_cache})
 
         return {
             "summary": content_summary
@@ -61,6 +84,7 @@ class CollectionService(CollectionServiceProtocol):
             form_data: ModuleForm, 
             prompt: str,
             files: List[UploadFile],
+            bypass_cache: bool = False
     ) -> List[str]:
         llm_agent = LLMAgent(content_files=files, course_id=form_data.course_id)
         
@@ -80,7 +104,8 @@ class CollectionService(CollectionServiceProtocol):
                     "subject": "comp-sci", 
                     "difficulty": 1, 
                     "model_name": model_name,
-                    "prompt": prompt}
+                    "prompt": prompt,
+                    "bypass_cache": bypass_cache}
         )
         
         module_concepts = llm_concept_result
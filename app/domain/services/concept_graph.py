@@ -0,0 +1,201 @@
+import asyncio
+import time
+import logging
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config.environment import get_settings
+from app.domain.protocols.repositories.concept import ConceptToConceptRepository as CToCRepoProtocol
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+# (concept_name, prereq_name), the same orientation as the concept_to_concept table
+Edge = Tuple[str, str]
+
+
+class ConceptGraphIndex:
+    """
+    In-memory index of the concept_to_concept prerequisite graph.
+
+    Concept names are mapped to integer ids and the adjacency is stored twice in CSR form (an offsets array and a
+    flat neighbours array), once pointing at prerequisites and once pointing at dependents. Writes go to the
+    edge set and mark the index dirty, the CSR arrays are rebuilt on the next read.
+    The index reloads itself from the database once it is older than max_age seconds so changes made by other
+    processes are picked up.
+    """
+    def __init__(self, max_age: float = _SETTINGS.CONCEPT_GRAPH_MAX_AGE):
+        self.max_age = max_age
+        self._edges: Set[Edge] = set()
+        self._loaded_at: Optional[float] = None
+        self._dirty = True
+        self._load_lock: Optional[asyncio.Lock] = None
+
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._prereq_offsets = array("i", [0])
+        self._prereq_targets = array("i")
+        self._dependent_offsets = array("i", [0])
+        self._dependent_targets = array("i")
+
+    # Maintenance
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or (time.monotonic() - self._loaded_at) > self.max_age
+
+    async def ensure_loaded(self, c_to_c_repo: CToCRepoProtocol) -> "ConceptGraphIndex":
+        """
+        Loads the graph from the database when it has never been loaded or has expired.
+        """
+        if not self.is_stale():
+            return self
+
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+
+        async with self._load_lock:
+            if self.is_stale():
+                self.load(await c_to_c_repo.get_all_junctions())
+                logger.info(f"Concept graph index loaded with {len(self._edges)} junctions")
+
+        return self
+
+    def load(self, edges: Iterable[Edge]):
+        self._edges = set(edges)
+        self._loaded_at = time.monotonic()
+        self._dirty = True
+
+    def add_edges(self, edges: Iterable[Edge]):
+        self._edges.update(edges)
+        self._dirty = True
+
+    def remove_edges(self, edges: Iterable[Edge]):
+        self._edges.difference_update(edges)
+        self._dirty = True
+
+    def invalidate(self):
+        """
+        Forces a reload on next use, used when a change cascades to junctions in ways the index can't follow (concept rename or delete).
+        """
+        self._loaded_at = None
+
+    def _rebuild(self):
+        if not self._dirty:
+            return
+
+        names = sorted({name for edge in self._edges for name in edge})
+        ids = {name: i for i, name in enumerate(names)}
+
+        prereq_counts = [0] * len(names)
+        dependent_counts = [0] * len(names)
+        for concept_name, prereq_name in self._edges:
+            prereq_counts[ids[concept_name]] += 1
+            dependent_counts[ids[prereq_name]] += 1
+
+        prereq_offsets = array("i", [0] * (len(names) + 1))
+        dependent_offsets = array("i", [0] * (len(names) + 1))
+        for i in range(len(names)):
+            prereq_offsets[i + 1] = prereq_offsets[i] + prereq_counts[i]
+            dependent_offsets[i + 1] = dependent_offsets[i] + dependent_counts[i]
+
+        prereq_targets = array("i", [0] * len(self._edges))
+        dependent_targets = array("i", [0] * len(self._edges))
+        prereq_fill = array("i", prereq_offsets[:-1])
+        dependent_fill = array("i", dependent_offsets[:-1])
+        for concept_name, prereq_name in sorted(self._edges):
+            concept_id, prereq_id = ids[concept_name], ids[prereq_name]
+            prereq_targets[prereq_fill[concept_id]] = prereq_id
+            prereq_fill[concept_id] += 1
+            dependent_targets[dependent_fill[prereq_id]] = concept_id
+            dependent_fill[prereq_id] += 1
+
+        self._ids, self._names = ids, names
+        self._prereq_offsets, self._prereq_targets = prereq_offsets, prereq_targets
+        self._dependent_offsets, self._dependent_targets = dependent_offsets, dependent_targets
+        self._dirty = False
+
+    # Queries
+
+    def _walk(self, concepts: Iterable[str], upward: bool, depth: Optional[int]) -> List[str]:
+        self._rebuild()
+        if upward:
+            offsets, targets = self._prereq_offsets, self._prereq_targets
+        else:
+            offsets, targets = self._dependent_offsets, self._dependent_targets
+
+        frontier = [self._ids[name] for name in concepts if name in self._ids]
+        seen = set(frontier)
+        found = []
+        level = 0
+
+        while frontier and (depth is None or level < depth):
+            next_frontier = []
+            for node in frontier:
+                for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        next_frontier.append(neighbour)
+                        found.append(self._names[neighbour])
+            frontier = next_frontier
+            level += 1
+
+        return found
+
+    def prerequisites(self, concepts: Iterable[str], depth: Optional[int] = 1) -> List[str]:
+        """
+        Returns the prerequisites of the given concepts up to depth hops away (depth=None for all ancestors),
+        closest first. The given concepts themselves are not included.
+        """
+        return self._walk(concepts, upward=True, depth=depth)
+
+    def dependents(self, concepts: Iterable[str], depth: Optional[int] = 1) -> List[str]:
+        """
+        Returns the concepts that depend on the given concepts up to depth hops away (depth=None for all descendants),
+        closest first. The given concepts themselves are not included.
+        """
+        return self._walk(concepts, upward=False, depth=depth)
+
+    def learning_order(self, concepts: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Returns the given concepts (all indexed concepts by default) ordered so every concept comes after its prerequisites.
+        Concepts that are part of a cycle are appended at the end in name order.
+        """
+        self._rebuild()
+        if concepts is None:
+            nodes = set(range(len(self._names)))
+            extra = []
+        else:
+            concepts = list(dict.fromkeys(concepts))
+            nodes = {self._ids[name] for name in concepts if name in self._ids}
+            extra = [name for name in concepts if name not in self._ids]
+
+        in_degree = {
+            node: sum(1 for prereq in self._prereq_targets[self._prereq_offsets[node]:self._prereq_offsets[node + 1]] if prereq in nodes)
+            for node in nodes
+        }
+        queue = deque(sorted((node for node, degree in in_degree.items() if degree == 0), key=self._names.__getitem__))
+        order = []
+
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for dependent in self._dependent_targets[self._dependent_offsets[node]:self._dependent_offsets[node + 1]]:
+                if dependent in in_degree:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        queue.append(dependent)
+
+        ordered = set(order)
+        cyclic = sorted((node for node in nodes if node not in ordered), key=self._names.__getitem__)
+        return sorted(extra) + [self._names[node] for node in order + cyclic]
+
+
+_concept_graph = ConceptGraphIndex()
+
+
+def get_concept_graph() -> ConceptGraphIndex:
+    """
+    Returns the process-wide concept graph index, usable as a FastAPI dependency.
+    """
+    return _concept_graph
@@ -0,0 +1,197 @@
+""" This file contains the knowledge update strategies applied to batches of trigger events. """
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from app.config.environment import get_settings
+
+_SETTINGS = get_settings()
+
+
+@dataclass
+class KnowledgeState:
+    """
+    Knowledge of a set of (student, concept) pairs, one array entry per pair.
+    numerator and denominator are the weighted sums of the answers seen so far and are kept by every strategy,
+    score is the strategy's mastery estimate in [0, 1].
+    """
+    numerator: np.ndarray
+    denominator: np.ndarray
+    score: np.ndarray
+    no_of_inputs: np.ndarray
+
+
+class KnowledgeUpdateStrategy(ABC):
+    """
+    Base class of the knowledge update strategies.
+
+    step applies one event to each of the pairs in idx (every pair at most once), apply folds a whole batch by calling
+    step once per round: round k applies the k-th event, in order, of every pair, so each round is one vectorised
+    update and the cost of a batch only depends on the longest run of events for a single pair.
+    """
+    name: str
+
+    @abstractmethod
+    def step(self, state: KnowledgeState, idx: np.ndarray, values: np.ndarray, weights: np.ndarray) -> None:
+        ...
+
+    def apply(self, state: KnowledgeState, pairs: np.ndarray, values: np.ndarray, weights: np.ndarray, order: np.ndarray) -> None:
+        if len(pairs) == 0:
+            return
+
+        sort = np.lexsort((order, pairs))
+        pairs, values, weights = pairs[sort], values[sort], weights[sort]
+
+        starts = np.flatnonzero(np.r_[True, pairs[1:] != pairs[:-1]])
+        counts = np.diff(np.r_[starts, len(pairs)])
+        rank = np.arange(len(pairs)) - np.repeat(starts, counts)
+
+        for round_ in range(counts.max()):
+            mask = rank == round_
+            self.step(state, pairs[mask], values[mask], weights[mask])
+
+    @staticmethod
+    def accumulate(state: KnowledgeState, idx: np.ndarray, values: np.ndarray, weights: np.ndarray) -> None:
+        state.numerator[idx] += weights * values
+        state.denominator[idx] += weights
+        state.no_of_inputs[idx] += 1
+
+
+class WeightedMeanStrategy(KnowledgeUpdateStrategy):
+    """
+    Score is the weighted mean of all answers, seeded with the prior. Order independent, so a batch is folded in one pass.
+    """
+    name = "weighted_mean"
+
+    def step(self, state: KnowledgeState, idx: np.ndarray, values: np.ndarray, weights: np.ndarray) -> None:
+        self.accumulate(state, idx, values, weights)
+        state.score[idx] = state.numerator[idx] / state.denominator[idx]
+
+    def apply(self, state: KnowledgeState, pairs: np.ndarray, values: np.ndarray, weights: np.ndarray, order: np.ndarray) -> None:
+        size = len(state.score)
+        state.numerator += np.bincount(pairs, weights=weights * values, minlength=size)
+        state.denominator += np.bincount(pairs, weights=weights, minlength=size)
+        state.no_of_inputs += np.bincount(pairs, minlength=size)
+        touched = np.unique(pairs)
+        state.score[touched] = state.numerator[touched] / state.denominator[touched]
+
+
+class EloStrategy(KnowledgeUpdateStrategy):
+    """
+    Elo style update in logit space: the score moves towards the answer by k * weight * (value - score),
+    with k shrinking as 1 / (1 + decay * no_of_inputs) so early answers move the estimate most.
+    """
+    name = "elo"
+
+    def __init__(self, k: float = 1.0, decay: float = 0.05):
+        self.k = k
+        self.decay = decay
+
+    def step(self, state: KnowledgeState, idx: np.ndarray, values: np.ndarray, weights: np.ndarray) -> None:
+        score = np.clip(state.score[idx], 1e-4, 1 - 1e-4)
+        k = self.k / (1 + self.decay * state.no_of_inputs[idx])
+        logit = np.log(score / (1 - score)) + k * weights * (values - score)
+        state.score[idx] = 1 / (1 + np.exp(-logit))
+        self.accumulate(state, idx, values, weights)
+
+
+class BKTStrategy(KnowledgeUpdateStrategy):
+    """
+    Bayesian Knowledge Tracing: score is P(mastered). Each answer updates it with Bayes' rule given slip and guess
+    probabilities, then the chance of learning (transit) is applied. Fractional values mix the correct and incorrect
+    posteriors, the weight (clipped to [0, 1]) scales how far the estimate moves towards the posterior.
+    """
+    name = "bkt"
+
+    def __init__(self, p_transit: float = 0.1, p_slip: float = 0.1, p_guess: float = 0.2):
+        self.p_transit = p_transit
+        self.p_slip = p_slip
+        self.p_guess = p_guess
+
+    def step(self, state: KnowledgeState, idx: np.ndarray, values: np.ndarray, weights: np.ndarray) -> None:
+        p = state.score[idx]
+        if_correct = p * (1 - self.p_slip) / (p * (1 - self.p_slip) + (1 - p) * self.p_guess)
+        if_incorrect = p * self.p_slip / (p * self.p_slip + (1 - p) * (1 - self.p_guess))
+        posterior = values * if_correct + (1 - values) * if_incorrect
+        posterior = p + np.clip(weights, 0.0, 1.0) * (posterior - p)
+        state.score[idx] = posterior + (1 - posterior) * self.p_transit
+        self.accumulate(state, idx, values, weights)
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (WeightedMeanStrategy, EloStrategy, BKTStrategy)}
+
+Pair = Tuple[int, str]
+
+
+class KnowledgeEngine:
+    """
+    Applies batches of trigger events to student knowledge rows with a KnowledgeUpdateStrategy.
+    Pairs without a stored row start explicitly from the prior.
+    """
+    def __init__(
+            self,
+            strategy: KnowledgeUpdateStrategy,
+            prior_numerator: float = 0.5,
+            prior_denominator: float = 1.0
+    ):
+        self.strategy = strategy
+        self.prior_numerator = prior_numerator
+        self.prior_denominator = prior_denominator
+
+    def update(self, events: Sequence[Mapping], knowledge: Sequence[Mapping]) -> List[Dict]:
+        """
+        events: rows with student_id, concept, value, weight and event_id (used to order events of the same pair).
+        knowledge: the stored student_knowledge rows of the pairs in events.
+        Returns the new student_knowledge rows of every pair in events.
+        """
+        if not events:
+            return []
+
+        pair_index: Dict[Pair, int] = {}
+        pairs = np.fromiter(
+            (pair_index.setdefault((event["student_id"], event["concept"]), len(pair_index)) for event in events),
+            dtype=np.int64, count=len(events)
+            )
+
+        size = len(pair_index)
+        state = KnowledgeState(
+            numerator=np.full(size, self.prior_numerator, dtype=np.float64),
+            denominator=np.full(size, self.prior_denominator, dtype=np.float64),
+            score=np.full(size, self.prior_numerator / self.prior_denominator, dtype=np.float64),
+            no_of_inputs=np.zeros(size, dtype=np.int64),
+        )
+        for row in knowledge:
+            i = pair_index.get((row["student_id"], row["concept_name"]))
+            if i is None:
+                continue
+            state.numerator[i] = row["numerator"]
+            state.denominator[i] = row["denominator"]
+            state.score[i] = row["score"]
+            state.no_of_inputs[i] = row["no_of_inputs"] or 0
+
+        self.strategy.apply(
+            state,
+            pairs,
+            np.fromiter((event["value"] for event in events), dtype=np.float64, count=len(events)),
+            np.fromiter((event["weight"] for event in events), dtype=np.float64, count=len(events)),
+            np.fromiter((event["event_id"] for event in events), dtype=np.int64, count=len(events)),
+        )
+        np.clip(state.score, 0.0, 1.0, out=state.score)
+
+        return [
+            {
+                "student_id": student_id,
+                "concept_name": concept_name,
+                "numerator": float(state.numerator[i]),
+                "denominator": float(state.denominator[i]),
+                "score": float(state.score[i]),
+                "no_of_inputs": int(state.no_of_inputs[i]),
+            }
+            for (student_id, concept_name), i in pair_index.items()
+        ]
+
+
+def get_knowledge_engine(strategy: str = _SETTINGS.KNOWLEDGE_UPDATE_STRATEGY) -> KnowledgeEngine:
+    return KnowledgeEngine(strategy=STRATEGIES[strategy]())
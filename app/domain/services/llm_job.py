@@ -0,0 +1,36 @@
+from fastapi import Depends
+
+from app.app.errors.db_error import DBError
+
+from app.domain.models.llm_job import LLMJob, LLMJobRead, LLMJobResult
+from app.domain.protocols.repositories.llm_job import LLMJobRepository as LLMJobRepoProtocol
+from app.domain.protocols.services.llm_job import LLMJobService as LLMJobServiceProtocol
+from app.infrastructure.database.repositories.llm_job import LLMJobRepository
+from app.infrastructure.LLM.job_queue import JobHandler, LLMJobQueue, get_llm_job_queue
+
+
+class LLMJobService(LLMJobServiceProtocol):
+    def __init__(
+            self,
+            job_repo: LLMJobRepoProtocol = Depends(LLMJobRepository),
+            job_queue: LLMJobQueue = Depends(get_llm_job_queue)
+    ):
+        self.job_repo = job_repo
+        self.job_queue = job_queue
+
+    async def submit_job(self, kind: str, course_id: int, handler: JobHandler) -> LLMJobRead:
+        job = await self.job_queue.submit(kind=kind, course_id=course_id, handler=handler)
+        return LLMJobRead.model_validate(job)
+
+    async def _get_course_job(self, job_id: str, course_id: int) -> LLMJob:
+        job = await self.job_repo.get_one(job_id=job_id)
+        # jobs of other courses answer like missing ones so job ids can't be probed
+        if job.course_id != course_id:
+            raise DBError(origin="LLMJobService.get_job", type="NoResultFound", status_code=404, message=f"LLM job with ID: {job_id} not found.")
+        return job
+
+    async def get_job(self, job_id: str, course_id: int) -> LLMJobRead:
+        return LLMJobRead.model_validate(await self._get_course_job(job_id=job_id, course_id=course_id))
+
+    async def get_job_result(self, job_id: str, course_id: int) -> LLMJobResult:
+        return LLMJobResult.model_validate(await self._get_course_job(job_id=job_id, course_id=course_id))
@@ -6,6 +6,7 @@ from fastapi_lti1p3.errors import ClientIdError
 
 from app.domain.models.platform_config import PlatformConfigCreate, PlatformConfigRead
 from app.infrastructure.database.repositories.platform_config import PlatformConfigRepository
+from app.infrastructure.database.db import get_async_db
 from app.domain.protocols.repositories.platform_config import PlatformConfigRepository as PlatformConfigRepoProtocol
 from app.domain.protocols.services.platform_config import PlatformConfigService as PlatformConfigServiceProtocol
 
@@ -28,11 +29,12 @@ class PlatformConfigService(PlatformConfigServiceProtocol):
     
 
 async def get_config_lti_adapter(client_id: str) -> PlatformConfigSettings:
-    platform_config_repo = PlatformConfigRepository()
-    try:
-        settings = await platform_config_repo.get(client_id=client_id)
-        
-    except Exception as e:
-        raise ClientIdError(message="Unauthorized Client ID", status_code=403) from e
+    async with get_async_db() as db:
+        platform_config_repo = PlatformConfigRepository(db=db)
+        try:
+            settings = await platform_config_repo.get(client_id=client_id)
+            
+        except Exception as e:
+            raise ClientIdError(message="Unauthorized Client ID", status_code=403) from e
     
     return PlatformConfigSettings(**dict(settings))
@@ -1,13 +1,12 @@
 # app/domain/services/prompt.py
 from typing import List, Optional
-from sqlmodel import Session
 from fastapi import Depends
 from app.domain.models.prompt import PromptCreate, PromptRead, PromptUpdate
 from app.infrastructure.database.repositories.prompt import PromptRepository
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session
 
 class PromptService:
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: DBSession = Depends(get_async_session)):
         self.prompt_repository = PromptRepository(db)
 
     async def create_prompt(self, id: str, editable_part: str, fixed_part: str) -> PromptRead:
@@ -5,16 +5,27 @@ from app.infrastructure.database.repositories.trigger_event import TriggerEventR
 from app.domain.protocols.repositories.trigger_event import TriggerEventRepository as TriggerEventRepoProtocol
 from app.domain.protocols.services.trigger_event import TriggerEventService as TriggerEventServiceProtocol
 from app.domain.models.trigger_event import TriggerEventCreate, TriggerEventRead
+from app.infrastructure.event_processor.process_manager import notify_trigger_events
+from app.infrastructure.event_processor.ingestion_buffer import TriggerEventBuffer, get_trigger_event_buffer
 
 class TriggerEventService(TriggerEventServiceProtocol):
     def __init__(
         self, 
-        trigger_event_repo: TriggerEventRepoProtocol = Depends(TriggerEventRepository)
+        trigger_event_repo: TriggerEventRepoProtocol = Depends(TriggerEventRepository),
+        event_buffer: TriggerEventBuffer = Depends(get_trigger_event_buffer)
     ):
         self.trigger_event_repo = trigger_event_repo
+        self.event_buffer = event_buffer
 
     async def add_event(self, event: TriggerEventCreate) -> TriggerEventRead:
-        return await self.trigger_event_repo.add(event=event)
+        result = await self.trigger_event_repo.add(event=event)
+        notify_trigger_events()
+        return result
     
     async def bulk_add_events(self, events: List[TriggerEventCreate]) -> List[TriggerEventRead]:
-        return await self.trigger_event_repo.bulk_add(events=events)
+        results = await self.trigger_event_repo.bulk_add(events=events)
+        notify_trigger_events()
+        return results
+    
+    async def queue_event(self, event: TriggerEventCreate) -> None:
+        await self.event_buffer.submit(event=event)
@@ -2,24 +2,21 @@ import os
 import fitz
 import shutil
 import json
-import httpx
-from typing import Optional, List, Union, Dict
+from typing import Optional, List, Union, Dict, Tuple
 from fastapi import UploadFile, Depends
 import logging
-from sqlmodel import select
 
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_db
+from app.infrastructure.database.repositories.prompt import PromptRepository
 from app.infrastructure.decorators.register import Register
 from app.domain.models.llm_agent import ContextCollection
 from app.domain.models.errors import ErrorResponse
 from app.domain.protocols.services.concept import ConceptService as ConceptServiceProtocol
 from app.domain.services.concept import ConceptService
-from app.domain.models.prompt import Prompt
+from .response_cache import get_llm_response_cache
+from .providers import get_model_registry
 
-from langchain_community.chat_models.openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
-from langchain_core.messages import SystemMessage, HumanMessage
 
 load_dotenv()
 
@@ -27,15 +24,23 @@ register = Register()
 
 class ActionExecutor:
 
-    def __init__(self):
+    def __init__(self, db: Optional[DBSession] = None):
         self.prompts = {}
-        self.db = get_db()
+        self.db = db
+        # (key, model, response) of the responses of the current action, cached once they pass validation
+        self.uncached_responses: List[Tuple[str, str, str]] = []
 
-    def fetch_prompts(self):
+    async def fetch_prompts(self):
         """
         Fetches the prompts from the database and stores them in a dictionary.
+        Uses the session the executor was given, otherwise a session of its own closed once the prompts are loaded.
         """
-        prompts_list = self.db.exec(select(Prompt)).all()
+        db = self.db if self.db is not None else get_async_db()
+        try:
+            prompts_list = await PromptRepository(db=db).list()
+        finally:
+            if self.db is None:
+                await db.close()
         self.prompts = {prompt.id: {"editable_part": prompt.editable_part, "fixed_part": prompt.fixed_part} for prompt in prompts_list}
         logging.debug(f"Fetched prompts: {self.prompts}")
 
@@ -49,14 +54,17 @@ class ActionExecutor:
         """
         return self.prompts.get(prompt_id, "")
 
-    async def executePrompt(self, context_prompt, action_prompt, model_name):
+    async def executePrompt(self, context_prompt, action_prompt, model_name, use_cache: bool = True):
         """
-        Executes the prompt using the specified model.
+        Executes the prompt using the specified model, answering from the LLM response cache when the same
+        prompts were already sent to the same model with the same sampling parameters. New responses are only
+        cached by cache_responses, once the action's result passed validation.
 
         Inputs:
             context_prompt (str): The context prompt.
             action_prompt (str): The action prompt.
             model_name (str): The name of the model to be used.
+            use_cache (bool): False skips the cache lookup and sends the prompt, the new result still replaces the cached one.
 
         Output:
             str: The result from the model.
@@ -64,56 +72,35 @@ class ActionExecutor:
         base_prompt = self.get_prompt_by_id("base-prompt")
         base_prompt = base_prompt["editable_part"] + base_prompt["fixed_part"] + " json"
 
-        if 'gpt' in model_name:
-            chain_gpt = ChatOpenAI(model=model_name, openai_api_key=os.getenv("OPENAI_API_KEY"), model_kwargs={"response_format": {"type": "json_object"}})
-            messages=[
-                {"role": "system", "content": base_prompt},
-                {"role": "assistant", "content": context_prompt},
-                {"role": "user", "content": action_prompt}
-            ]
-            result = await chain_gpt.ainvoke(messages)
-            return result.content
+        messages = [
+            {"role": "system", "content": base_prompt},
+            {"role": "assistant", "content": context_prompt},
+            {"role": "user", "content": action_prompt}
+        ]
+        models = get_model_registry()
 
-        elif 'gemini' in model_name:    
-            chain_gemini = ChatGoogleGenerativeAI(model=model_name, google_api_key=os.getenv("GOOGLE_API_KEY"))
-            messages=[
-                HumanMessage(content=f"{action_prompt}+ Please perform the action based on the base prompt: {base_prompt}+ context_prompt{context_prompt}")
-            ]
-            result = await chain_gemini.ainvoke(messages)
-            res = result.content
-            start_index = res.find('{')
-            end_index = res.rfind('}')
-            res = res[start_index:end_index+1]
-            return res.strip()
+        cache = get_llm_response_cache()
+        if not cache.enabled:
+            return await models.complete(model_name, messages)
 
-        elif 'llama' in model_name:
-            url = "https://traip13.dsmlp.ucsd.edu/v1/chat/completions"
-            api_key = os.getenv('TRITON_API_KEY')
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {api_key}"
-            }
-            payload = {
-                "messages": [
-                    {"role": "system", "content": base_prompt},
-                    {"role": "user", "content": context_prompt + "\n" + action_prompt}
-                ],
-                "model": "llama-3",
-                "max_tokens": 768,
-                "stream": False,
-                "n": 1,
-                "temperature": 0.2,
-                "frequency_penalty": 0.1,
-                "presence_penalty": 0.1
-            }
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
+        key = cache.make_key(model_name, base_prompt, context_prompt, action_prompt, models.sampling_params(model_name))
+        cached = await cache.get(key, bypass=not use_cache)
+        if cached is not None:
+            return cached
 
-        else:
-            raise ValueError("Unsupported AI provider")
+        result = await models.complete(model_name, messages)
+        if result:
+            self.uncached_responses.append((key, model_name, result))
+        return result
+
+    async def cache_responses(self):
+        """
+        Writes the responses of the last action to the LLM response cache, only call it once they passed validation.
+        """
+        responses, self.uncached_responses = self.uncached_responses, []
+        cache = get_llm_response_cache()
+        for key, model_name, result in responses:
+            await cache.set(key, model_name, result)
         
     @register.add(action="summarize")
     async def summarize_contents(self, context:Union[ContextCollection, ErrorResponse], params = Dict):
@@ -133,7 +120,7 @@ class ActionExecutor:
         context_prompt = f"The following is context related to the course being taught. These are the materials being taught: {context.file_contents}"      
         action_prompt = ( params.get('prompt') or '')+ summarize_prompt["fixed_part"]
         print("The action prompt is: ", action_prompt)
-        result = await self.executePrompt(context_prompt, action_prompt, model_name)
+        result = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         built_prompt = f"{context_prompt}\n{action_prompt}"
         print(built_prompt)
         return built_prompt, result
@@ -155,7 +142,7 @@ class ActionExecutor:
         createconcepts_prompt = self.get_prompt_by_id("create-concepts")
         context_prompt = f"The following is context related to the course being taught. These are the materials being taught: {context.file_contents}, These are the concepts in the database already: {context.context_concepts}" 
         action_prompt = createconcepts_prompt["editable_part"] + createconcepts_prompt["fixed_part"]
-        result = await self.executePrompt(context_prompt, action_prompt, model_name)
+        result = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         built_prompt = f"{context_prompt}\n{action_prompt}"
         print(built_prompt)
         return built_prompt, result
@@ -179,7 +166,7 @@ class ActionExecutor:
         context_prompt = f"The following is context related to the course being taught. These are the materials being taught: {context.file_contents}, These are the concepts in the database already: {context.context_concepts}" 
         action_prompt = params.get('prompt') + moduleconcepts["fixed_part"]
         
-        module_concepts = await self.executePrompt(context_prompt, action_prompt, model_name)
+        module_concepts = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         
         try:
             module_concepts_dict = json.loads(module_concepts)
@@ -208,7 +195,7 @@ class ActionExecutor:
         moduleconcepts = self.get_prompt_by_id("create-concepts")
         context_prompt = f"The following is context related to the course being taught. These are the materials being taught: {context.file_contents}, These are the concepts in the database already: {context.context_concepts}" 
         action_prompt = moduleconcepts["editable_part"] + moduleconcepts["fixed_part"]   
-        module_concepts = await self.executePrompt(context_prompt, action_prompt, model_name)
+        module_concepts = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         try:
             module_concepts_dict = json.loads(module_concepts)
         except Exception as e:
@@ -223,7 +210,7 @@ class ActionExecutor:
         context_prompt = context_prompt + f"The following are the concepts that we are focusing on: {context.focus_concepts}"
         createprereqs_prompt = self.get_prompt_by_id("create-prereqs")
         action_prompt = createprereqs_prompt["editable_part"] + createprereqs_prompt["fixed_part"]
-        prereq_concepts = await self.executePrompt(context_prompt, action_prompt, model_name)
+        prereq_concepts = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         concepts = {
             'prereq_concepts': prereq_concepts,
             'module_concepts': module_concepts
@@ -260,7 +247,7 @@ class ActionExecutor:
             action_prompt = f"Please generate {params.get('num_questions')} questions based on the focus concepts provided." + params.get('prompt') + review_question_prompt["fixed_part"]    
         else:
             print("Invalid quiz type")
-        result = await self.executePrompt(context_prompt, action_prompt, model_name)
+        result = await self.executePrompt(context_prompt, action_prompt, model_name, use_cache=not params.get('bypass_cache'))
         built_prompt = f"{context_prompt}\n{action_prompt}"
         print(built_prompt)
         return built_prompt, result
@@ -274,5 +261,6 @@ class ActionExecutor:
         Output:
             any: Result of the function execution, varies based on the action.
         """
-        self.fetch_prompts()
+        await self.fetch_prompts()
+        self.uncached_responses = []
         return await register.registered_fn[action](self=self, context=context, params=params)
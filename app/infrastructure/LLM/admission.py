@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.config.environment import get_settings
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of text (about 4 characters per token), enough to pace tokens-per-minute limits.
+    """
+    return len(text) // 4 + 1
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    # httpx and openai errors carry the response, google api_core errors an integer code
+    for candidate in (error, getattr(error, "response", None)):
+        code = getattr(candidate, "status_code", None)
+        if isinstance(code, int):
+            return code
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Rate limits, server errors, timeouts and dropped connections are retried, anything else is raised straight away.
+    """
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status_code = _status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in ("RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError", "ResourceExhausted", "ServiceUnavailable")
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Refills at rate_per_minute units per minute up to one minute's worth, acquire waits until enough units are available.
+    A rate of 0 disables the bucket.
+    """
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.level = rate_per_minute
+        self.updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, amount: float):
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # requests bigger than the bucket would never fit, they wait for a full bucket instead
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+
+class ProviderLimiter:
+    """
+    Admission control for one provider: at most max_in_flight calls at once, paced by requests-per-minute and
+    tokens-per-minute buckets, with jittered exponential backoff on retryable errors (honouring Retry-After).
+    A retried call releases its slot while it backs off.
+    """
+    def __init__(
+            self,
+            name: str,
+            max_in_flight: int = 4,
+            requests_per_minute: float = 0,
+            tokens_per_minute: float = 0,
+            max_retries: int = _SETTINGS.LLM_RETRY_MAX_RETRIES,
+            base_delay: float = _SETTINGS.LLM_RETRY_BASE_DELAY,
+            max_delay: float = _SETTINGS.LLM_RETRY_MAX_DELAY
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def _admit(self, tokens: int):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+            try:
+                await self.requests.acquire(1)
+                await self.tokens.acquire(tokens)
+            except BaseException:
+                self._slots.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.in_flight += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        attempt = 0
+        while True:
+            await self._admit(tokens)
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.failures += 1
+                    raise
+                delay = self.backoff(attempt, e)
+                logger.warning(f"{self.name} call failed ({e.__class__.__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            finally:
+                self._release()
+
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_wait_ms": (self.total_wait / self.admitted * 1000) if self.admitted else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class AdmissionController:
+    """
+    Holds one ProviderLimiter per provider, configured from LLM_PROVIDER_LIMITS. Providers without an entry get the
+    "default" limits.
+    """
+    def __init__(self, limits: Dict[str, Dict[str, float]] = _SETTINGS.LLM_PROVIDER_LIMITS):
+        self.limits = limits
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    def limiter(self, provider: str) -> ProviderLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            options = self.limits.get(provider, self.limits.get("default", {}))
+            limiter = self._limiters[provider] = ProviderLimiter(
+                name=provider,
+                max_in_flight=int(options.get("max_in_flight", 4)),
+                requests_per_minute=options.get("requests_per_minute", 0),
+                tokens_per_minute=options.get("tokens_per_minute", 0),
+            )
+        return limiter
+
+    async def run(self, provider: str, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Runs call once admitted for provider, retrying it on rate limits and transient errors.
+        """
+        return await self.limiter(provider).run(call, tokens=tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+_admission_controller = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Returns the process-wide LLM admission controller, usable as a FastAPI dependency.
+    """
+    return _admission_controller
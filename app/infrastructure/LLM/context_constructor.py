@@ -18,6 +18,8 @@ from app.domain.protocols.repositories.course import CourseRepository as CourseR
 from app.infrastructure.database.repositories.concept import ConceptRepository, ConceptToModuleRepository, ConceptToConceptRepository
 
 from app.infrastructure.database.repositories.course import CourseRepository
+from app.domain.services.concept_graph import get_concept_graph
+from app.infrastructure.database.db import get_async_db
 
 
 
@@ -34,10 +36,11 @@ class ContextConstructor:
         self.course_id = course_id
         self.module_id = module_id
         self.file_contents = content_files
-        self.concept_repo: ConceptRepositoryProtocol = ConceptRepository()
-        self.c_to_m_repo: CToMRepoProtocol = ConceptToModuleRepository()
-        self.c_to_c_repo: CToCRepoProtocol = ConceptToConceptRepository()
-        self.course_repo: CourseRepoProtocol = CourseRepository()
+        self.db = get_async_db()
+        self.concept_repo: ConceptRepositoryProtocol = ConceptRepository(db=self.db)
+        self.c_to_m_repo: CToMRepoProtocol = ConceptToModuleRepository(db=self.db)
+        self.c_to_c_repo: CToCRepoProtocol = ConceptToConceptRepository(db=self.db)
+        self.course_repo: CourseRepoProtocol = CourseRepository(db=self.db)
     
 
     @register.add(action="summarize")
@@ -87,12 +90,9 @@ class ContextConstructor:
         if params.get("quiz_type") == "prereq":
             #TODO: error handling for when module_id invalid/get_all_module_prereqs() fails
             module_concepts = await self.c_to_m_repo.get_all(module_id=self.module_id)
-            concept_junctions = await self.c_to_c_repo.get_some(concepts=module_concepts)
+            concept_graph = await get_concept_graph().ensure_loaded(self.c_to_c_repo)
 
-            module_concept_list = [val.name for val in module_concepts.concepts]
-            prereq_list = list(set([val.prereq_name for val in concept_junctions]))
-
-            concepts = [val for val in prereq_list if val not in module_concept_list]
+            concepts = concept_graph.prerequisites([val.name for val in module_concepts.concepts])
 
         else:
             #TODO: error handling for when module_id invalid/get_all_concepts_in_module() fails
@@ -106,4 +106,8 @@ class ContextConstructor:
 
 
     async def construct(self, action: str, params: Optional[Dict]={}) -> ContextCollection:
-        return await register.registered_fn[action](self=self, params=params)
\ No newline at end of file
+        try:
+            return await register.registered_fn[action](self=self, params=params)
+        finally:
+            # Returns the connection to the pool, the session stays usable for later actions
+            await self.db.close()
\ No newline at end of file
@@ -0,0 +1,120 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict
+
+import httpx
+
+from app.config.environment import get_settings
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+try:
+    import h2  # noqa: F401 httpx only speaks HTTP/2 when the h2 package is installed
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+@dataclass
+class ProviderEndpoint:
+    base_url: str
+    headers: Callable[[], Dict[str, str]] = field(default=dict)
+
+
+PROVIDER_ENDPOINTS: Dict[str, ProviderEndpoint] = {
+    "triton": ProviderEndpoint(
+        base_url=_SETTINGS.TRITON_BASE_URL,
+        headers=lambda: {"Content-Type": "application/json", "Authorization": f"Bearer {os.getenv('TRITON_API_KEY')}"}
+    ),
+}
+
+
+class ProviderClientRegistry:
+    """
+    Owns one long-lived pooled HTTP client per provider, sync and async, so calls reuse kept-alive (HTTP/2 when available)
+    connections instead of paying TCP and TLS setup every time. Clients are created on first use with the provider's
+    base_url and headers. Async clients belong to the application event loop, aclose is called on shutdown.
+    """
+    def __init__(
+            self,
+            endpoints: Dict[str, ProviderEndpoint] = PROVIDER_ENDPOINTS,
+            max_connections: int = _SETTINGS.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections: int = _SETTINGS.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry: float = _SETTINGS.LLM_HTTP_KEEPALIVE_EXPIRY,
+            timeout: float = _SETTINGS.LLM_HTTP_TIMEOUT,
+            connect_timeout: float = _SETTINGS.LLM_HTTP_CONNECT_TIMEOUT,
+            http2: bool = _SETTINGS.LLM_HTTP2
+    ):
+        self.endpoints = endpoints
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and _HTTP2_AVAILABLE
+        if http2 and not _HTTP2_AVAILABLE:
+            logger.warning("h2 is not installed, LLM provider clients fall back to HTTP/1.1")
+
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._lock = Lock()
+
+    def _options(self, provider: str) -> dict:
+        endpoint = self.endpoints.get(provider)
+        if endpoint is None:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        return {
+            "base_url": endpoint.base_url,
+            "headers": endpoint.headers(),
+            "limits": self.limits,
+            "timeout": self.timeout,
+            "http2": self.http2,
+        }
+
+    def get_async(self, provider: str) -> httpx.AsyncClient:
+        client = self._async_clients.get(provider)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._async_clients.get(provider)
+                if client is None or client.is_closed:
+                    client = self._async_clients[provider] = httpx.AsyncClient(**self._options(provider))
+        return client
+
+    def get_sync(self, provider: str) -> httpx.Client:
+        client = self._sync_clients.get(provider)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._sync_clients.get(provider)
+                if client is None or client.is_closed:
+                    client = self._sync_clients[provider] = httpx.Client(**self._options(provider))
+        return client
+
+    async def aclose(self):
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            sync_clients = list(self._sync_clients.values())
+            self._async_clients.clear()
+            self._sync_clients.clear()
+
+        for client in async_clients:
+            await client.aclose()
+        for client in sync_clients:
+            client.close()
+
+
+_provider_clients = ProviderClientRegistry()
+
+
+def get_provider_clients() -> ProviderClientRegistry:
+    """
+    Returns the process-wide LLM provider client registry, usable as a FastAPI dependency.
+    """
+    return _provider_clients
+
+
+async def close_provider_clients():
+    await _provider_clients.aclose()
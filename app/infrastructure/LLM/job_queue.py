@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import UploadFile
+from fastapi.encoders import jsonable_encoder
+
+from app.app.errors.db_error import DBError
+from app.app.errors.job_limit_error import JobLimitError
+from app.config.environment import get_settings
+from app.domain.models.llm_job import LLMJob, LLMJobStatus
+from ..database.db import DBSession, get_async_db
+from ..database.repositories.llm_job import LLMJobRepository
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+# A job receives its own session, closed once it finishes, and returns a JSON serializable result
+JobHandler = Callable[[DBSession], Awaitable[Any]]
+
+
+class JobProgress:
+    """
+    Progress reporter of the running job, progress only moves forward so jobs made of several agent runs don't jump back.
+    Failing to record progress never fails the job.
+    """
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.progress = 0.0
+
+    async def report(self, progress: float, stage: Optional[str] = None):
+        self.progress = max(self.progress, min(progress, 1.0))
+        db = get_async_db()
+        try:
+            await LLMJobRepository(db=db).report_progress(job_id=self.job_id, progress=self.progress, stage=stage)
+        except DBError:
+            pass
+        finally:
+            await db.close()
+
+
+_current_job: ContextVar[Optional[JobProgress]] = ContextVar("llm_job", default=None)
+
+
+async def report_progress(progress: float, stage: Optional[str] = None):
+    """
+    Records the progress of the LLM job running in the current context, does nothing outside of a job.
+    """
+    job = _current_job.get()
+    if job is not None:
+        await job.report(progress=progress, stage=stage)
+
+
+async def detach_uploads(files: Optional[List[UploadFile]]) -> Optional[List[UploadFile]]:
+    """
+    Copies uploaded files into memory, the request's temporary files are closed once the response is sent.
+    """
+    if files is None:
+        return None
+    return [
+        UploadFile(file=BytesIO(await file.read()), size=file.size, filename=file.filename, headers=file.headers)
+        for file in files
+    ]
+
+
+def _error_content(error: Exception) -> dict:
+    return {
+        "code": getattr(error, "status_code", 500),
+        "type": error.type if isinstance(error, DBError) else error.__class__.__name__,
+        "message": str(error)
+    }
+
+
+class LLMJobQueue:
+    """
+    Runs long LLM generations (LLMAgent.execute and the services built on it) off the request path.
+
+    submit records the job in llm_job and queues it for a fixed pool of worker tasks, so at most `workers` jobs run at once
+    in this process and at most queue_size wait. A course can have at most max_per_course queued or running jobs across all
+    processes, further submissions raise JobLimitError. Jobs report progress through report_progress and store their
+    result or error on the row.
+
+    Jobs only live in the memory of the process that accepted them. Every heartbeat_interval the process touches its jobs
+    and fails any job not touched for stale_after seconds, so jobs of a crashed or restarted process end up failed
+    instead of hanging.
+    """
+    def __init__(
+            self,
+            workers: int = _SETTINGS.LLM_JOB_WORKERS,
+            queue_size: int = _SETTINGS.LLM_JOB_QUEUE_SIZE,
+            max_per_course: int = _SETTINGS.LLM_JOB_MAX_PER_COURSE,
+            heartbeat_interval: float = _SETTINGS.LLM_JOB_HEARTBEAT_INTERVAL,
+            stale_after: float = _SETTINGS.LLM_JOB_STALE_AFTER
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_per_course = max_per_course
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._tracked: Set[str] = set()
+        self._running: Set[str] = set()
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._work(), name=f"llm-job-worker-{i}") for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep(), name="llm-job-sweeper"))
+
+    async def stop(self):
+        """
+        Stops the workers. Running jobs are cancelled and queued ones failed, both have to be submitted again.
+        """
+        queue, self._queue = self._queue, None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while queue is not None and not queue.empty():
+            job_id, _ = queue.get_nowait()
+            await self._finish(job_id, LLMJobStatus.failed, error={"code": 503, "type": "JobCancelled", "message": "The server stopped before the job started, please submit it again."})
+
+    async def submit(self, kind: str, course_id: int, handler: JobHandler) -> LLMJob:
+        if self._queue is None or self._queue.full():
+            self.rejected += 1
+            raise JobLimitError(message="The LLM job queue is full, try again later.", status_code=503)
+
+        db = get_async_db()
+        try:
+            job = await LLMJobRepository(db=db).add_within_course_limit(
+                job=LLMJob(id=uuid.uuid4().hex, kind=kind, course_id=course_id),
+                limit=self.max_per_course
+            )
+        finally:
+            await db.close()
+
+        if job is None:
+            self.rejected += 1
+            raise JobLimitError(message=f"Course {course_id} already has {self.max_per_course} LLM jobs in progress, try again once one finishes.")
+
+        try:
+            self._queue.put_nowait((job.id, handler))
+        except (asyncio.QueueFull, AttributeError):
+            # the queue filled up (or stopped) while the job was being recorded
+            self.rejected += 1
+            await self._finish(job.id, LLMJobStatus.failed, error={"code": 503, "type": "JobLimitError", "message": "The LLM job queue is full, try again later."})
+            raise JobLimitError(message="The LLM job queue is full, try again later.", status_code=503)
+
+        self._tracked.add(job.id)
+        self.submitted += 1
+        return job
+
+    async def _finish(self, job_id: str, status: LLMJobStatus, result: Any = None, error: Any = None):
+        self._tracked.discard(job_id)
+        db = get_async_db()
+        try:
+            await LLMJobRepository(db=db).finish(job_id=job_id, status=status, result=result, error=error)
+        except DBError:
+            # the stale sweep of a live process fails the job eventually
+            pass
+        finally:
+            await db.close()
+
+        if status == LLMJobStatus.succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    async def _work(self):
+        queue = self._queue
+        while True:
+            job_id, handler = await queue.get()
+            self._running.add(job_id)
+            try:
+                await self._run(job_id, handler)
+            finally:
+                self._running.discard(job_id)
+                self._tracked.discard(job_id)
+
+    async def _run(self, job_id: str, handler: JobHandler):
+        db = get_async_db()
+        try:
+            if not await LLMJobRepository(db=db).start(job_id=job_id):
+                return
+        except DBError:
+            await db.close()
+            return
+
+        token = _current_job.set(JobProgress(job_id=job_id))
+        try:
+            result = await handler(db)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._finish(job_id, LLMJobStatus.failed, error={"code": 503, "type": "JobCancelled", "message": "The server stopped while the job was running, please submit it again."}))
+            raise
+        except Exception as e:
+            logger.exception(msg=f"LLM job {job_id} failed")
+            await self._finish(job_id, LLMJobStatus.failed, error=_error_content(e))
+        else:
+            await self._finish(job_id, LLMJobStatus.succeeded, result=jsonable_encoder(result))
+        finally:
+            _current_job.reset(token)
+            await db.close()
+
+    async def _sweep(self):
+        while True:
+            db = get_async_db()
+            try:
+                repo = LLMJobRepository(db=db)
+                await repo.heartbeat(job_ids=list(self._tracked))
+                failed = await repo.fail_stale(stale_before=datetime.now() - timedelta(seconds=self.stale_after))
+                if failed:
+                    logger.warning(f"Failed {failed} LLM jobs that stopped heartbeating")
+            except DBError:
+                pass
+            finally:
+                await db.close()
+
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+            "max_per_course": self.max_per_course,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+_llm_job_queue = LLMJobQueue()
+
+
+def get_llm_job_queue() -> LLMJobQueue:
+    """
+    Returns the process-wide LLM job queue, usable as a FastAPI dependency.
+    """
+    return _llm_job_queue
+
+
+async def start_llm_job_queue():
+    await _llm_job_queue.start()
+
+
+async def stop_llm_job_queue():
+    await _llm_job_queue.stop()
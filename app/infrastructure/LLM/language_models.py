@@ -1,12 +1,10 @@
-import os
-import requests
-import httpx
-
 from typing import Any, Dict, List, Optional
 
 from langchain_core.language_models.llms import LLM
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun
 
+from .http_clients import get_provider_clients
+
 class TritonGPT(LLM):
     n: int = 1
     max_tokens: int = 768
@@ -14,23 +12,8 @@ class TritonGPT(LLM):
     frequency_penalty: float = 0.1
     presence_penalty: float = 0.1
 
-    def _call(
-        self,
-        prompt: str,
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> str:
-        if stop is not None:
-            raise ValueError("stop kwargs are not permitted.")
-        
-        url = "https://traip13.dsmlp.ucsd.edu/v1/chat/completions"
-        api_key = os.getenv('TRITON_API_KEY')
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        payload = {
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        return {
             "messages": prompt,
             "model": "llama-3",
             "max_tokens": self.max_tokens,
@@ -41,7 +24,17 @@ class TritonGPT(LLM):
             "presence_penalty": self.presence_penalty
         }
 
-        response = requests.post(url=url, headers=headers, json=payload)
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        if stop is not None:
+            raise ValueError("stop kwargs are not permitted.")
+        
+        response = get_provider_clients().get_sync("triton").post("/chat/completions", json=self._payload(prompt))
         response.raise_for_status()
         result = response.json()
         return result["choices"][0]["message"]["content"]
@@ -53,28 +46,10 @@ class TritonGPT(LLM):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> str:
-
-        url = "https://traip13.dsmlp.ucsd.edu/v1/chat/completions"
-        api_key = os.getenv('TRITON_API_KEY')
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        payload = {
-            "messages": prompt,
-            "model": "llama-3",
-            "max_tokens": self.max_tokens,
-            "stream": False,
-            "n": self.n,
-            "temperature": self.temperature,
-            "frequency_penalty": self.frequency_penalty,
-            "presence_penalty": self.presence_penalty
-        }
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+        response = await get_provider_clients().get_async("triton").post("/chat/completions", json=self._payload(prompt))
+        response.raise_for_status()
+        result = response.json()
+        return result["choices"][0]["message"]["content"]
         
     @property
     def _identifying_params(self) -> Dict[str, Any]:
@@ -10,9 +10,11 @@ from app.app.errors.file_process_error import FileProcessError
 from app.domain.models.llm_agent import action_options, ContingencyFunctions
 from app.domain.protocols.infrastructure.llm_agent import LLMAgent as LLMAgentProtocol
 from app.domain.models.errors import ErrorResponse
+from app.infrastructure.database.db import DBSession
 
 from .action_exec import ActionExecutor
 from .context_constructor import ContextConstructor
+from .job_queue import report_progress
 load_dotenv()
 
 
@@ -24,6 +26,7 @@ class LLMAgent(LLMAgentProtocol):
             content_files: Optional[List[UploadFile]] = None,
             course_id: Optional[int] = None, 
             module_id: Optional[int] = None, 
+            db: Optional[DBSession] = None,
     ):
         # Check if all inputs are None or if content_files is an empty list
         if not course_id and not module_id and not content_files:
@@ -34,7 +37,7 @@ class LLMAgent(LLMAgentProtocol):
         self.module_id = module_id
         self.content_files = self.process_files(content_files)
         self.context_constructor = ContextConstructor(content_files=self.content_files, course_id=self.course_id, module_id=self.module_id)
-        self.action_executor = ActionExecutor()
+        self.action_executor = ActionExecutor(db=db)
 
 
     def process_files(self, content_files) -> Union[List[str], None]:
@@ -140,10 +143,14 @@ class LLMAgent(LLMAgentProtocol):
         add_cycles:int=0
         ):
         
+        # progress is only recorded when running as an LLM job
+        await report_progress(progress=0.1, stage=f"{action}: building context")
         context = await self.context_constructor.construct(action=action, params=params)
+        await report_progress(progress=0.2, stage=f"{action}: generating")
         prompt, response = await self.action_executor.execute(action=action, context=context, params=params)
         print("The prompt being sent is:", prompt)
         print("The response being sent is:", response)
+        await report_progress(progress=0.8, stage=f"{action}: validating")
         response = await self.runContingencies(
             response=response, 
             prompt=prompt, 
@@ -152,6 +159,10 @@ class LLMAgent(LLMAgentProtocol):
             params=params,
             add_cycles=add_cycles
             )
+
+        # a response that failed validation would otherwise be served from the cache on every retry
+        if not isinstance(response, ErrorResponse) and all(validator.status == "PASS" for validator in contingency_functions.validators):
+            await self.action_executor.cache_responses()
         
         print(response)
         return response
@@ -0,0 +1,180 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_community.chat_models.openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from .admission import AdmissionController, estimate_tokens, get_admission_controller
+from .http_clients import get_provider_clients
+
+# Chat messages as {"role": "system" | "assistant" | "user", "content": str}
+Messages = List[Dict[str, str]]
+
+
+def _contents(messages: Messages, role: str) -> str:
+    return "\n".join(message["content"] for message in messages if message["role"] == role)
+
+
+class ChatProvider(ABC):
+    """
+    One LLM provider. build creates the client of a model once, complete sends a conversation through it.
+    Providers are matched to model names in registration order with matches.
+    """
+    name: str
+
+    @abstractmethod
+    def matches(self, model_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def build(self, model_name: str, params: Dict[str, Any]) -> Any:
+        ...
+
+    @abstractmethod
+    async def complete(self, client: Any, messages: Messages) -> str:
+        ...
+
+    def sampling_params(self, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The request parameters that change the output, part of the LLM response cache key.
+        """
+        return params
+
+
+class OpenAIProvider(ChatProvider):
+    name = "openai"
+    default_params = {"model_kwargs": {"response_format": {"type": "json_object"}}}
+
+    def matches(self, model_name: str) -> bool:
+        return "gpt" in model_name
+
+    def build(self, model_name: str, params: Dict[str, Any]) -> ChatOpenAI:
+        # retries are left to the admission controller
+        return ChatOpenAI(model=model_name, openai_api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, **{**self.default_params, **params})
+
+    async def complete(self, client: ChatOpenAI, messages: Messages) -> str:
+        result = await client.ainvoke(messages)
+        return result.content
+
+    def sampling_params(self, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {**self.default_params, **params}
+
+
+class GeminiProvider(ChatProvider):
+    """
+    Gemini gets the whole conversation as one human message and its answer is trimmed to the outermost JSON object.
+    """
+    name = "google"
+
+    def matches(self, model_name: str) -> bool:
+        return "gemini" in model_name
+
+    def build(self, model_name: str, params: Dict[str, Any]) -> ChatGoogleGenerativeAI:
+        return ChatGoogleGenerativeAI(model=model_name, google_api_key=os.getenv("GOOGLE_API_KEY"), **params)
+
+    async def complete(self, client: ChatGoogleGenerativeAI, messages: Messages) -> str:
+        content = (
+            f"{_contents(messages, 'user')}+ Please perform the action based on the base prompt: {_contents(messages, 'system')}"
+            f"+ context_prompt{_contents(messages, 'assistant')}"
+        )
+        result = await client.ainvoke([HumanMessage(content=content)])
+        res = result.content
+        return res[res.find('{'):res.rfind('}') + 1].strip()
+
+
+class TritonProvider(ChatProvider):
+    """
+    OpenAI compatible chat completions served by Triton, sent over the shared pooled client. The context (assistant)
+    and action (user) messages are sent as one user message.
+    """
+    name = "triton"
+    default_params = {
+        "max_tokens": 768,
+        "stream": False,
+        "n": 1,
+        "temperature": 0.2,
+        "frequency_penalty": 0.1,
+        "presence_penalty": 0.1
+    }
+
+    def matches(self, model_name: str) -> bool:
+        return "llama" in model_name
+
+    def build(self, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # the endpoint serves a single llama-3 deployment
+        return {"model": "llama-3", **self.default_params, **params}
+
+    async def complete(self, client: Dict[str, Any], messages: Messages) -> str:
+        payload = {
+            "messages": [
+                {"role": "system", "content": _contents(messages, "system")},
+                {"role": "user", "content": "\n".join(message["content"] for message in messages if message["role"] != "system")}
+            ],
+            **client
+        }
+        response = await get_provider_clients().get_async(self.name).post("/chat/completions", json=payload)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def sampling_params(self, model_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.build(model_name, params)
+
+
+class ModelRegistry:
+    """
+    Resolves model names to providers and keeps one client per (provider, model, params), so chat model objects
+    and their HTTP clients are built once per process. New providers are added with register.
+    Completions go through the admission controller of their provider.
+    """
+    def __init__(self, providers: Optional[List[ChatProvider]] = None, admission: Optional[AdmissionController] = None):
+        self.providers: List[ChatProvider] = list(providers or [])
+        self.admission = admission or get_admission_controller()
+        self._clients: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = Lock()
+
+    def register(self, provider: ChatProvider):
+        self.providers.append(provider)
+
+    def provider_for(self, model_name: str) -> ChatProvider:
+        for provider in self.providers:
+            if provider.matches(model_name):
+                return provider
+        raise ValueError("Unsupported AI provider")
+
+    def get_client(self, model_name: str, params: Optional[Dict[str, Any]] = None) -> Tuple[ChatProvider, Any]:
+        provider = self.provider_for(model_name)
+        params = params or {}
+        key = (provider.name, model_name, json.dumps(params, sort_keys=True))
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = provider.build(model_name, params)
+        return provider, client
+
+    def sampling_params(self, model_name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.provider_for(model_name).sampling_params(model_name, params or {})
+
+    async def complete(self, model_name: str, messages: Messages, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Sends messages to model_name and returns the content of the answer.
+        """
+        provider, client = self.get_client(model_name, params)
+        tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        tokens += int(self.sampling_params(model_name, params).get("max_tokens", 0))
+        return await self.admission.run(provider.name, lambda: provider.complete(client, messages), tokens=tokens)
+
+
+_model_registry = ModelRegistry(providers=[OpenAIProvider(), GeminiProvider(), TritonProvider()])
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Returns the process-wide model registry, usable as a FastAPI dependency.
+    """
+    return _model_registry
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from app.config.environment import get_settings
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses stored in a local SQLite file.
+
+    Entries are keyed on the model, the base prompt, the context and action prompts and the sampling parameters, so editing
+    any of them (the base prompt text is its version) misses the cache. Entries expire ttl seconds after being written and
+    the least recently used ones are evicted once the stored responses exceed max_bytes.
+    SQLite calls are blocking, the async methods run them in a thread.
+    """
+    def __init__(
+            self,
+            path: str = _SETTINGS.LLM_CACHE_PATH,
+            max_bytes: int = _SETTINGS.LLM_CACHE_MAX_BYTES,
+            ttl: float = _SETTINGS.LLM_CACHE_TTL,
+            enabled: bool = _SETTINGS.LLM_CACHE_ENABLED
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.writes = 0
+        self.evictions = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+        self._stats_lock = Lock()
+
+    @staticmethod
+    def make_key(model: str, base_prompt: str, context_prompt: str, action_prompt: str, sampling: Dict[str, Any]) -> str:
+        return _digest(json.dumps({
+            "model": model,
+            "base_prompt": _digest(base_prompt),
+            "context_prompt": _digest(context_prompt),
+            "action_prompt": _digest(action_prompt),
+            "sampling": sampling,
+        }, sort_keys=True))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_response (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_llm_response_accessed_at ON llm_response (accessed_at)")
+            self._connection = connection
+        return self._connection
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT response, created_at FROM llm_response WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl < now:
+                connection.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE llm_response SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def _set(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO llm_response (key, model, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, len(response.encode("utf-8")), now, now)
+                )
+                expired = connection.execute("DELETE FROM llm_response WHERE created_at < ?", (now - self.ttl,)).rowcount
+                # keeps the most recently used entries that fit in max_bytes
+                evicted = connection.execute(
+                    """
+                    DELETE FROM llm_response WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                            FROM llm_response
+                        ) WHERE running > ?
+                    )
+                    """,
+                    (self.max_bytes,)
+                ).rowcount
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            with self._stats_lock:
+                self.writes += 1
+                self.evictions += expired + evicted
+
+    async def get(self, key: str, bypass: bool = False) -> Optional[str]:
+        """
+        Returns the cached response or None. Cache failures are logged and treated as misses.
+        bypass skips the lookup and only counts it, so a fresh response can replace the cached one.
+        """
+        if bypass:
+            with self._stats_lock:
+                self.bypassed += 1
+            return None
+
+        try:
+            response = await asyncio.to_thread(self._get, key)
+        except Exception:
+            logger.exception("Failed to read the LLM response cache")
+            response = None
+
+        with self._stats_lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    async def set(self, key: str, model: str, response: str):
+        try:
+            await asyncio.to_thread(self._set, key, model, response)
+        except Exception:
+            logger.exception("Failed to write the LLM response cache")
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM llm_response")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response").fetchone()
+        with self._stats_lock:
+            hits, misses, bypassed, writes, evictions = self.hits, self.misses, self.bypassed, self.writes, self.evictions
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "bypassed": bypassed,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "writes": writes,
+            "evictions": evictions,
+        }
+
+
+_llm_response_cache = LLMResponseCache()
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """
+    Returns the process-wide LLM response cache, usable as a FastAPI dependency.
+    """
+    return _llm_response_cache
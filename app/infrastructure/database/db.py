@@ -1,24 +1,233 @@
-from typing import Generator
+import inspect
+import time
+from threading import Lock
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Union
 
+from sqlalchemy import Engine, make_url
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config.environment import get_settings
 from app.infrastructure.database.seeds import run as seed_db
 
 _SETTINGS = get_settings()
 
-# TODO implement your own database connection(s)
+# Engines are process-wide, one per database URL. Every repository shares the pool of the engine it is bound to.
+_ENGINES: Dict[str, Engine] = {}
+_ASYNC_ENGINES: Dict[str, AsyncEngine] = {}
+_ENGINES_LOCK = Lock()
+
+# Repositories accept either session type: request handlers use an AsyncSession, the trigger event worker
+# thread runs its own event loop and keeps using a sync Session.
+DBSession = Union[Session, AsyncSession]
+
+
+async def resolve(result: Any) -> Any:
+    """
+    Awaits the result of a session call when the repository is bound to an AsyncSession,
+    returns it unchanged when bound to a sync Session.
+    """
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """
+    Driver independent check for a foreign key violation, psycopg2 exposes the SQLSTATE as pgcode, asyncpg as sqlstate.
+    """
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return sqlstate == "23503"
+
+
+def is_undefined_function(error: DBAPIError) -> bool:
+    """
+    Driver independent check for a call to a function or operator the database doesn't have, e.g. of a missing extension.
+    """
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return sqlstate == "42883"
+
+
+class _PoolStatsMixin:
+    """
+    Records how many connections were checked out of a pool and how long callers waited for them.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+        return connection
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InstrumentedQueuePool(_PoolStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": _SETTINGS.DB_POOL_SIZE,
+        "max_overflow": _SETTINGS.DB_MAX_OVERFLOW,
+        "pool_timeout": _SETTINGS.DB_POOL_TIMEOUT,
+        "pool_recycle": _SETTINGS.DB_POOL_RECYCLE,
+        "pool_pre_ping": _SETTINGS.DB_POOL_PRE_PING,
+    }
+
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Returns the process-wide engine for database_url (defaults to DATABASE1_URL), creating it on first use.
+    """
+    database_url = database_url or _SETTINGS.DATABASE1_URL
+    engine = _ENGINES.get(database_url)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        if database_url not in _ENGINES:
+            _ENGINES[database_url] = create_engine(
+                database_url,
+                echo=False,
+                poolclass=InstrumentedQueuePool,
+                **_pool_options(),
+            )
+        return _ENGINES[database_url]
+
+
+def get_async_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Returns the process-wide asyncpg engine for database_url (defaults to DATABASE1_URL), creating it on first use.
+    """
+    database_url = database_url or _SETTINGS.DATABASE1_URL
+    engine = _ASYNC_ENGINES.get(database_url)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        if database_url not in _ASYNC_ENGINES:
+            _ASYNC_ENGINES[database_url] = create_async_engine(
+                make_url(database_url).set(drivername="postgresql+asyncpg"),
+                echo=False,
+                poolclass=InstrumentedAsyncQueuePool,
+                **_pool_options(),
+            )
+        return _ASYNC_ENGINES[database_url]
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """
+    Returns checkout/wait metrics for every engine created by this process, keyed "sync"/"async" for the default database
+    and "sync-1", "async-1"... for any other database, so no connection details are exposed.
+    """
+    stats = {}
+    for label, engines in (("sync", list(_ENGINES.items())), ("async", [(url, engine.sync_engine) for url, engine in list(_ASYNC_ENGINES.items())])):
+        others = 0
+        for database_url, engine in engines:
+            if not isinstance(engine.pool, _PoolStatsMixin):
+                continue
+            if database_url == _SETTINGS.DATABASE1_URL:
+                stats[label] = engine.pool.stats()
+            else:
+                others += 1
+                stats[f"{label}-{others}"] = engine.pool.stats()
+    return stats
+
+
+async def dispose_engines():
+    with _ENGINES_LOCK:
+        engines = list(_ENGINES.values())
+        async_engines = list(_ASYNC_ENGINES.values())
+        _ENGINES.clear()
+        _ASYNC_ENGINES.clear()
+
+    for engine in engines:
+        engine.dispose()
+    for engine in async_engines:
+        await engine.dispose()
 
-def get_engine():
-    return create_engine(_SETTINGS.DATABASE1_URL, echo=False)
 
 def init_db():
     SQLModel.metadata.bind = get_engine()
 
-def get_db() -> Generator:
-    with Session(get_engine()) as db:
-        return db
-        
+
+def get_db() -> Session:
+    """
+    Returns a standalone Session on the shared engine, for code running outside of a request (workers, startup tasks).
+    The caller is responsible for closing it.
+    """
+    return Session(get_engine())
+
+
+def get_session() -> Generator[Session, None, None]:
+    """
+    FastAPI dependency yielding one Session per request. FastAPI caches the dependency for the duration of
+    a request so every repository resolved in that request shares the same Session, which is closed once
+    the response has been sent.
+    """
+    db = Session(get_engine())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_async_db() -> AsyncSession:
+    """
+    Returns a standalone AsyncSession on the shared async engine. The caller is responsible for closing it.
+    """
+    return AsyncSession(get_async_engine(), expire_on_commit=False)
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async counterpart of get_session, used by the repositories on the request path so queries
+    await the network instead of blocking the event loop.
+    """
+    db = get_async_db()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(bind=get_engine())
-    seed_db(get_db())
\ No newline at end of file
+    seed_db(get_db())
@@ -1,10 +1,11 @@
 import logging
 from typing import List, Union, Optional
 from datetime import datetime, UTC
-from sqlmodel import Session, text, delete, select, or_, cast
+from fastapi import Depends
+from sqlmodel import text, delete, select, or_, cast
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import NoResultFound
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
 from app.app.errors.db_error import DBError
 
 from app.app.errors.validation_error import ValidationError
@@ -16,10 +17,10 @@ from app.domain.protocols.repositories.change_request import ChangeRequestReposi
 logger = logging.getLogger(__name__)
 
 class ChangeRequestRepository(ChangeRequestRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
 
     async def add(self, item: ChangeRequestCreate) -> ChangeRequestRead:
@@ -29,9 +30,8 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
         try:
             validation_obj = ChangeRequest.model_validate(item)
             self.db.add(validation_obj)
-            self.db.commit()
-            self.db.refresh(validation_obj)
-            self.db.close()
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(validation_obj))
 
             return ChangeRequestRead.model_validate(validation_obj)
 
@@ -52,12 +52,10 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
         try:
             validation_objs = [ChangeRequest.model_validate(item) for item in items]
             self.db.add_all(validation_objs)
-            self.db.commit()
+            await resolve(self.db.commit())
 
             for item in validation_objs:
-                self.db.refresh(item)
-
-            self.db.close()
+                await resolve(self.db.refresh(item))
 
             return [ChangeRequestRead.model_validate(item) for item in validation_objs]
         
@@ -81,7 +79,7 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
         This method performs direct updates on the table and should not be directly exposed to any service or endpoint not handling data curation and rule enforcement.
         """
         try:
-            item = self.db.get(ChangeRequest, update.id)
+            item = await resolve(self.db.get(ChangeRequest, update.id))
 
             if item.vote_type == "veto" and "rejected" in update.votes:
                 update.reviewers = []
@@ -107,8 +105,8 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
             item.reviewers = update.reviewers
 
             self.db.add(item)
-            self.db.commit()
-            self.db.refresh(item)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(item))
 
             return ChangeRequestRead.model_validate(item)
         
@@ -127,7 +125,7 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
         client_session: Optional[SessionExtended] = None,
     )-> ChangeRequestRead:
         try:
-            item = self.db.get(ChangeRequest, change_request_id)
+            item = await resolve(self.db.get(ChangeRequest, change_request_id))
             # Manual Change Request closure requires the CR be owned by the client and have no vote_type 
             if item.submitted_by != client_session.user_credentials.internal_id or item.vote_type:
                 raise ValidationError(
@@ -149,8 +147,8 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
             item.reviewers = []
 
             self.db.add(item)
-            self.db.commit()
-            self.db.refresh(item)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(item))
 
             return ChangeRequestRead.model_validate(item)
         
@@ -174,13 +172,12 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
                     .where(ChangeRequest.closes_at > datetime.now(UTC))\
                         .where(ChangeRequest.validation_status == 'pending')
             
-            requests = self.db.exec(stmt).all()
+            requests = (await resolve(self.db.exec(stmt))).all()
             if len(requests) > 0:
                 result = [ChangeRequestRead.model_validate(item) for item in requests]
             else:
                 result = []
 
-            self.db.close()
             return result
         
         except Exception as e:
@@ -199,13 +196,12 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
                     .where(or_(ChangeRequest.closes_at < datetime.now(UTC), ChangeRequest.closes_at == None))\
                         .where(ChangeRequest.validation_status == 'pending')
             
-            requests = self.db.exec(stmt).all()
+            requests = (await resolve(self.db.exec(stmt))).all()
             if len(requests) > 0:
                 result = [ChangeRequestRead.model_validate(item) for item in requests]
             else:
                 result = []
 
-            self.db.close()
             return result
         
         except Exception as e:
@@ -224,13 +220,12 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
                     .where(or_(ChangeRequest.closes_at < datetime.now(UTC), ChangeRequest.closes_at == None))\
                         .where(ChangeRequest.validation_status == 'draft')
             
-            requests = self.db.exec(stmt).all()
+            requests = (await resolve(self.db.exec(stmt))).all()
             if len(requests) > 0:
                 result = [ChangeRequestRead.model_validate(item) for item in requests]
             else:
                 result = []
 
-            self.db.close()
             return result
         
         except Exception as e:
@@ -244,7 +239,7 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
     
     async def get_one(self, change_request_id: int) -> ChangeRequestRead:
         try:
-            item = self.db.get(ChangeRequest, change_request_id)
+            item = await resolve(self.db.get(ChangeRequest, change_request_id))
             return ChangeRequestRead.model_validate(item)
         
         except Exception as e:
@@ -267,10 +262,9 @@ class ChangeRequestRepository(ChangeRequestRepoProtocol):
                     .where(ChangeRequest.id == change_request_id)\
                         .where(ChangeRequest.validation_status == 'draft')
             
-            results = self.db.exec(item)
-            self.db.delete(results.one())
-            self.db.commit()
-            self.db.close()
+            results = await resolve(self.db.exec(item))
+            await resolve(self.db.delete(results.one()))
+            await resolve(self.db.commit())
 
         except NoResultFound as e:
             logger.warn(msg=f"\n\nWARNING: A user attempted an illegal deletion of a Change Request\nclient_session.client.id: {client_session.user_credentials.internal_id}\nchange_request_id: {client_session.user_credentials.internal_id}\n\n")
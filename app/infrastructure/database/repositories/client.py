@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
 import logging
 
 from app.domain.models.concept import ConceptBulkRead, ConceptToCollection
@@ -12,7 +13,11 @@ from app.domain.models.client import (
     StudentKnowledge, 
     ClientToCourseCreate,
     ClientToCourseRead,
-    ClientToCourse
+    ClientToCourse,
+    HistoryResolution,
+    StudentKnowledgeHistory,
+    StudentKnowledgeRollup,
+    StudentKnowledgePoint
     )
 
 from app.domain.models.concept_collection import ConceptCollection
@@ -21,8 +26,9 @@ from app.domain.models.concept_collection import ConceptCollection
 from app.domain.models.course import Course
 from app.domain.models.change_requests import ChangeRequestCreateClient
 
-from app.infrastructure.database.db import get_db
-from sqlmodel import Session, select, col, and_, cast, distinct
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
+from fastapi import Depends
+from sqlmodel import select, col, and_, cast, distinct, delete, text
 from psycopg2.errors import UniqueViolation as psycopg2UniqueViolation
 
 from sqlalchemy import func
@@ -34,18 +40,52 @@ from app.app.errors.db_error import DBError
 
 logger = logging.getLogger(__name__)
 
+
+def knowledge_history_ctes(source: str) -> str:
+    """
+    Returns the history and rollup CTEs that append one point to student_knowledge_history per row of source and fold it
+    into that row's day and week rollups. source names a relation with student_id, concept_name, score and no_of_inputs
+    columns, every (student_id, concept_name) pair at most once. Shared by every writer of student_knowledge.
+    """
+    return f"""
+    history AS (
+        INSERT INTO student_knowledge_history AS h (student_id, concept_name, recorded_at, score, no_of_inputs)
+        SELECT student_id, concept_name, LOCALTIMESTAMP, score, no_of_inputs
+        FROM {source}
+        ON CONFLICT (student_id, concept_name, recorded_at) DO UPDATE SET
+            score = EXCLUDED.score,
+            no_of_inputs = EXCLUDED.no_of_inputs
+        RETURNING 1
+    ),
+    rollup AS (
+        INSERT INTO student_knowledge_rollup AS r 
+            (student_id, concept_name, resolution, bucket, first_score, last_score, min_score, max_score, samples, no_of_inputs)
+        SELECT 
+            written.student_id, written.concept_name, resolution.name, date_trunc(resolution.name, LOCALTIMESTAMP)::date,
+            written.score, written.score, written.score, written.score, 1, written.no_of_inputs
+        FROM {source} AS written
+        CROSS JOIN (VALUES ('day'), ('week')) AS resolution(name)
+        ON CONFLICT (student_id, concept_name, resolution, bucket) DO UPDATE SET
+            last_score = EXCLUDED.last_score,
+            min_score = LEAST(r.min_score, EXCLUDED.min_score),
+            max_score = GREATEST(r.max_score, EXCLUDED.max_score),
+            samples = r.samples + 1,
+            no_of_inputs = EXCLUDED.no_of_inputs
+        RETURNING 1
+    )"""
+
 class ClientRepository():
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def add(self, client: ClientCreate) -> ClientRead:
         try:
             client_obj = Client.from_orm(client)
             self.db.add(client_obj)
-            self.db.commit()
-            self.db.refresh(client_obj)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(client_obj))
 
             return ClientRead.from_orm(client_obj)
         
@@ -60,9 +100,9 @@ class ClientRepository():
 
     async def get(self, platform_id: str) -> ClientRead:
         try:
-            return self.db.exec(
+            return (await resolve(self.db.exec(
                 select(Client).where(col(Client.platform_id) == platform_id)
-            ).first()
+            ))).first()
         
         except Exception as e:
             logger.exception(msg="Failed to retrieve client")
@@ -73,6 +113,45 @@ class ClientRepository():
                 message="Failed to retrieve client"
             ) from e
         
+    async def get_ids(self, platform_ids: List[str]) -> Dict[str, int]:
+        try:
+            result = await resolve(self.db.exec(
+                select(Client.platform_id, Client.id).where(col(Client.platform_id).in_(platform_ids))
+            ))
+            return {platform_id: client_id for platform_id, client_id in result.all()}
+        
+        except Exception as e:
+            logger.exception(msg="Failed to retrieve client ids")
+            raise DBError(
+                origin="ClientRepository.get_ids",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to retrieve client ids"
+            ) from e
+
+    async def delete(self, client_id: int) -> None:
+        try:
+            result = await resolve(self.db.exec(delete(Client).where(col(Client.id) == client_id)))
+            await resolve(self.db.commit())
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg=f"Failed to delete client with id: {client_id}")
+            raise DBError(
+                origin="ClientRepository.delete",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to delete client"
+            ) from e
+
+        if result.rowcount == 0:
+            raise DBError(
+                origin="ClientRepository.delete",
+                type="NoResultFound",
+                status_code=404,
+                message=f"No client with id: {client_id}"
+            )
+        
     async def get_reviewers(self, item: ChangeRequestCreateClient, client_id: int) -> List[int]:
         match item.entity_type:
             case "concept":
@@ -82,9 +161,7 @@ class ClientRepository():
                     .join(ClientToCourse, and_(Client.id == ClientToCourse.client_id, ClientToCourse.is_sme == True))\
                     .join(Course, and_(ClientToCourse.course_id == Course.id, Course.subjects.contains(cast(user_filter, JSONB))))
                 
-                results = self.db.exec(statement=statement).all()
-
-                self.db.close()
+                results = (await resolve(self.db.exec(statement=statement))).all()
 
                 if client_id not in results:
                     results.append(client_id)
@@ -112,8 +189,7 @@ class ClientRepository():
                     .where(ClientToCourse.is_sme == True)
                 )
 
-                results = self.db.exec(statement=statement).all()
-                self.db.close()
+                results = (await resolve(self.db.exec(statement=statement))).all()
 
                 if client_id not in results:
                     results.append(client_id)
@@ -129,17 +205,17 @@ class ClientRepository():
                 return [client_id]
 
 class ClientToCourseRepository():
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def add(self, junction: ClientToCourseCreate) -> ClientToCourseRead:
         try:
             junction_obj = ClientToCourse.from_orm(junction)
             self.db.add(junction_obj)
-            self.db.commit()
-            self.db.refresh(junction_obj)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(junction_obj))
 
             return ClientToCourseRead.from_orm(junction_obj)
         
@@ -163,15 +239,15 @@ class ClientToCourseRepository():
 
 
 class StudentKnowledgeRepository():
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def get(self, student_id:int, concept_name:str) -> StudentKnowledgeRead:
         try:
             stmt = select(StudentKnowledge).where(StudentKnowledge.concept_name == concept_name).where(StudentKnowledge.student_id == student_id)
-            return self.db.exec(stmt).one_or_none()
+            return (await resolve(self.db.exec(stmt))).one_or_none()
         
         except Exception as e:
             logger.exception(msg=f"Failed to retrieve student knowledge with student_id: {student_id} and concept_name: {concept_name}")
@@ -189,10 +265,8 @@ class StudentKnowledgeRepository():
             stmt = select(StudentKnowledge).where(
                 col(StudentKnowledge.concept_name).in_(concept_list)).where(
                 col(StudentKnowledge.student_id) == student_id)
-            result = self.db.exec(statement=stmt)
-            result = StudentKnowledgeRead.from_orm(result.all())
-            self.db.close()
-            return result
+            result = await resolve(self.db.exec(statement=stmt))
+            return [StudentKnowledgeRead.model_validate(item) for item in result.all()]
 
         except Exception as e:
             logger.exception(
@@ -206,14 +280,36 @@ class StudentKnowledgeRepository():
                         f"concepts: {concept_list}, {e}"
             ) from e
 
+    async def get_scores(self, student_ids: List[int], concept_list: List[str]) -> Dict[int, Dict[str, float]]:
+        try:
+            stmt = select(StudentKnowledge.student_id, StudentKnowledge.concept_name, StudentKnowledge.score).where(
+                col(StudentKnowledge.student_id).in_(student_ids)).where(
+                col(StudentKnowledge.concept_name).in_(concept_list))
+            result = await resolve(self.db.exec(statement=stmt))
+
+            scores = {student_id: {} for student_id in student_ids}
+            for student_id, concept_name, score in result.all():
+                scores[student_id][concept_name] = score
+            return scores
+
+        except Exception as e:
+            logger.exception(
+                msg=f"Failed to retrieve knowledge scores of {len(student_ids)} students for concepts: {concept_list}")
+            raise DBError(
+                origin="StudentKnowledgeRepository.get_scores",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to retrieve student knowledge scores"
+            ) from e
+
     async def add(self, score: StudentKnowledgeCreate) -> StudentKnowledgeRead:
         try:
             knowledge_obj = StudentKnowledge.from_orm(score)
             self.db.add(knowledge_obj)
-            self.db.commit()
-            self.db.refresh(knowledge_obj)
+            await self._record_history(score)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(knowledge_obj))
             result = StudentKnowledgeRead.from_orm(knowledge_obj)
-            self.db.close()
             return result
         
         except Exception as e:
@@ -228,7 +324,7 @@ class StudentKnowledgeRepository():
     async def update(self, score: StudentKnowledgeCreate) -> StudentKnowledgeRead:
         try:
             stmt = select(StudentKnowledge).where(StudentKnowledge.concept_name == score.concept_name).where(StudentKnowledge.student_id == score.student_id)
-            result = self.db.exec(statement=stmt)
+            result = await resolve(self.db.exec(statement=stmt))
 
             knowledge = result.one_or_none()
             knowledge.score = score.score
@@ -238,14 +334,14 @@ class StudentKnowledgeRepository():
 
 
             self.db.add(knowledge)
+            await self._record_history(score)
 
             # flag_modified(knowledge, 'change_history')
-            self.db.commit()
+            await resolve(self.db.commit())
 
-            self.db.refresh(knowledge)
+            await resolve(self.db.refresh(knowledge))
             result = StudentKnowledgeRead.from_orm(knowledge)
 
-            self.db.close()
             return result
     
         except Exception as e:
@@ -257,11 +353,81 @@ class StudentKnowledgeRepository():
                 message="Failed update student knowledge entry."
             ) from e
 
+    async def _record_history(self, score: StudentKnowledgeCreate):
+        stmt = text(
+            """
+            WITH written(student_id, concept_name, score, no_of_inputs) AS (
+                VALUES (CAST(:student_id AS INTEGER), CAST(:concept_name AS VARCHAR), CAST(:score AS FLOAT8), CAST(:no_of_inputs AS INTEGER))
+            ),
+            """ + knowledge_history_ctes("written") + """
+            SELECT 1
+            """
+            )
+        await resolve(self.db.exec(statement=stmt, params={
+            "student_id": score.student_id,
+            "concept_name": score.concept_name,
+            "score": score.score,
+            "no_of_inputs": score.no_of_inputs or 0
+            }))
+
+    async def get_history(
+            self, 
+            student_id: int, 
+            concept_list: Optional[List[str]] = None, 
+            start: Optional[datetime] = None, 
+            end: Optional[datetime] = None, 
+            resolution: HistoryResolution = HistoryResolution.day
+    ) -> Dict[str, List[StudentKnowledgePoint]]:
+        try:
+            if resolution == HistoryResolution.raw:
+                table, time_column = StudentKnowledgeHistory, StudentKnowledgeHistory.recorded_at
+                lower, upper = start, end
+            else:
+                table, time_column = StudentKnowledgeRollup, StudentKnowledgeRollup.bucket
+                # the bucket containing start is the first one returned
+                lower = start.date() - timedelta(days=start.weekday() if resolution == HistoryResolution.week else 0) if start else None
+                upper = end.date() if end else None
+
+            stmt = select(table).where(table.student_id == student_id)
+            if resolution != HistoryResolution.raw:
+                stmt = stmt.where(table.resolution == resolution.value)
+            if concept_list:
+                stmt = stmt.where(col(table.concept_name).in_(concept_list))
+            if lower is not None:
+                stmt = stmt.where(time_column >= lower)
+            if upper is not None:
+                stmt = stmt.where(time_column <= upper)
+            stmt = stmt.order_by(table.concept_name, time_column)
+
+            history: Dict[str, List[StudentKnowledgePoint]] = {}
+            for row in (await resolve(self.db.exec(statement=stmt))).all():
+                if resolution == HistoryResolution.raw:
+                    point = StudentKnowledgePoint(timestamp=row.recorded_at, score=row.score, no_of_inputs=row.no_of_inputs)
+                else:
+                    point = StudentKnowledgePoint(
+                        timestamp=datetime.combine(row.bucket, datetime.min.time()), 
+                        score=row.last_score, 
+                        min_score=row.min_score, 
+                        max_score=row.max_score, 
+                        no_of_inputs=row.no_of_inputs
+                        )
+                history.setdefault(row.concept_name, []).append(point)
+            return history
+
+        except Exception as e:
+            logger.exception(msg=f"Failed to retrieve the knowledge history of student_id: {student_id}")
+            raise DBError(
+                origin="StudentKnowledgeRepository.get_history",
+                type="QueryExecError",
+                status_code=500,
+                message=f"Failed to retrieve the knowledge history of student_id: {student_id}"
+            ) from e
+
     async def get_many(self, concepts: ConceptBulkRead, student_id: int) -> List[StudentKnowledgeRead]:
         concept_list = [concept.name for concept in concepts.concepts]
         try:
             stmt = select(StudentKnowledge).where(StudentKnowledge.student_id == student_id).filter(StudentKnowledge.concept_name.in_(concept_list))
-            result = self.db.exec(statement=stmt)
+            result = await resolve(self.db.exec(statement=stmt))
             result = result.all()
             return [StudentKnowledgeRead.model_validate(item) for item in result]
         
@@ -1,13 +1,15 @@
 import logging
 
-from typing import List, Union, Literal
+from typing import List, Union, Literal, Tuple, Dict, Optional, Iterable, AsyncIterator
 
-from psycopg2.errors import  ForeignKeyViolation
-from sqlalchemy.exc import IntegrityError, StatementError
+from sqlalchemy import ARRAY, Integer, VARCHAR
+from sqlalchemy.exc import IntegrityError, ProgrammingError
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlmodel import Session, text, bindparam, select, join, alias, or_, cast
+from fastapi import Depends
+from sqlmodel import text, bindparam, select, join, alias, or_, cast
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve, is_foreign_key_violation, is_undefined_function
 
 from app.app.errors.db_error import DBError
 from app.domain.models.errors import DBError as DBErrorObj
@@ -23,13 +25,18 @@ from app.domain.models.concept import (
     ConceptToCollectionRead,
     ConceptToCollectionCreate,
     ConceptToConceptCreate,
+    ConceptToConceptBulkRead,
     ConceptToConceptRead, 
     ConceptToConcept,
     ConceptFilter,
     ConceptBulkRead,
+    ConceptPage,
+    ConceptMatch,
     ConceptReadVerbose,
+    ConceptReadPreformatted,
     ConceptToCollectionDelete,
     ConceptToConceptDelete,
+    ConceptToConceptTreeRead,
     )
 
 from app.domain.protocols.repositories.concept import (
@@ -41,10 +48,10 @@ from app.domain.protocols.repositories.concept import (
 logger = logging.getLogger(__name__)
 
 class ConceptRepository(ConceptRepositoryProtocol):
-    db: Session
+    db: DBSession
 
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def add(self, concept: ConceptCreate) -> ConceptRead:
         """
@@ -53,20 +60,18 @@ class ConceptRepository(ConceptRepositoryProtocol):
         try:
             stmt = Concept.model_validate(concept)
             self.db.add(stmt)
-            self.db.commit()
-            self.db.refresh(stmt)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(stmt))
 
             result = ConceptRead.model_validate(stmt)
 
-            self.db.close()
-
             return result
         
         except IntegrityError as e:
             logger.exception(msg="Failed to add Concept object direct result")
             raise DBError(
                 origin="ConceptRepository.add", 
-                type="ForeignKeyViolation" if isinstance(e.orig, ForeignKeyViolation) else "UniqueViolation",
+                type="ForeignKeyViolation" if is_foreign_key_violation(e) else "UniqueViolation",
                 status_code=400,
                 message=str(e.orig)
                 ) from e
@@ -74,57 +79,74 @@ class ConceptRepository(ConceptRepositoryProtocol):
 
     async def bulk_add(self, concepts: List[ConceptCreate]) -> ConceptCreateBulkRead:
         """
-        Creates a new Concept entry in the DB for each item in the list of concepts.
-        Ignores and logs any unique value violations.
+        Creates a new Concept entry in the DB for each item in the list of concepts using a single
+        INSERT ... ON CONFLICT DO NOTHING statement.
+        Concepts that already exist (or repeat within the batch) are reported as UniqueViolation,
+        concepts missing required values are reported as StatementError and are not sent to the DB.
         """
-        with self.db.begin():
-            query_template = """
-                INSERT INTO concept(name, subject, difficulty) 
-                VALUES(:name, :subject, :difficulty) 
-                RETURNING name
-                """
-
-            compiled_query = text(query_template)
-
-            failed_inserts = []
-            successful_inserts = []
-
-            for obj in concepts:
-                query_params = dict(obj)
-                nested = self.db.begin_nested()
-
-                try:   
-                    results = self.db.exec(statement=compiled_query, params=query_params)
-                    successful_inserts.extend([ConceptRead(**val) for val in results.mappings().fetchall()])
-                    nested.commit()
-
-                except IntegrityError as e:
-                    failed_inserts.append(
-                        DBErrorObj(
-                            cause="UniqueViolation", 
-                            object_id=obj.name
-                            )
-                        )
-                    nested.rollback()
-                except StatementError as e:
-                    logger.warn(msg=f"Concept Formatting Error, missing required value(s): {obj}")
-                    failed_inserts.append(
-                        DBErrorObj(
-                            cause="StatementError", 
-                            object_id=str(obj)
-                            )
-                        )
-                    nested.rollback()
+        failed_inserts = []
+        rows = {}
 
+        for obj in concepts:
+            if obj.name is None or obj.subject is None or obj.difficulty is None:
+                logger.warn(msg=f"Concept Formatting Error, missing required value(s): {obj}")
+                failed_inserts.append(DBErrorObj(cause="StatementError", object_id=str(obj)))
+
+            elif obj.name in rows:
+                failed_inserts.append(DBErrorObj(cause="UniqueViolation", object_id=obj.name))
+
+            else:
+                rows[obj.name] = obj
+
+        if not rows:
             if failed_inserts:
                 logger.warn(msg=f"Failed to add the following Concept object(s):\n{failed_inserts}")
-            return ConceptCreateBulkRead(success=successful_inserts, failed=failed_inserts)
+            return ConceptCreateBulkRead(success=[], failed=failed_inserts)
+
+        query_stmt = text("""
+            INSERT INTO concept(name, subject, difficulty, summary)
+            SELECT * FROM unnest(:names, :subjects, :difficulties, :summaries)
+            ON CONFLICT (name) DO NOTHING
+            RETURNING name
+            """).bindparams(
+                bindparam("names", type_=ARRAY(VARCHAR)),
+                bindparam("subjects", type_=ARRAY(VARCHAR)),
+                bindparam("difficulties", type_=ARRAY(Integer)),
+                bindparam("summaries", type_=ARRAY(VARCHAR)),
+            )
+
+        try:
+            results = await resolve(self.db.exec(statement=query_stmt, params={
+                "names": [obj.name for obj in rows.values()],
+                "subjects": [obj.subject for obj in rows.values()],
+                "difficulties": [obj.difficulty for obj in rows.values()],
+                "summaries": [obj.summary for obj in rows.values()],
+            }))
+            inserted = {val["name"] for val in results.mappings().fetchall()}
+            await resolve(self.db.commit())
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to bulk add Concept objects.")
+            raise DBError(
+                origin="ConceptRepository.bulk_add",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to add concepts"
+            ) from e
+
+        successful_inserts = [ConceptRead(name=name) for name in rows if name in inserted]
+        failed_inserts.extend([DBErrorObj(cause="UniqueViolation", object_id=name) for name in rows if name not in inserted])
+
+        if failed_inserts:
+            logger.warn(msg=f"Failed to add the following Concept object(s):\n{failed_inserts}")
+        return ConceptCreateBulkRead(success=successful_inserts, failed=failed_inserts)
 
 
     async def get_one(self, concept_name: str, read_mode: Literal["normal", "verbose"] = "normal") -> Union[ConceptRead, ConceptReadVerbose]:
         try:
             query_stmt = text("SELECT * FROM concept WHERE name = :name")
-            results = self.db.exec(statement=query_stmt, params={"name": concept_name})
+            results = await resolve(self.db.exec(statement=query_stmt, params={"name": concept_name}))
 
             if read_mode == "normal":
                 return ConceptRead(**results.mappings().fetchone())
@@ -142,7 +164,8 @@ class ConceptRepository(ConceptRepositoryProtocol):
             ) from e  
 
 
-    async def get_many(self, filters: ConceptFilter, read_mode: Literal["normal", "verbose"] = "normal") -> Union[List[ConceptRead], List[ConceptReadVerbose]]:
+    @staticmethod
+    def _filtered_select(filters: ConceptFilter):
         statement = select(Concept).distinct()
         concept_to_collection_alias_a = alias(ConceptToCollection)
         concept_to_collection_alias_b = alias(ConceptToCollection)
@@ -178,8 +201,14 @@ class ConceptRepository(ConceptRepositoryProtocol):
                 column = getattr(Concept, key)
                 statement = statement.where(column==filter_clause)
 
+        return statement
+
+
+    async def get_many(self, filters: ConceptFilter, read_mode: Literal["normal", "verbose"] = "normal") -> Union[List[ConceptRead], List[ConceptReadVerbose]]:
+        statement = self._filtered_select(filters)
+
         try:
-            results = self.db.exec(statement=statement)
+            results = await resolve(self.db.exec(statement=statement))
             if read_mode == "normal":
                 return [ConceptRead.from_orm(v) for v in results.fetchall()]
             
@@ -196,31 +225,123 @@ class ConceptRepository(ConceptRepositoryProtocol):
                 ) from e
 
 
+    async def get_page(
+            self, 
+            filters: ConceptFilter, 
+            after: Optional[str] = None, 
+            limit: int = 100, 
+            read_mode: Literal["normal", "verbose"] = "normal"
+    ) -> ConceptPage:
+        read_model = ConceptRead if read_mode == "normal" else ConceptReadVerbose
+        statement = self._filtered_select(filters).order_by(Concept.name).limit(limit + 1)
+        if after is not None:
+            statement = statement.where(Concept.name > after)
+
+        try:
+            results = (await resolve(self.db.exec(statement=statement))).fetchall()
+            items = [read_model.from_orm(v) for v in results[:limit]]
+            return ConceptPage(
+                items=items, 
+                next_cursor=items[-1].name if len(results) > limit else None
+                )
+        
+        except Exception as e:
+            logger.exception(msg=f"Failed to retrieve concept page after {after} with filters: {filters.dict()}.")
+            raise DBError(
+                origin="ConceptRepository.get_page", 
+                type="QueryExecError", 
+                status_code=500, 
+                message="Failed to select concepts"
+                ) from e
+
+
+    async def stream(
+            self, 
+            filters: ConceptFilter, 
+            read_mode: Literal["normal", "verbose"] = "normal", 
+            batch_size: int = 500
+    ) -> AsyncIterator[Union[ConceptRead, ConceptReadVerbose]]:
+        read_model = ConceptRead if read_mode == "normal" else ConceptReadVerbose
+        statement = self._filtered_select(filters).order_by(Concept.name).execution_options(yield_per=batch_size)
+
+        try:
+            if isinstance(self.db, AsyncSession):
+                results = await self.db.stream_scalars(statement)
+                async for concept in results:
+                    yield read_model.from_orm(concept)
+            else:
+                for concept in self.db.exec(statement=statement):
+                    yield read_model.from_orm(concept)
+
+        except Exception as e:
+            logger.exception(msg=f"Failed to stream concept(s) with filters: {filters.dict()}.")
+            raise DBError(
+                origin="ConceptRepository.stream", 
+                type="QueryExecError", 
+                status_code=500, 
+                message="Failed to stream concepts"
+                ) from e
+
+
+    async def get_many_by_collections(self, collection_ids: Iterable[int], course_id: Optional[int] = None) -> Dict[str, ConceptReadPreformatted]:
+        """
+        Returns every concept contained in any of the collections, keyed by name, each with the list of
+        collection ids (of the supplied ones) it belongs to. Runs as a single grouped query.
+        """
+        query_stmt = text("""
+            SELECT c.name, c.subject, c.difficulty, c.summary, array_agg(DISTINCT ctc.collection_id) AS module
+            FROM concept c
+            JOIN concept_to_collection ctc ON ctc.concept_name = c.name
+            JOIN concept_collection cc ON cc.id = ctc.collection_id
+            WHERE ctc.collection_id = ANY(:collection_ids)
+            AND (CAST(:course_id AS INTEGER) IS NULL OR cc.course_id = :course_id)
+            GROUP BY c.name
+            """).bindparams(
+                bindparam("collection_ids", type_=ARRAY(Integer)),
+                bindparam("course_id", type_=Integer),
+            )
+
+        try:
+            results = await resolve(self.db.exec(statement=query_stmt, params={
+                "collection_ids": list(collection_ids),
+                "course_id": course_id,
+            }))
+            return {
+                row["name"]: ConceptReadPreformatted(**row, id=row["name"]) 
+                for row in results.mappings()
+            }
+
+        except Exception as e:
+            logger.exception(msg=f"Failed to retrieve concepts of collections: {collection_ids}.")
+            raise DBError(
+                origin="ConceptRepository.get_many_by_collections", 
+                type="QueryExecError", 
+                status_code=500, 
+                message="Failed to select concepts"
+                ) from e
+
+
     async def exists(self, concept_names: List[str]) -> dict:
         try:
+            # LOWER(name) = ANY(...) is served by ix_concept_name_lower
             query_stmt = text("""
                 WITH input_names AS (
-                    SELECT unnest(array[:concept_names])::text AS name
+                    SELECT name, LOWER(name) AS name_lower
+                    FROM unnest(CAST(:concept_names AS VARCHAR[])) AS name
                 ),
                 existing_concepts AS (
-                    SELECT name
+                    SELECT name, LOWER(name) AS name_lower
                     FROM concept
-                    WHERE LOWER(name) = ANY(array[:concept_names])
+                    WHERE LOWER(name) = ANY(SELECT name_lower FROM input_names)
                 )
                 SELECT
-                    array_agg(existing_concepts.name) FILTER (WHERE existing_concepts.name IS NOT NULL) AS matched_concepts,
+                    array_agg(DISTINCT existing_concepts.name) FILTER (WHERE existing_concepts.name IS NOT NULL) AS matched_concepts,
                     array_agg(input_names.name) FILTER (WHERE existing_concepts.name IS NULL) AS unmatched_concepts
-                FROM (
-                    SELECT LOWER(name) AS name
-                    FROM input_names
-                ) AS input_names
-                LEFT JOIN (
-                    SELECT LOWER(name) AS name
-                    FROM existing_concepts
-                ) AS existing_concepts
-                ON input_names.name = existing_concepts.name;
-            """)
-            result = self.db.exec(statement=query_stmt, params={"concept_names": concept_names})
+                FROM input_names
+                LEFT JOIN existing_concepts
+                ON input_names.name_lower = existing_concepts.name_lower;
+            """).bindparams(bindparam("concept_names", type_=ARRAY(VARCHAR)))
+            result = await resolve(self.db.exec(statement=query_stmt, params={"concept_names": concept_names}))
             return result.mappings().one()
         
         except Exception as e:
@@ -233,6 +354,69 @@ class ConceptRepository(ConceptRepositoryProtocol):
             ) from e
 
 
+    async def exists_fuzzy(self, concept_names: List[str], threshold: float = 0.8) -> List[ConceptMatch]:
+        try:
+            # % narrows the candidates through ix_concept_name_trgm, <-> picks the closest with an index ordered scan
+            query_stmt = text("""
+                SELECT input_names.name AS candidate, best.name AS match, best.score
+                FROM unnest(CAST(:concept_names AS VARCHAR[])) WITH ORDINALITY AS input_names(name, position)
+                LEFT JOIN LATERAL (
+                    SELECT concept.name, similarity(LOWER(concept.name), LOWER(input_names.name)) AS score
+                    FROM concept
+                    WHERE LOWER(concept.name) % LOWER(input_names.name)
+                    ORDER BY LOWER(concept.name) <-> LOWER(input_names.name)
+                    LIMIT 1
+                ) AS best ON best.score >= :threshold
+                ORDER BY input_names.position
+            """).bindparams(bindparam("concept_names", type_=ARRAY(VARCHAR)))
+            result = await resolve(self.db.exec(statement=query_stmt, params={"concept_names": concept_names, "threshold": threshold}))
+            return [ConceptMatch(**row) for row in result.mappings()]
+
+        except ProgrammingError as e:
+            if not is_undefined_function(e):
+                logger.exception(msg="Failed to fuzzy match concepts.")
+                raise DBError(
+                    origin="ConceptRepository.exists_fuzzy",
+                    type="QueryExecError",
+                    status_code=500,
+                    message="Failed to check concepts."
+                ) from e
+            # pg_trgm is only created with the tables, databases created before it fall back to exact matches
+            logger.warning("pg_trgm is not installed, matching concepts exactly. Run CREATE EXTENSION pg_trgm to enable fuzzy matching.")
+            await resolve(self.db.rollback())
+            return await self._exists_exact(concept_names=concept_names)
+        
+        except Exception as e:
+            logger.exception(msg="Failed to fuzzy match concepts.")
+            raise DBError(
+                origin="ConceptRepository.exists_fuzzy",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to check concepts."
+            ) from e
+
+
+    async def _exists_exact(self, concept_names: List[str]) -> List[ConceptMatch]:
+        try:
+            query_stmt = text("""
+                SELECT input_names.name AS candidate, concept.name AS match, CASE WHEN concept.name IS NULL THEN NULL ELSE 1.0 END AS score
+                FROM unnest(CAST(:concept_names AS VARCHAR[])) WITH ORDINALITY AS input_names(name, position)
+                LEFT JOIN concept ON LOWER(concept.name) = LOWER(input_names.name)
+                ORDER BY input_names.position
+            """).bindparams(bindparam("concept_names", type_=ARRAY(VARCHAR)))
+            result = await resolve(self.db.exec(statement=query_stmt, params={"concept_names": concept_names}))
+            return [ConceptMatch(**row) for row in result.mappings()]
+
+        except Exception as e:
+            logger.exception(msg="Failed to check concepts.")
+            raise DBError(
+                origin="ConceptRepository.exists_fuzzy",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to check concepts."
+            ) from e
+
+
     async def update_one(
         self,
         concept_name,
@@ -248,9 +432,9 @@ class ConceptRepository(ConceptRepositoryProtocol):
             Updated Concept Value.
         """
         try:
-            concept = self.db.exec(
+            concept = await resolve(self.db.exec(
                 statement=select(Concept).where(Concept.name == concept_name)
-            )
+            ))
             concept = concept.one_or_none()
         except Exception as e:
             logger.exception(
@@ -266,7 +450,7 @@ class ConceptRepository(ConceptRepositoryProtocol):
             concept.sqlmodel_update(updated_concept_object.model_dump(exclude_unset=True))
 
             self.db.add(concept)
-            self.db.commit()
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg="Failed to update Concept object.")
@@ -277,8 +461,7 @@ class ConceptRepository(ConceptRepositoryProtocol):
                 message="Failed to update Concept object."
             ) from e
         try:
-            self.db.refresh(concept)
-            self.db.close()
+            await resolve(self.db.refresh(concept))
             return ConceptRead.model_validate(concept)
 
         except Exception as e:
@@ -303,9 +486,9 @@ class ConceptRepository(ConceptRepositoryProtocol):
             None
         """
         try:
-            concept = self.db.exec(
+            concept = await resolve(self.db.exec(
                 statement=select(Concept).where(Concept.name == concept_name)
-            )
+            ))
             concept = concept.one_or_none()
         except Exception as e:
             logger.exception(
@@ -317,9 +500,8 @@ class ConceptRepository(ConceptRepositoryProtocol):
                 message=f"Concept matching name '{concept_name}' not found"
             ) from e
         try:
-            self.db.delete(concept)
-            self.db.commit()
-            self.db.close()
+            await resolve(self.db.delete(concept))
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg=f"Failed to delete Concept object of name '{concept_name}'")
@@ -332,18 +514,18 @@ class ConceptRepository(ConceptRepositoryProtocol):
         
 
 class ConceptToModuleRepository(CToMRepoProtocol):
-    db: Session
+    db: DBSession
 
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
 
     async def add(self, junction: ConceptToCollectionCreate) -> ConceptToCollectionRead:
         try:
             db_junction = ConceptToCollection.from_orm(junction)
             self.db.add(db_junction)
-            self.db.commit()
-            self.db.refresh(db_junction)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(db_junction))
 
             return ConceptToCollectionRead(**dict(db_junction))
         
@@ -357,13 +539,34 @@ class ConceptToModuleRepository(CToMRepoProtocol):
             ) from e
 
     async def bulk_add(self, junctions: List[ConceptToCollectionCreate]) -> List[ConceptToCollectionRead]:
+        """
+        Inserts all junctions in one statement, junctions that already exist are skipped.
+        Returns only the junctions that were inserted.
+        """
+        if not junctions:
+            return []
+
+        query_stmt = text("""
+            INSERT INTO concept_to_collection(concept_name, collection_id)
+            SELECT * FROM unnest(:concept_names, :collection_ids)
+            ON CONFLICT DO NOTHING
+            RETURNING concept_name, collection_id
+            """).bindparams(
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+                bindparam("collection_ids", type_=ARRAY(Integer)),
+            )
+
         try:
-            db_junctions = [ConceptToCollection(**junction.dict()) for junction in junctions]
-            
-            self.db.add_all(db_junctions)
-            self.db.commit()
+            results = await resolve(self.db.exec(statement=query_stmt, params={
+                "concept_names": [junction.concept_name for junction in junctions],
+                "collection_ids": [junction.collection_id for junction in junctions],
+            }))
+            inserted = [ConceptToCollectionRead(**val) for val in results.mappings().fetchall()]
+            await resolve(self.db.commit())
+            return inserted
 
         except Exception as e:
+            await resolve(self.db.rollback())
             logger.exception(msg=f"Failed to add ConceptToModule object(s).")
             raise DBError(
                 origin="ConceptToModuleRepository.bulk_add",
@@ -372,27 +575,12 @@ class ConceptToModuleRepository(CToMRepoProtocol):
                 message="Failed to add module junctions"
             ) from e
         
-        try:
-            for object in db_junctions:
-                self.db.refresh(object)
-
-            return [ConceptToCollectionRead(**dict(val)) for val in db_junctions]
-        
-        except Exception as e:
-            logger.exception(msg=f"Failed to return ConceptToModule object.")
-            raise DBError(
-                origin="ConceptToModuleRepository.bulk_add",
-                type="ReturnError",
-                status_code=500,
-                message="Failed to return module junction objects"
-            ) from e
-        
 
     async def get_all(self, module_id: int) -> ConceptBulkRead:
         try:
             query_stmt = text("SELECT concept_name FROM concept_to_module WHERE module_id = "
                               ":module_id")
-            result = self.db.exec(statement=query_stmt, params={"module_id": module_id})
+            result = await resolve(self.db.exec(statement=query_stmt, params={"module_id": module_id}))
             result = result.mappings().fetchall()
             if not result:
                 raise DBError(
@@ -413,29 +601,45 @@ class ConceptToModuleRepository(CToMRepoProtocol):
                 message="Failed to return module junction objects"
             ) from e  
         
-    async def delete(self, junctions: List[ConceptToCollectionDelete]):
-        query_stmt = text("DELETE FROM concept_to_collection WHERE collection_id = :collection_id AND concept_name = :concept_name")
+    async def delete(self, junctions: List[ConceptToCollectionDelete]) -> int:
+        """
+        Deletes all junctions in one statement and one transaction, returns the number of junctions deleted.
+        """
+        if not junctions:
+            return 0
+
+        query_stmt = text("""
+            DELETE FROM concept_to_collection
+            WHERE (collection_id, concept_name) IN (SELECT * FROM unnest(:collection_ids, :concept_names))
+            """).bindparams(
+                bindparam("collection_ids", type_=ARRAY(Integer)),
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+            )
 
-        for item in junctions:
-            try: 
-                self.db.exec(statement=query_stmt, params=item.dict())
-                self.db.commit()
+        try: 
+            result = await resolve(self.db.exec(statement=query_stmt, params={
+                "collection_ids": [item.collection_id for item in junctions],
+                "concept_names": [item.concept_name for item in junctions],
+            }))
+            await resolve(self.db.commit())
+            return result.rowcount
 
-            except Exception as e:
-                logger.exception(msg=f"Failed to delete ConceptToModule object(s): {item}.")
-                raise DBError(
-                    origin="ConceptToModuleRepository.delete",
-                    type="QueryExecError",
-                    status_code=500,
-                    message=f"Failed to delete ConceptToModule object(s): {item}"
-                ) from e  
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg=f"Failed to delete ConceptToModule object(s): {junctions}.")
+            raise DBError(
+                origin="ConceptToModuleRepository.delete",
+                type="QueryExecError",
+                status_code=500,
+                message=f"Failed to delete ConceptToModule object(s): {junctions}"
+            ) from e  
 
 
 class ConceptToConceptRepository(CToCRepoProtocol):
-    db: Session
+    db: DBSession
 
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
 
     async def add(self, junction: ConceptToConceptCreate) -> ConceptToConceptRead:
@@ -443,8 +647,8 @@ class ConceptToConceptRepository(CToCRepoProtocol):
             db_junction = ConceptToConcept.from_orm(junction)
 
             self.db.add(db_junction)
-            self.db.commit()
-            self.db.refresh(db_junction)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(db_junction))
 
             return ConceptToConceptRead(**dict(db_junction))
         
@@ -458,26 +662,55 @@ class ConceptToConceptRepository(CToCRepoProtocol):
             ) from e          
 
 
-    async def bulk_add(self, junctions: List[ConceptToConceptCreate]) -> List[ConceptToConceptRead]:
+    async def bulk_add(self, junctions: List[ConceptToConceptCreate]) -> ConceptToConceptBulkRead:
+        """
+        Inserts all junctions in one statement. Junctions that already exist, or that reference a concept
+        missing from the concept table, are skipped and returned as failed with the cause.
+        """
+        if not junctions:
+            return ConceptToConceptBulkRead(success=[], failed=[])
+
+        # Every requested junction comes back once, cause is NULL for the inserted ones
+        query_stmt = text("""
+            WITH requested AS (
+                SELECT DISTINCT j.concept_name, j.prereq_name
+                FROM unnest(:concept_names, :prereq_names) AS j(concept_name, prereq_name)
+            ),
+            valid AS (
+                SELECT r.concept_name, r.prereq_name FROM requested r
+                WHERE EXISTS (SELECT 1 FROM concept c WHERE c.name = r.concept_name)
+                AND EXISTS (SELECT 1 FROM concept p WHERE p.name = r.prereq_name)
+            ),
+            inserted AS (
+                INSERT INTO concept_to_concept(concept_name, prereq_name)
+                SELECT concept_name, prereq_name FROM valid
+                ON CONFLICT DO NOTHING
+                RETURNING concept_name, prereq_name
+            )
+            SELECT r.concept_name, r.prereq_name,
+                CASE
+                    WHEN i.concept_name IS NOT NULL THEN NULL
+                    WHEN v.concept_name IS NULL THEN 'ForeignKeyViolation'
+                    ELSE 'UniqueViolation'
+                END AS cause
+            FROM requested r
+            LEFT JOIN valid v ON v.concept_name = r.concept_name AND v.prereq_name = r.prereq_name
+            LEFT JOIN inserted i ON i.concept_name = r.concept_name AND i.prereq_name = r.prereq_name
+            """).bindparams(
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+                bindparam("prereq_names", type_=ARRAY(VARCHAR)),
+            )
+
         try:
-            with self.db.no_autoflush as session:
-                db_junctions = [ConceptToConcept.from_orm(junction) for junction in junctions]
-                with session.begin(nested=True):
-                    for obj in db_junctions:
-                        nested = session.begin_nested()
-                        try:
-                            session.add(obj)
-                            nested.commit()
-                            session.refresh(obj)
-                            
-                        except IntegrityError as e:
-                            nested.rollback()
-                            
-                result = [ConceptToConceptRead(**val.dict()) for val in db_junctions]
-                session.commit()
-                return result
+            results = await resolve(self.db.exec(statement=query_stmt, params={
+                "concept_names": [junction.concept_name for junction in junctions],
+                "prereq_names": [junction.prereq_name for junction in junctions],
+            }))
+            rows = results.mappings().fetchall()
+            await resolve(self.db.commit())
         
         except Exception as e:
+            await resolve(self.db.rollback())
             logger.exception(msg="Failed to add ConceptToConcept object(s).")
             raise DBError(
                 origin="ConceptToConceptRepository.bulk_add",
@@ -486,6 +719,32 @@ class ConceptToConceptRepository(CToCRepoProtocol):
                 message="Failed to add concept junctions"
             ) from e  
 
+        failed = [DBErrorObj(cause=row["cause"], object_id=f"{row['concept_name']}|{row['prereq_name']}") for row in rows if row["cause"]]
+        if failed:
+            logger.warning(msg=f"Skipped the following ConceptToConcept junction(s):\n{failed}")
+        return ConceptToConceptBulkRead(
+            success=[ConceptToConceptRead(concept_name=row["concept_name"], prereq_name=row["prereq_name"]) for row in rows if not row["cause"]],
+            failed=failed
+        )
+
+
+    async def get_all_junctions(self) -> List[Tuple[str, str]]:
+        try:
+            query_stmt = text("SELECT concept_name, prereq_name FROM concept_to_concept")
+            result = await resolve(self.db.exec(statement=query_stmt))
+            junctions = [(row[0], row[1]) for row in result.fetchall()]
+
+            return junctions
+
+        except Exception as e:
+            logger.exception(msg="Failed to get all ConceptToConcept objects.")
+            raise DBError(
+                origin="ConceptToConceptRepository.get_all_junctions",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to retrieve concept junctions"
+            ) from e
+
 
     async def get_some(self, concepts: List[ConceptRead], junction_direction: Literal["up", "down", "both"]="down") -> List[ConceptToConceptRead]:
         try:
@@ -497,11 +756,9 @@ class ConceptToConceptRepository(CToCRepoProtocol):
             }
 
             query_stmt = query_stmt_options[junction_direction]
-            result = self.db.exec(statement=query_stmt)
+            result = await resolve(self.db.exec(statement=query_stmt))
             results = [ConceptToConceptRead.model_validate(val) for val in result.fetchall()]
 
-            self.db.close()
-            
             return results
         
         except Exception as e:
@@ -514,22 +771,88 @@ class ConceptToConceptRepository(CToCRepoProtocol):
             ) from e    
 
 
-    async def delete(self, junctions: List[ConceptToConceptDelete]):
-        query_stmt = text("DELETE FROM concept_to_concept WHERE prereq_name = :prereq_name AND concept_name = :concept_name")
+    async def get_tree(
+            self, 
+            concepts: List[ConceptRead], 
+            junction_direction: Literal["up", "down"] = "down",
+            max_depth: int = 3
+    ) -> List[ConceptToConceptTreeRead]:
+        """
+        Walks the junctions of the supplied concepts up to max_depth hops in a single recursive query.
+        Each junction is returned once with the smallest depth it was reached at. UNION keeps one row per
+        junction and depth, so a level holds at most every junction once and cycles stop at max_depth.
+        """
+        # "down" follows concept -> prereq, "up" follows prereq -> concept
+        start, step = ("concept_name", "prereq_name") if junction_direction == "down" else ("prereq_name", "concept_name")
+
+        query_stmt = text(f"""
+            WITH RECURSIVE tree(concept_name, prereq_name, depth) AS (
+                SELECT j.concept_name, j.prereq_name, 1
+                FROM concept_to_concept j
+                WHERE j.{start} = ANY(:concept_names)
+                UNION
+                SELECT j.concept_name, j.prereq_name, t.depth + 1
+                FROM concept_to_concept j
+                JOIN tree t ON j.{start} = t.{step}
+                WHERE t.depth < :max_depth
+            )
+            SELECT concept_name, prereq_name, MIN(depth) AS depth
+            FROM tree
+            GROUP BY concept_name, prereq_name
+            ORDER BY depth, concept_name, prereq_name
+            """).bindparams(bindparam("concept_names", type_=ARRAY(VARCHAR)))
 
-        for item in junctions:
-            try: 
-                self.db.exec(statement=query_stmt, params=item.dict())
-                self.db.commit()
+        try:
+            result = await resolve(self.db.exec(statement=query_stmt, params={
+                "concept_names": [val.name for val in concepts],
+                "max_depth": max_depth,
+            }))
+            results = [ConceptToConceptTreeRead(**val) for val in result.mappings().fetchall()]
 
-            except Exception as e:
-                logger.exception(msg=f"Failed to delete ConceptToConcept object(s): {item}.")
-                raise DBError(
-                    origin="ConceptToConceptRepository.delete",
-                    type="QueryExecError",
-                    status_code=500,
-                    message=f"Failed to delete ConceptToConcept object(s): {item}."
-                ) from e
+            return results
+
+        except Exception as e:
+            logger.exception(msg=f"Failed to get ConceptToConcept tree with direction: {junction_direction}, max_depth: {max_depth}.")
+            raise DBError(
+                origin="ConceptToConceptRepository.get_tree",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to retrieve concept junction tree"
+            ) from e
+
+
+    async def delete(self, junctions: List[ConceptToConceptDelete]) -> int:
+        """
+        Deletes all junctions in one statement and one transaction, returns the number of junctions deleted.
+        """
+        if not junctions:
+            return 0
+
+        query_stmt = text("""
+            DELETE FROM concept_to_concept
+            WHERE (prereq_name, concept_name) IN (SELECT * FROM unnest(:prereq_names, :concept_names))
+            """).bindparams(
+                bindparam("prereq_names", type_=ARRAY(VARCHAR)),
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+            )
+
+        try: 
+            result = await resolve(self.db.exec(statement=query_stmt, params={
+                "prereq_names": [item.prereq_name for item in junctions],
+                "concept_names": [item.concept_name for item in junctions],
+            }))
+            await resolve(self.db.commit())
+            return result.rowcount
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg=f"Failed to delete ConceptToConcept object(s): {junctions}.")
+            raise DBError(
+                origin="ConceptToConceptRepository.delete",
+                type="QueryExecError",
+                status_code=500,
+                message=f"Failed to delete ConceptToConcept object(s): {junctions}."
+            ) from e
 
     async def update_one(
             self,
@@ -548,17 +871,17 @@ class ConceptToConceptRepository(CToCRepoProtocol):
             Updated ConceptToConcept Object
         """
         try:
-            extracted_junction = self.db.exec(
+            extracted_junction = (await resolve(self.db.exec(
                 statement=select(ConceptToConcept).where(
                     ConceptToConcept.concept_name == junction.concept_name
                 ).where(
                     ConceptToConcept.prereq_name == junction.prereq_name
                 )
-            ).one_or_none()
+            ))).one_or_none()
             extracted_junction.sqlmodel_update(updated_junction.model_dump(exclude_unset=True))
 
             self.db.add(extracted_junction)
-            self.db.commit()
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg="Failed to update ConceptToConcept object.")
@@ -569,8 +892,7 @@ class ConceptToConceptRepository(CToCRepoProtocol):
                 message="Failed to update ConceptToConcept object."
             ) from e
         try:
-            self.db.refresh(extracted_junction)
-            self.db.close()
+            await resolve(self.db.refresh(extracted_junction))
             return ConceptToConceptRead.model_validate(extracted_junction)
 
         except Exception as e:
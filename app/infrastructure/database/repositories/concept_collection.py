@@ -5,9 +5,9 @@ from typing import Optional, List, Literal, Union
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import load_only
 from fastapi import Depends
-from sqlmodel import Session, text, select
+from sqlmodel import text, select
 
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
 
 from app.app.errors.db_error import DBError
 
@@ -21,16 +21,16 @@ class CollectionRepository(CollectionRepoProtocol):
     Provides data access to collection models.
     '''
     
-    db: Session
+    db: DBSession
     
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: DBSession = Depends(get_async_session)):
         self.db = db
 
     async def add(self, collection: CollectionCreateExtended) -> CollectionRead:
         try:
             new_collection = ConceptCollection.model_validate(collection)
             self.db.add(new_collection)
-            self.db.commit()
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg=f"Failed to add Collection object.")
@@ -42,8 +42,7 @@ class CollectionRepository(CollectionRepoProtocol):
             ) from e
         
         try:
-            self.db.refresh(new_collection)
-            self.db.close()
+            await resolve(self.db.refresh(new_collection))
             return CollectionRead.model_validate(new_collection)
         
         except Exception as e:
@@ -59,8 +58,8 @@ class CollectionRepository(CollectionRepoProtocol):
     async def get_one(self, collection_id: int) -> CollectionRead:
         try:
             stmt = select(ConceptCollection).where(ConceptCollection.id == collection_id)
-            result = self.db.exec(statement=stmt)
-            return CollectionRead.model_validate(result.one().sqlmodel_update)
+            result = await resolve(self.db.exec(statement=stmt))
+            return CollectionRead.model_validate(result.one())
         
         except Exception as e:
             logger.exception(msg=f"Failed to return collection object at ID: {collection_id}.")
@@ -81,7 +80,7 @@ class CollectionRepository(CollectionRepoProtocol):
             if filter_name == "course":
                 stmt = stmt.where(text(f"course_id = {filter_id}"))
 
-            result = self.db.exec(statement=stmt)
+            result = await resolve(self.db.exec(statement=stmt))
             
             if id_only:
                 result = [collection.id for collection in result.all()]
@@ -89,7 +88,6 @@ class CollectionRepository(CollectionRepoProtocol):
             else:
                 result = [CollectionRead.model_validate(collection) for collection in result.all()]
 
-            self.db.close()
             return result
         
         except Exception as e:
@@ -103,11 +101,11 @@ class CollectionRepository(CollectionRepoProtocol):
         
     async def update(self, collection_id: int, collection_update: CollectionUpdate) -> CollectionRead:
         try:
-            collection = self.db.get(ConceptCollection, collection_id)
+            collection = await resolve(self.db.get(ConceptCollection, collection_id))
             collection.sqlmodel_update(collection_update.model_dump(exclude_unset=True))
 
             self.db.add(collection)
-            self.db.commit()
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg="Failed to update Collection object.")
@@ -118,8 +116,7 @@ class CollectionRepository(CollectionRepoProtocol):
                 message="Failed to update Collection object."
             ) from e
         try:
-            self.db.refresh(collection)
-            self.db.close()
+            await resolve(self.db.refresh(collection))
             return CollectionRead.model_validate(collection)
         
         except Exception as e:
@@ -133,7 +130,7 @@ class CollectionRepository(CollectionRepoProtocol):
     
     async def delete_from_course(self, collection_id: int, course_id: int) -> None:
         try:
-            collection = self.db.exec(statement=select(ConceptCollection).where(ConceptCollection.course_id == course_id).where(ConceptCollection.id == collection_id))
+            collection = await resolve(self.db.exec(statement=select(ConceptCollection).where(ConceptCollection.course_id == course_id).where(ConceptCollection.id == collection_id)))
             collection = collection.one_or_none()
 
         except Exception as e:
@@ -146,9 +143,8 @@ class CollectionRepository(CollectionRepoProtocol):
             ) from e
         
         try:
-            self.db.delete(collection)
-            self.db.commit()
-            self.db.close()
+            await resolve(self.db.delete(collection))
+            await resolve(self.db.commit())
 
         except Exception as e:
             logger.exception(msg=f"Failed to delete Collection object matching collection_id: {collection_id} AND course_id: {course_id}")
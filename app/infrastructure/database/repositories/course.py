@@ -2,10 +2,11 @@ import logging
 
 from typing import List, Literal, Union
 
-from sqlmodel import Session, text, select
+from fastapi import Depends
+from sqlmodel import text, select
 from sqlalchemy.exc import NoResultFound
 
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
 
 from app.app.errors.db_error import DBError
 from app.domain.models.course import Course, CourseRead, CourseCreate, CourseFilter, CourseUpdate, CourseReadVerbose
@@ -19,18 +20,18 @@ class CourseRepository(CourseRepositoryProtocol):
     
     '''
     
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
 
     async def add(self, course: CourseCreate) -> CourseRead:
         try:
             db_course = Course.model_validate(course)
             self.db.add(db_course)
-            self.db.commit()
-            self.db.refresh(db_course)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(db_course))
             return CourseRead.model_validate(db_course)
         
         except Exception as e:
@@ -45,10 +46,9 @@ class CourseRepository(CourseRepositoryProtocol):
 
     async def get_one(self, course_id: int, read_mode: Literal["normal", "verbose"] = "normal") -> Union[CourseRead, CourseReadVerbose, None]:
         query_stmt = select(Course).where(Course.id==course_id)
-        result = self.db.exec(statement=query_stmt)
+        result = await resolve(self.db.exec(statement=query_stmt))
         try:
             result = result.one()
-            self.db.close()
             if read_mode == "verbose":
                 return CourseReadVerbose.model_validate(result)
             else:
@@ -84,7 +84,7 @@ class CourseRepository(CourseRepositoryProtocol):
                     date_options = {"equal": "=", "newer": ">", "older": "<", "newer-inclusive": ">=", "older-inclusive": "<="}
                     query_stmt.where(f"c.{key} {date_options[filters['quarter_filter']]} {value}")
 
-            result = self.db.exec(statement=query_stmt)
+            result = await resolve(self.db.exec(statement=query_stmt))
             return [CourseReadVerbose.model_validate(course) for course in result.all()]
         
         except Exception as e:
@@ -108,8 +108,8 @@ class CourseRepository(CourseRepositoryProtocol):
             query_stmt = text(" ".join(["UPDATE course SET", " ,".join(set_stmt), "WHERE course_id = :course_id RETURNING *"]))
             params["course_id"] = course_id
 
-            results = self.db.exec(statement=query_stmt, params=params)
-            self.db.commit()
+            results = await resolve(self.db.exec(statement=query_stmt, params=params))
+            await resolve(self.db.commit())
 
             return CourseReadVerbose(**results.mappings().fetchone())
         
@@ -127,9 +127,8 @@ class CourseRepository(CourseRepositoryProtocol):
         try:
             query_stmt = text("DELETE FROM course WHERE course_id = :course_id")
 
-            results = self.db.exec(statement=query_stmt, params={"course_id": course_id})
-            self.db.commit()
-            self.db.close()
+            results = await resolve(self.db.exec(statement=query_stmt, params={"course_id": course_id}))
+            await resolve(self.db.commit())
 
             # return CourseReadVerbose(**results.mappings().fetchone())
         
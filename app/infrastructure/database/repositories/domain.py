@@ -5,8 +5,9 @@ from app.domain.protocols.repositories.domain import DomainRepository as DomainR
 
 from app.domain.models.concept import Concept
 
-from app.infrastructure.database.db import get_db
-from sqlmodel import Session, select, distinct
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
+from fastapi import Depends
+from sqlmodel import select, distinct
 
 
 from app.app.errors.db_error import DBError
@@ -14,16 +15,16 @@ from app.app.errors.db_error import DBError
 logger = logging.getLogger(__name__)
 
 class DomainRepository(DomainRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def get_subjects(self) -> List[str]:
         try:
-            return self.db.exec(
+            return (await resolve(self.db.exec(
                 select(distinct(Concept.subject))
-            ).all()
+            ))).all()
         
         except Exception as e:
             logger.exception(msg="Failed to retrieve subject list")
@@ -0,0 +1,138 @@
+import logging
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import Depends
+from sqlmodel import text, select, update, func, col
+from sqlalchemy.exc import NoResultFound
+
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
+
+from app.app.errors.db_error import DBError
+from app.domain.models.llm_job import LLMJob, LLMJobStatus
+from app.domain.protocols.repositories.llm_job import LLMJobRepository as LLMJobRepositoryProtocol
+
+logger = logging.getLogger(__name__)
+
+# First key of the two-key advisory lock serializing job submissions of a course, the course id is the second key
+LLM_JOB_LOCK_CLASS = 7402
+
+ACTIVE_STATUSES = (LLMJobStatus.queued, LLMJobStatus.running)
+
+
+class LLMJobRepository(LLMJobRepositoryProtocol):
+    '''
+    Provides data access to LLMJob models.
+
+    '''
+
+    db: DBSession
+
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
+
+
+    async def add_within_course_limit(self, job: LLMJob, limit: int) -> Optional[LLMJob]:
+        # The course lock is held until commit so concurrent submissions (from any worker process) count each other's jobs
+        try:
+            await resolve(self.db.exec(
+                statement=text("SELECT pg_advisory_xact_lock(:lock_class, :course_id)"),
+                params={"lock_class": LLM_JOB_LOCK_CLASS, "course_id": job.course_id}
+            ))
+            active = (await resolve(self.db.exec(
+                select(func.count()).select_from(LLMJob).where(LLMJob.course_id == job.course_id).where(col(LLMJob.status).in_(ACTIVE_STATUSES))
+            ))).one()
+            if active >= limit:
+                await resolve(self.db.rollback())
+                return None
+
+            self.db.add(job)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(job))
+            return job
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to add LLM job")
+            raise DBError(
+                origin="LLMJobRepository.add_within_course_limit",
+                type=e.__class__.__name__,
+                status_code=400,
+                message=f"Failed to add LLM job for course {job.course_id}."
+            ) from e
+
+
+    async def get_one(self, job_id: str) -> LLMJob:
+        try:
+            result = await resolve(self.db.exec(select(LLMJob).where(LLMJob.id == job_id)))
+            return result.one()
+
+        except NoResultFound as e:
+            raise DBError(origin="LLMJobRepository.get_one", type="NoResultFound", status_code=404, message=f"LLM job with ID: {job_id} not found.") from e
+
+        except Exception as e:
+            raise DBError(origin="LLMJobRepository.get_one", type=e.__class__.__name__, status_code=500, message=f"Failed using ID: {job_id}.") from e
+
+
+    async def _update(self, origin: str, stmt) -> int:
+        try:
+            result = await resolve(self.db.exec(statement=stmt))
+            await resolve(self.db.commit())
+            return result.rowcount
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg=f"Failed to update LLM jobs in {origin}")
+            raise DBError(
+                origin=f"LLMJobRepository.{origin}",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to update LLM jobs"
+            ) from e
+
+
+    async def start(self, job_id: str) -> bool:
+        # A job failed by the stale sweep while it was still queued is not started
+        now = datetime.now()
+        stmt = (
+            update(LLMJob)
+            .where(LLMJob.id == job_id)
+            .where(LLMJob.status == LLMJobStatus.queued)
+            .values(status=LLMJobStatus.running, started_at=now, heartbeat_at=now)
+        )
+        return await self._update("start", stmt) == 1
+
+
+    async def report_progress(self, job_id: str, progress: float, stage: Optional[str] = None) -> None:
+        stmt = update(LLMJob).where(LLMJob.id == job_id).values(progress=progress, stage=stage, heartbeat_at=datetime.now())
+        await self._update("report_progress", stmt)
+
+
+    async def finish(self, job_id: str, status: LLMJobStatus, result: Any = None, error: Any = None) -> None:
+        now = datetime.now()
+        values = {"status": status, "result": result, "error": error, "finished_at": now, "heartbeat_at": now}
+        if status == LLMJobStatus.succeeded:
+            values["progress"] = 1.0
+        await self._update("finish", update(LLMJob).where(LLMJob.id == job_id).values(**values))
+
+
+    async def heartbeat(self, job_ids: List[str]) -> None:
+        if not job_ids:
+            return
+        stmt = update(LLMJob).where(col(LLMJob.id).in_(job_ids)).where(col(LLMJob.status).in_(ACTIVE_STATUSES)).values(heartbeat_at=datetime.now())
+        await self._update("heartbeat", stmt)
+
+
+    async def fail_stale(self, stale_before: datetime) -> int:
+        # Jobs whose worker process stopped heartbeating (crash, restart, deploy) are never going to finish
+        stmt = (
+            update(LLMJob)
+            .where(col(LLMJob.status).in_(ACTIVE_STATUSES))
+            .where(LLMJob.heartbeat_at < stale_before)
+            .values(
+                status=LLMJobStatus.failed,
+                finished_at=datetime.now(),
+                error={"code": 500, "type": "JobInterrupted", "message": "The worker running this job stopped, please submit it again."}
+            )
+        )
+        return await self._update("fail_stale", stmt)
@@ -2,9 +2,9 @@ import logging
 
 from typing import Union
 from fastapi import Depends
-from sqlmodel import Session, select
+from sqlmodel import select
 
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
 
 from app.app.errors.db_error import DBError
 
@@ -15,17 +15,17 @@ from app.domain.models.platform_config import PlatformConfig, PlatformConfigCrea
 logger = logging.getLogger(__name__)
 
 class PlatformConfigRepository(PlatformConfigRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def add(self, platform_config: PlatformConfigCreate) -> PlatformConfigRead:
         try:
             platform_config_table = PlatformConfig.from_orm(platform_config)
             self.db.add(platform_config_table)
-            self.db.commit()
-            self.db.refresh(platform_config_table)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(platform_config_table))
             return PlatformConfigRead(**dict(platform_config_table))
         
         except Exception as e:
@@ -40,7 +40,7 @@ class PlatformConfigRepository(PlatformConfigRepoProtocol):
     async def get(self, client_id: str) -> PlatformConfigRead:
         try:
             statement = select(PlatformConfig).where(PlatformConfig.CLIENT_ID == client_id)
-            results = self.db.exec(statement=statement)
+            results = await resolve(self.db.exec(statement=statement))
             return PlatformConfigRead(**dict(results.one()))
         
         except Exception as e:
@@ -1,7 +1,7 @@
 from typing import List, Literal, Protocol, Union
 
 from fastapi import Depends
-from sqlmodel import Session, col, select
+from sqlmodel import col, select
 
 from app.domain.models.question import (
     Answer,
@@ -17,20 +17,20 @@ from app.domain.protocols.repositories.question import (
 from app.domain.protocols.repositories.question import (
     QuestionRepository as QuestionRepoProtocol,
 )
-from app.infrastructure.database.db import get_db
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
 
 
 class QuestionRepository(QuestionRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: DBSession = Depends(get_async_session)):
         self.db = db
 
     async def add(self, question: QuestionCreate) -> QuestionRead:
         question = Question.from_orm(question)
         self.db.add(question)
-        self.db.commit()
-        self.db.refresh(question)
+        await resolve(self.db.commit())
+        await resolve(self.db.refresh(question))
         return QuestionRead.from_orm(question)
 
     async def get_one_by_id(self, id: int) -> Question:
@@ -42,9 +42,9 @@ class QuestionRepository(QuestionRepoProtocol):
         Returns:
             Question to return.
         """
-        return self.db.exec(
+        return (await resolve(self.db.exec(
             select(Question).where(col(Question.id) == id)
-        ).first()
+        ))).first()
 
     async def bulk_get_by_id(self, id_list: List) -> List[Question]:
         """ This function returns all question where the ids are in the list.
@@ -55,9 +55,9 @@ class QuestionRepository(QuestionRepoProtocol):
         Returns:
             List of QuestionRead objects
         """
-        return self.db.exec(
+        return (await resolve(self.db.exec(
             select(Question).where(col(Question.id).in_(id_list))
-        ).all()
+        ))).all()
 
     async def get_all_by_concept(self, concept_list: List) -> List[QuestionRead]:
         """ This function returns all the questions for the concepts in the concept_list.
@@ -68,21 +68,21 @@ class QuestionRepository(QuestionRepoProtocol):
         Returns:
             List of QuestionRead objects
         """
-        return self.db.exec(
+        return (await resolve(self.db.exec(
             select(Question).where(col(Question.question_name).in_(concept_list))
-        ).all()
+        ))).all()
 
 class AnswerRepository(AnswerRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: DBSession = Depends(get_async_session)):
         self.db = db
 
     async def add(self, answer: AnswerCreate) -> AnswerRead:
         answer = Answer.from_orm(answer)
         self.db.add(answer)
-        self.db.commit()
-        self.db.refresh(answer)
+        await resolve(self.db.commit())
+        await resolve(self.db.refresh(answer))
         return AnswerRead.from_orm(answer)
 
     async def get_answer_for_question_id(self, id: int) -> List[Answer]:
@@ -94,9 +94,9 @@ class AnswerRepository(AnswerRepoProtocol):
         Returns:
             Returns a list of answers. (1 question has multiple Answers)
         """
-        return self.db.exec(
+        return (await resolve(self.db.exec(
             select(Answer).where(col(Answer.question_id) == id)
-        ).all()
+        ))).all()
 
 
     async def get_answers_by_question_ids(self, question_ids: List) -> List[Answer]:
@@ -108,6 +108,6 @@ class AnswerRepository(AnswerRepoProtocol):
         Returns:
             Returns a list of answers.
         """
-        return self.db.exec(
+        return await resolve(self.db.exec(
             select(Answer).where(col(Answer.question_id).in_(question_ids))
-        )
+        ))
@@ -1,27 +1,57 @@
 import logging
-from typing import List
-from sqlmodel import Session, text, delete
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Literal, Mapping, Optional, Sequence
+from fastapi import Depends
+from sqlalchemy import ARRAY, DateTime, Float, Integer, VARCHAR
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import text, delete, update, bindparam, func
 
-from app.infrastructure.database.db import get_db
-from app.domain.models.trigger_event import TriggerEventCreate, TriggerEventRead, TriggerEvent, TriggerEventProcess
+from app.infrastructure.database.db import DBSession, get_async_session, resolve
+from app.domain.models.trigger_event import (
+    TriggerEventCreate, 
+    TriggerEventRead, 
+    TriggerEvent, 
+    TriggerEventDeadLetter,
+    TriggerEventProcess, 
+    TriggerEventReduceResult, 
+    TriggerEventMaintenanceResult
+    )
 from app.domain.protocols.repositories.trigger_event import TriggerEventRepository as TriggerEventRepoProtocol
+from .client import knowledge_history_ctes
 
 from app.app.errors.db_error import DBError
 
 logger = logging.getLogger(__name__)
 
+# First key of the two-key advisory locks used to lease trigger_event partitions, the partition number is the second key
+TRIGGER_EVENT_LOCK_CLASS = 7401
+# Second key of the advisory lock taken while maintaining the daily table partitions
+PARTITION_MAINTENANCE_LOCK = -1
+# Second key of the advisory lock taken while converting an unpartitioned trigger_event table
+TABLE_MIGRATION_LOCK = -2
+
+_DAILY_PARTITION = re.compile(r"^trigger_event_p(\d{8})$")
+
+def _daily_partition_ddl(day: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS trigger_event_p{day:%Y%m%d} PARTITION OF trigger_event "
+        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+    )
+
 class TriggerEventRepository(TriggerEventRepoProtocol):
-    db: Session
+    db: DBSession
     
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db: DBSession = Depends(get_async_session)):
+        self.db = db
 
     async def add(self, event: TriggerEventCreate) -> TriggerEventRead:
         try:
             event_obj = TriggerEvent.model_validate(event)
             self.db.add(event_obj)
-            self.db.commit()
-            self.db.refresh(event_obj)
+            await resolve(self.db.commit())
+            await resolve(self.db.refresh(event_obj))
 
             return TriggerEventRead.model_validate(event_obj)
         
@@ -38,10 +68,10 @@ class TriggerEventRepository(TriggerEventRepoProtocol):
         try:
             event_objs = [TriggerEvent.model_validate(event) for event in events]
             self.db.add_all(event_objs)
-            self.db.commit()
+            await resolve(self.db.commit())
 
             for item in event_objs:
-                self.db.refresh(item)
+                await resolve(self.db.refresh(item))
 
             return [TriggerEventRead.model_validate(event) for event in event_objs]
         
@@ -54,12 +84,76 @@ class TriggerEventRepository(TriggerEventRepoProtocol):
                 message="Failed to add Trigger Events."
             ) from e
         
+    async def bulk_insert(self, events: List[TriggerEventCreate]) -> int:
+        # Events of students or concepts that no longer exist go to trigger_event_dead_letter rather than failing the whole
+        # batch on a foreign key violation
+        stmt = text(
+            """
+            WITH event AS (
+                SELECT 
+                    event.*,
+                    EXISTS (SELECT 1 FROM client WHERE client.id = event.student_id)
+                    AND EXISTS (SELECT 1 FROM concept WHERE concept.name = event.concept) AS referenced
+                FROM unnest(:datetime_stamps, :student_ids, :concepts, :values, :weights) AS event(datetime_stamp, student_id, concept, value, weight)
+            ),
+            inserted AS (
+                INSERT INTO trigger_event (datetime_stamp, student_id, concept, value, weight)
+                SELECT datetime_stamp, student_id, concept, value, weight
+                FROM event
+                WHERE referenced
+                RETURNING 1
+            ),
+            dropped AS (
+                INSERT INTO trigger_event_dead_letter (datetime_stamp, student_id, concept, value, weight, error, failed_at)
+                SELECT datetime_stamp, student_id, concept, value, weight, 'Missing student or concept', now()
+                FROM event
+                WHERE NOT referenced
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM inserted) AS inserted, (SELECT COUNT(*) FROM dropped) AS dropped
+            """
+            ).bindparams(
+                bindparam("datetime_stamps", type_=ARRAY(DateTime)),
+                bindparam("student_ids", type_=ARRAY(Integer)),
+                bindparam("concepts", type_=ARRAY(VARCHAR)),
+                bindparam("values", type_=ARRAY(Float)),
+                bindparam("weights", type_=ARRAY(Float)),
+            )
+
+        try:
+            events = [TriggerEventCreate.model_validate(event) for event in events]
+            if not events:
+                return 0
+
+            result = await resolve(self.db.exec(statement=stmt, params={
+                "datetime_stamps": [event.datetime_stamp for event in events],
+                "student_ids": [event.student_id for event in events],
+                "concepts": [event.concept for event in events],
+                "values": [event.value for event in events],
+                "weights": [event.weight for event in events],
+            }))
+            result = result.mappings().one()
+            await resolve(self.db.commit())
+
+            if result["dropped"]:
+                logger.warning(f"Moved {result['dropped']} trigger events referencing missing students or concepts to trigger_event_dead_letter")
+            return result["inserted"]
+        
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to insert Trigger Events.")
+            raise DBError(
+                origin="TriggerEventRepository.bulk_insert",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to insert Trigger Events."
+            ) from e
+        
     async def queue_check(self) -> bool:
         try:
-            stmt = text("SELECT exists (SELECT * FROM trigger_event limit 1)")
-            result = self.db.exec(statement=stmt)
+            stmt = text("SELECT exists (SELECT 1 FROM trigger_event WHERE processed_at IS NULL)")
+            result = await resolve(self.db.exec(statement=stmt))
             result = result.one()
-            self.db.close()
             return result[0]
         
         except Exception as e:
@@ -77,14 +171,14 @@ class TriggerEventRepository(TriggerEventRepoProtocol):
                 """
                 SELECT student_id, concept, SUM(weight * value) numerator, SUM(weight) denominator, array_agg ( event_id ) event_ids
                 FROM trigger_event
+                WHERE processed_at IS NULL
                 GROUP BY GROUPING SETS ((student_id, concept))
                 LIMIT :max_batch_size
                 """
                 )
             
-            results = self.db.exec(statement=stmt, params={"max_batch_size": max_batch_size})
+            results = await resolve(self.db.exec(statement=stmt, params={"max_batch_size": max_batch_size}))
             results = [TriggerEventProcess(**event) for event in results.mappings().all()]
-            self.db.close()
             return results
         
         except Exception as e:
@@ -99,9 +193,8 @@ class TriggerEventRepository(TriggerEventRepoProtocol):
     async def bulk_delete(self, event_ids: list[int]):
         try:
             stmt = delete(TriggerEvent).where(TriggerEvent.event_id.in_(event_ids))
-            self.db.exec(statement=stmt)
-            self.db.commit()
-            self.db.close()
+            await resolve(self.db.exec(statement=stmt))
+            await resolve(self.db.commit())
             
         except Exception as e:
             logger.exception(msg="Failed to delete event object")
@@ -110,4 +203,464 @@ class TriggerEventRepository(TriggerEventRepoProtocol):
                 type="QueryExecError",
                 status_code=500,
                 message="Failed to delete event object"
-            ) from e
\ No newline at end of file
+            ) from e
+
+    async def mark_processed(self, event_ids: list[int]):
+        try:
+            stmt = update(TriggerEvent).where(TriggerEvent.event_id.in_(event_ids)).values(processed_at=func.now())
+            await resolve(self.db.exec(statement=stmt))
+            await resolve(self.db.commit())
+            
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to mark events as processed")
+            raise DBError(
+                origin="TriggerEventRepository.mark_processed",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to mark events as processed"
+            ) from e
+
+    async def reduce_queue(
+            self, 
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1, 
+            prior_numerator: float = 0.5, 
+            prior_denominator: float = 1.0
+    ) -> TriggerEventReduceResult:
+        # Students are spread over partitions by hash, a worker leases a partition with a transaction scoped advisory lock
+        # so every student's knowledge rows are written by one worker at a time, and claims rows with SKIP LOCKED.
+        # Marking the events processed and applying them commit together: a failed batch rolls back and is retried as a whole.
+        # change_history is normally appended by an ORM listener on StudentKnowledge, this statement bypasses the ORM so it appends the entry itself.
+        # Every written row also gets a point in student_knowledge_history and its day and week rollups.
+        stmt = text(
+            """
+            WITH lease AS (
+                SELECT pg_try_advisory_xact_lock(:lock_class, :partition) AS acquired
+            ),
+            claimed AS (
+                SELECT event_id, datetime_stamp
+                FROM trigger_event
+                WHERE (SELECT acquired FROM lease)
+                AND processed_at IS NULL
+                AND (:partitions = 1 OR abs(hashint4(student_id)::bigint) % :partitions = :partition)
+                ORDER BY event_id
+                LIMIT :max_batch_size
+                FOR UPDATE SKIP LOCKED
+            ),
+            consumed AS (
+                UPDATE trigger_event
+                SET processed_at = now()
+                FROM claimed
+                WHERE trigger_event.event_id = claimed.event_id AND trigger_event.datetime_stamp = claimed.datetime_stamp
+                RETURNING trigger_event.student_id, trigger_event.concept, trigger_event.weight, trigger_event.value
+            ),
+            folded AS (
+                SELECT student_id, concept, SUM(weight * value) AS numerator, SUM(weight) AS denominator, COUNT(*) AS no_of_inputs
+                FROM consumed
+                GROUP BY student_id, concept
+            ),
+            upserted AS (
+                INSERT INTO student_knowledge AS sk (student_id, concept_name, numerator, denominator, score, no_of_inputs, change_history)
+                SELECT
+                    student_id,
+                    concept,
+                    numerator + :prior_numerator,
+                    denominator + :prior_denominator,
+                    (numerator + :prior_numerator) / (denominator + :prior_denominator),
+                    no_of_inputs,
+                    json_build_array(json_build_object(
+                        'timestamp', to_char(LOCALTIMESTAMP, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                        'score', (numerator + :prior_numerator) / (denominator + :prior_denominator),
+                        'no_of_inputs', no_of_inputs
+                    ))
+                FROM folded
+                ON CONFLICT (student_id, concept_name) DO UPDATE SET
+                    numerator = sk.numerator + EXCLUDED.numerator - :prior_numerator,
+                    denominator = sk.denominator + EXCLUDED.denominator - :prior_denominator,
+                    score = (sk.numerator + EXCLUDED.numerator - :prior_numerator) / (sk.denominator + EXCLUDED.denominator - :prior_denominator),
+                    no_of_inputs = COALESCE(sk.no_of_inputs, 0) + EXCLUDED.no_of_inputs,
+                    change_history = (
+                        COALESCE(sk.change_history::jsonb, '[]'::jsonb) || jsonb_build_array(jsonb_build_object(
+                            'timestamp', to_char(LOCALTIMESTAMP, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                            'score', (sk.numerator + EXCLUDED.numerator - :prior_numerator) / (sk.denominator + EXCLUDED.denominator - :prior_denominator),
+                            'no_of_inputs', COALESCE(sk.no_of_inputs, 0) + EXCLUDED.no_of_inputs
+                        ))
+                    )::json
+                RETURNING sk.student_id, sk.concept_name, sk.score, sk.no_of_inputs
+            ),
+            """ + knowledge_history_ctes("upserted") + """
+            SELECT (SELECT COUNT(*) FROM upserted) AS groups, (SELECT COUNT(*) FROM consumed) AS events
+            """
+            )
+
+        try:
+            result = await resolve(self.db.exec(statement=stmt, params={
+                "max_batch_size": max_batch_size, 
+                "lock_class": TRIGGER_EVENT_LOCK_CLASS,
+                "partition": partition,
+                "partitions": partitions,
+                "prior_numerator": prior_numerator, 
+                "prior_denominator": prior_denominator
+                }))
+            result = TriggerEventReduceResult(**result.mappings().one())
+            await resolve(self.db.commit())
+            return result
+        
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to reduce trigger event queue")
+            raise DBError(
+                origin="TriggerEventRepository.reduce_queue",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to reduce trigger event queue"
+            ) from e
+
+    async def apply_queue(
+            self, 
+            update: Callable[[Sequence[Mapping], Sequence[Mapping]], List[Dict]],
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1
+    ) -> TriggerEventReduceResult:
+        # Same claiming as reduce_queue, but the new knowledge rows are computed in Python by update(events, knowledge_rows).
+        # Claiming, reading the current rows, writing the new ones and marking the events processed share one transaction.
+        claim_stmt = text(
+            """
+            WITH lease AS (
+                SELECT pg_try_advisory_xact_lock(:lock_class, :partition) AS acquired
+            ),
+            claimed AS (
+                SELECT event_id, datetime_stamp
+                FROM trigger_event
+                WHERE (SELECT acquired FROM lease)
+                AND processed_at IS NULL
+                AND (:partitions = 1 OR abs(hashint4(student_id)::bigint) % :partitions = :partition)
+                ORDER BY event_id
+                LIMIT :max_batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE trigger_event
+            SET processed_at = now()
+            FROM claimed
+            WHERE trigger_event.event_id = claimed.event_id AND trigger_event.datetime_stamp = claimed.datetime_stamp
+            RETURNING trigger_event.event_id, trigger_event.student_id, trigger_event.concept, trigger_event.value, trigger_event.weight
+            """
+            )
+        knowledge_stmt = text(
+            """
+            SELECT sk.student_id, sk.concept_name, sk.numerator, sk.denominator, sk.score, sk.no_of_inputs
+            FROM student_knowledge sk
+            JOIN unnest(:student_ids, :concept_names) AS pair(student_id, concept_name)
+            ON sk.student_id = pair.student_id AND sk.concept_name = pair.concept_name
+            FOR UPDATE OF sk
+            """
+            ).bindparams(
+                bindparam("student_ids", type_=ARRAY(Integer)),
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+            )
+        upsert_stmt = text(
+            """
+            WITH upserted AS (
+                INSERT INTO student_knowledge AS sk (student_id, concept_name, numerator, denominator, score, no_of_inputs, change_history)
+                SELECT
+                    new_row.student_id, new_row.concept_name, new_row.numerator, new_row.denominator, new_row.score, new_row.no_of_inputs,
+                    json_build_array(json_build_object(
+                        'timestamp', to_char(LOCALTIMESTAMP, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                        'score', new_row.score,
+                        'no_of_inputs', new_row.no_of_inputs
+                    ))
+                FROM unnest(:student_ids, :concept_names, :numerators, :denominators, :scores, :no_of_inputs) 
+                    AS new_row(student_id, concept_name, numerator, denominator, score, no_of_inputs)
+                ON CONFLICT (student_id, concept_name) DO UPDATE SET
+                    numerator = EXCLUDED.numerator,
+                    denominator = EXCLUDED.denominator,
+                    score = EXCLUDED.score,
+                    no_of_inputs = EXCLUDED.no_of_inputs,
+                    change_history = (COALESCE(sk.change_history::jsonb, '[]'::jsonb) || EXCLUDED.change_history::jsonb)::json
+                RETURNING sk.student_id, sk.concept_name, sk.score, sk.no_of_inputs
+            ),
+            """ + knowledge_history_ctes("upserted") + """
+            SELECT COUNT(*) FROM upserted
+            """
+            ).bindparams(
+                bindparam("student_ids", type_=ARRAY(Integer)),
+                bindparam("concept_names", type_=ARRAY(VARCHAR)),
+                bindparam("numerators", type_=ARRAY(Float)),
+                bindparam("denominators", type_=ARRAY(Float)),
+                bindparam("scores", type_=ARRAY(Float)),
+                bindparam("no_of_inputs", type_=ARRAY(Integer)),
+            )
+
+        try:
+            events = (await resolve(self.db.exec(statement=claim_stmt, params={
+                "max_batch_size": max_batch_size, 
+                "lock_class": TRIGGER_EVENT_LOCK_CLASS,
+                "partition": partition,
+                "partitions": partitions,
+                }))).mappings().all()
+            if not events:
+                await resolve(self.db.rollback())
+                return TriggerEventReduceResult(groups=0, events=0)
+
+            pairs = list(dict.fromkeys((event["student_id"], event["concept"]) for event in events))
+            knowledge = (await resolve(self.db.exec(statement=knowledge_stmt, params={
+                "student_ids": [pair[0] for pair in pairs],
+                "concept_names": [pair[1] for pair in pairs],
+                }))).mappings().all()
+
+            rows = update(events, knowledge)
+            await resolve(self.db.exec(statement=upsert_stmt, params={
+                "student_ids": [row["student_id"] for row in rows],
+                "concept_names": [row["concept_name"] for row in rows],
+                "numerators": [row["numerator"] for row in rows],
+                "denominators": [row["denominator"] for row in rows],
+                "scores": [row["score"] for row in rows],
+                "no_of_inputs": [row["no_of_inputs"] for row in rows],
+                }))
+            await resolve(self.db.commit())
+            return TriggerEventReduceResult(groups=len(rows), events=len(events))
+        
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to apply trigger event queue")
+            raise DBError(
+                origin="TriggerEventRepository.apply_queue",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to apply trigger event queue"
+            ) from e
+
+    async def migrate_table(self, days_ahead: int = 3) -> bool:
+        """
+        Converts a trigger_event table created before partitioning into the partitioned table, in one transaction:
+        adds processed_at, renames the old table aside, creates the partitioned table with its index, default partition
+        and the daily partitions up to days_ahead, moves the rows over and drops the old table.
+        Only makes sure the default partition exists when the table is already partitioned, does nothing when it doesn't exist.
+        Returns True when the table was converted.
+        """
+        table = TriggerEvent.__table__
+        dialect = postgresql.dialect()
+        try:
+            # Blocking lock, processes starting together wait for the first one and then find the table converted
+            await resolve(self.db.exec(
+                statement=text("SELECT pg_advisory_xact_lock(:lock_class, :lock)"),
+                params={"lock_class": TRIGGER_EVENT_LOCK_CLASS, "lock": TABLE_MIGRATION_LOCK}
+                ))
+            relkind = (await resolve(self.db.exec(
+                statement=text("SELECT relkind FROM pg_class WHERE oid = to_regclass('trigger_event')")
+                ))).scalar()
+
+            if relkind != "r":
+                if relkind == "p":
+                    await resolve(self.db.exec(statement=text("CREATE TABLE IF NOT EXISTS trigger_event_default PARTITION OF trigger_event DEFAULT")))
+                await resolve(self.db.commit())
+                return False
+
+            # Events were deleted once applied before processed_at existed, every remaining row is still unprocessed
+            # so the backfill leaves processed_at NULL.
+            await resolve(self.db.exec(statement=text("ALTER TABLE trigger_event ADD COLUMN IF NOT EXISTS processed_at TIMESTAMP WITHOUT TIME ZONE")))
+            await resolve(self.db.exec(statement=text("ALTER TABLE trigger_event RENAME TO trigger_event_legacy")))
+
+            # Free the names the new table's primary key, sequence and index need
+            primary_key = (await resolve(self.db.exec(
+                statement=text("SELECT conname FROM pg_constraint WHERE conrelid = 'trigger_event_legacy'::regclass AND contype = 'p'")
+                ))).scalar()
+            if primary_key is not None:
+                await resolve(self.db.exec(statement=text(f'ALTER TABLE trigger_event_legacy RENAME CONSTRAINT "{primary_key}" TO trigger_event_legacy_pkey')))
+            sequence = (await resolve(self.db.exec(
+                statement=text("SELECT pg_get_serial_sequence('trigger_event_legacy', 'event_id')")
+                ))).scalar()
+            if sequence is not None:
+                await resolve(self.db.exec(statement=text(f"ALTER SEQUENCE {sequence} RENAME TO trigger_event_legacy_event_id_seq")))
+            await resolve(self.db.exec(statement=text("DROP INDEX IF EXISTS ix_trigger_event_unprocessed")))
+
+            await resolve(self.db.exec(statement=text(str(CreateTable(table).compile(dialect=dialect)))))
+            for index in table.indexes:
+                await resolve(self.db.exec(statement=text(str(CreateIndex(index).compile(dialect=dialect)))))
+            await resolve(self.db.exec(statement=text("CREATE TABLE IF NOT EXISTS trigger_event_default PARTITION OF trigger_event DEFAULT")))
+            # Older rows land in the default partition
+            today = date.today()
+            for offset in range(days_ahead + 1):
+                await resolve(self.db.exec(statement=text(_daily_partition_ddl(today + timedelta(days=offset)))))
+
+            moved = await resolve(self.db.exec(statement=text(
+                """
+                INSERT INTO trigger_event (event_id, datetime_stamp, student_id, concept, value, weight, processed_at)
+                SELECT event_id, datetime_stamp, student_id, concept, value, weight, processed_at
+                FROM trigger_event_legacy
+                """
+                )))
+            await resolve(self.db.exec(statement=text(
+                "SELECT setval(pg_get_serial_sequence('trigger_event', 'event_id'), COALESCE((SELECT MAX(event_id) FROM trigger_event), 0) + 1, false)"
+                )))
+            await resolve(self.db.exec(statement=text("DROP TABLE trigger_event_legacy")))
+            await resolve(self.db.commit())
+
+            logger.info(f"Moved {moved.rowcount} trigger events into the partitioned trigger_event table")
+            return True
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to migrate the trigger_event table")
+            raise DBError(
+                origin="TriggerEventRepository.migrate_table",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to migrate the trigger_event table"
+            ) from e
+
+    async def create_dead_letter_table(self):
+        """
+        Creates trigger_event_dead_letter on databases created before it existed.
+        """
+        try:
+            await resolve(self.db.exec(statement=text(str(
+                CreateTable(TriggerEventDeadLetter.__table__, if_not_exists=True).compile(dialect=postgresql.dialect())
+                ))))
+            await resolve(self.db.commit())
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to create trigger_event_dead_letter")
+            raise DBError(
+                origin="TriggerEventRepository.create_dead_letter_table",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to create trigger_event_dead_letter"
+            ) from e
+
+    async def dead_letter_batch(
+            self, 
+            error: str, 
+            max_batch_size: int, 
+            partition: int = 0, 
+            partitions: int = 1, 
+            event_ids: Optional[List[int]] = None
+    ) -> int:
+        """
+        Moves the unprocessed events of event_ids, or else the batch reduce_queue/apply_queue would claim next from the partition,
+        into trigger_event_dead_letter with the error. Returns the number of events moved.
+        """
+        if event_ids is not None:
+            selection = "event_id = ANY(:event_ids)"
+            params = {"event_ids": event_ids, "max_batch_size": len(event_ids)}
+        else:
+            selection = "(:partitions = 1 OR abs(hashint4(student_id)::bigint) % :partitions = :partition)"
+            params = {"partition": partition, "partitions": partitions, "max_batch_size": max_batch_size}
+
+        stmt = text(
+            f"""
+            WITH batch AS (
+                SELECT event_id, datetime_stamp
+                FROM trigger_event
+                WHERE processed_at IS NULL
+                AND {selection}
+                ORDER BY event_id
+                LIMIT :max_batch_size
+                FOR UPDATE SKIP LOCKED
+            ),
+            moved AS (
+                DELETE FROM trigger_event
+                USING batch
+                WHERE trigger_event.event_id = batch.event_id AND trigger_event.datetime_stamp = batch.datetime_stamp
+                RETURNING trigger_event.event_id, trigger_event.datetime_stamp, trigger_event.student_id, trigger_event.concept, trigger_event.value, trigger_event.weight
+            )
+            INSERT INTO trigger_event_dead_letter (event_id, datetime_stamp, student_id, concept, value, weight, error, failed_at)
+            SELECT event_id, datetime_stamp, student_id, concept, value, weight, :error, now()
+            FROM moved
+            """
+            )
+        if event_ids is not None:
+            stmt = stmt.bindparams(bindparam("event_ids", type_=ARRAY(Integer)))
+
+        try:
+            result = await resolve(self.db.exec(statement=stmt, params={"error": error, **params}))
+            await resolve(self.db.commit())
+            return result.rowcount
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to move trigger events to the dead letter table")
+            raise DBError(
+                origin="TriggerEventRepository.dead_letter_batch",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to move trigger events to the dead letter table"
+            ) from e
+
+    async def maintain_partitions(
+            self, 
+            days_ahead: int = 3, 
+            retention_days: int = 30, 
+            archive_mode: Literal["detach", "drop"] = "detach"
+    ) -> TriggerEventMaintenanceResult:
+        """
+        Creates the daily partitions from today to days_ahead days out, then detaches (keeping the table as an archive)
+        or drops the daily partitions older than retention_days whose events have all been processed.
+        Runs under an advisory lock so only one process maintains the partitions at a time.
+        """
+        result = TriggerEventMaintenanceResult()
+        try:
+            acquired = (await resolve(self.db.exec(
+                statement=text("SELECT pg_try_advisory_xact_lock(:lock_class, :lock)"),
+                params={"lock_class": TRIGGER_EVENT_LOCK_CLASS, "lock": PARTITION_MAINTENANCE_LOCK}
+                ))).scalar()
+            if not acquired:
+                await resolve(self.db.rollback())
+                return result
+
+            today = date.today()
+            for offset in range(days_ahead + 1):
+                day = today + timedelta(days=offset)
+                name = f"trigger_event_p{day:%Y%m%d}"
+                exists = (await resolve(self.db.exec(statement=text("SELECT to_regclass(:name) IS NOT NULL"), params={"name": name}))).scalar()
+                # A day that already has rows in the default partition can't be split out of it
+                in_default = (await resolve(self.db.exec(
+                    statement=text("SELECT exists (SELECT 1 FROM trigger_event_default WHERE datetime_stamp >= :start AND datetime_stamp < :end)"),
+                    params={"start": day, "end": day + timedelta(days=1)}
+                    ))).scalar()
+                if in_default:
+                    logger.warning(f"Events for {day} are in trigger_event_default, partition {name} not created")
+                elif not exists:
+                    await resolve(self.db.exec(statement=text(_daily_partition_ddl(day))))
+                    result.created.append(name)
+
+            partitions = (await resolve(self.db.exec(statement=text(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = 'trigger_event'::regclass
+                """
+                )))).scalars().all()
+
+            cutoff = today - timedelta(days=retention_days)
+            for name in sorted(partitions):
+                match = _DAILY_PARTITION.match(name)
+                if match is None or date(int(match[1][:4]), int(match[1][4:6]), int(match[1][6:])) >= cutoff:
+                    continue
+
+                pending = (await resolve(self.db.exec(statement=text(f"SELECT exists (SELECT 1 FROM {name} WHERE processed_at IS NULL)")))).scalar()
+                if pending:
+                    continue
+
+                await resolve(self.db.exec(statement=text(f"ALTER TABLE trigger_event DETACH PARTITION {name}")))
+                if archive_mode == "drop":
+                    await resolve(self.db.exec(statement=text(f"DROP TABLE {name}")))
+                result.archived.append(name)
+
+            await resolve(self.db.commit())
+            return result
+
+        except Exception as e:
+            await resolve(self.db.rollback())
+            logger.exception(msg="Failed to maintain trigger event partitions")
+            raise DBError(
+                origin="TriggerEventRepository.maintain_partitions",
+                type="QueryExecError",
+                status_code=500,
+                message="Failed to maintain trigger event partitions"
+            ) from e
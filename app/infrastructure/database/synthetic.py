@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+"""
+Synthetic data generator and trigger event pipeline benchmark.
+
+    python -m app.infrastructure.database.synthetic generate --students 100000 --concepts 500 --events 10000000
+    python -m app.infrastructure.database.synthetic bench --mode reduce --workers 4 --replay
+    python -m app.infrastructure.database.synthetic clean
+
+Rows are written with COPY. Every generated row is recognisable by its name ('Synthetic Course 1', 'Synthetic Concept 000001',
+platform id 'synthetic-1'), clean removes them and everything cascading from them. Meant for a local database, bench
+drains every unprocessed trigger event, not only the synthetic ones.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from threading import Thread
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlmodel import SQLModel
+
+from app.config.environment import get_settings
+from app.domain.models.client import Client, ClientToCourse, StudentKnowledge, StudentKnowledgeHistory, StudentKnowledgeRollup
+from app.domain.models.concept import Concept, ConceptToCollection, ConceptToConcept
+from app.domain.models.concept_collection import CollectionTypes, ConceptCollection
+from app.domain.models.course import Course
+from app.domain.models.question import Question, QuestionTypes
+from app.domain.models.trigger_event import TriggerEvent
+from app.infrastructure.database.db import get_engine
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+SYNTHETIC_PLATFORM_PREFIX = "synthetic-"
+_SYNTHETIC_STUDENTS = f"SELECT id FROM client WHERE platform_id LIKE '{SYNTHETIC_PLATFORM_PREFIX}%'"
+
+
+@dataclass
+class SyntheticVolumes:
+    courses: int = 10
+    modules_per_course: int = 10
+    concepts: int = 500
+    prereqs_per_concept: int = 3
+    questions_per_concept: int = 5
+    students: int = 100_000
+    events: int = 10_000_000
+    days: int = 30
+
+
+def _encode(value: Any) -> str:
+    # COPY text format, generated values never contain tabs, newlines or backslashes
+    return "\\N" if value is None else str(value)
+
+
+def _copy(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]], chunk_size: int, commit=None) -> int:
+    """
+    Streams rows into table with COPY, chunk_size rows at a time. commit is called after every chunk when given.
+    """
+    quoted = ", ".join('"' + column + '"' for column in columns)
+    statement = f"COPY {table} ({quoted}) FROM STDIN"
+    rows = iter(rows)
+    count = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return count
+
+        cursor.copy_expert(statement, io.StringIO("".join("\t".join(map(_encode, row)) + "\n" for row in chunk)))
+        count += len(chunk)
+        if commit is not None:
+            commit()
+            logger.info(f"Copied {count} rows into {table}")
+
+
+class SyntheticDataGenerator:
+    """
+    Generates a consistent data set: every student is enrolled in one course and only answers concepts of that course,
+    prerequisite edges only point at earlier concepts of the same course so the graph stays acyclic.
+    Serial ids are assigned explicitly after the current maximum and the sequences moved past them.
+    """
+    def __init__(self, volumes: SyntheticVolumes, seed: int = 0, chunk_size: int = 100_000):
+        self.volumes = volumes
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+
+    def run(self):
+        SQLModel.metadata.create_all(bind=get_engine())
+
+        connection = get_engine().raw_connection()
+        try:
+            cursor = connection.cursor()
+            start = time.perf_counter()
+
+            course_ids = self._courses(cursor)
+            collection_ids = self._collections(cursor, course_ids)
+            course_concepts = self._concepts(cursor, course_ids, collection_ids)
+            self._prerequisites(cursor, course_concepts)
+            self._questions(cursor, course_concepts)
+            student_courses = self._students(cursor, course_ids)
+            connection.commit()
+
+            self._events(cursor, student_courses, course_concepts, commit=connection.commit)
+            connection.commit()
+            cursor.close()
+
+            logger.info(f"Generated synthetic data in {time.perf_counter() - start:.1f}s")
+        finally:
+            connection.close()
+
+    def _next_id(self, cursor, table: str) -> int:
+        cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+        return cursor.fetchone()[0]
+
+    def _sync_sequence(self, cursor, table: str):
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+
+    def _courses(self, cursor) -> List[int]:
+        first = self._next_id(cursor, Course.__tablename__)
+        ids = list(range(first, first + self.volumes.courses))
+        quarter = date.today().isoformat()
+        _copy(
+            cursor, Course.__tablename__,
+            ("id", "name", "quarter", "instructor", "summary", "subjects", "difficulty"),
+            ((i, f"Synthetic Course {i}", quarter, "Synthetic Instructor", None, '["Synthetic"]', self.rng.randint(1, 5)) for i in ids),
+            self.chunk_size
+            )
+        self._sync_sequence(cursor, Course.__tablename__)
+        return ids
+
+    def _collections(self, cursor, course_ids: List[int]) -> Dict[int, List[int]]:
+        first = self._next_id(cursor, ConceptCollection.__tablename__)
+        collections = {}
+        rows = []
+        for course_id in course_ids:
+            collections[course_id] = list(range(first, first + self.volumes.modules_per_course))
+            for order, collection_id in enumerate(collections[course_id]):
+                rows.append((collection_id, f"Synthetic Module {collection_id}", None, CollectionTypes.module.name, order, course_id))
+            first += self.volumes.modules_per_course
+
+        _copy(cursor, ConceptCollection.__tablename__, ("id", "label", "content_summary", "type", "order", "course_id"), rows, self.chunk_size)
+        self._sync_sequence(cursor, ConceptCollection.__tablename__)
+        return collections
+
+    def _concepts(self, cursor, course_ids: List[int], collection_ids: Dict[int, List[int]]) -> Dict[int, List[str]]:
+        """
+        Spreads the concepts round robin over the courses and, in order, over the modules of each course.
+        """
+        cursor.execute("SELECT count(*) FROM concept WHERE name LIKE 'Synthetic Concept %'")
+        offset = cursor.fetchone()[0]
+
+        course_concepts: Dict[int, List[str]] = {course_id: [] for course_id in course_ids}
+        for i in range(self.volumes.concepts):
+            course_concepts[course_ids[i % len(course_ids)]].append(f"Synthetic Concept {offset + i + 1:06d}")
+
+        _copy(
+            cursor, Concept.__tablename__,
+            ("name", "subject", "difficulty", "summary"),
+            ((name, "Synthetic", self.rng.randint(1, 5), None) for names in course_concepts.values() for name in names),
+            self.chunk_size
+            )
+        _copy(
+            cursor, ConceptToCollection.__tablename__,
+            ("concept_name", "collection_id"),
+            (
+                (name, collection_ids[course_id][j * len(collection_ids[course_id]) // len(names)])
+                for course_id, names in course_concepts.items()
+                for j, name in enumerate(names)
+            ),
+            self.chunk_size
+            )
+        return course_concepts
+
+    def _prerequisites(self, cursor, course_concepts: Dict[int, List[str]]):
+        def edges() -> Iterator[tuple]:
+            for names in course_concepts.values():
+                for j, name in enumerate(names[1:], start=1):
+                    for prereq in self.rng.sample(names[:j], min(j, self.volumes.prereqs_per_concept)):
+                        yield (name, prereq)
+
+        _copy(cursor, ConceptToConcept.__tablename__, ("concept_name", "prereq_name"), edges(), self.chunk_size)
+
+    def _questions(self, cursor, course_concepts: Dict[int, List[str]]):
+        first = self._next_id(cursor, Question.__tablename__)
+        names = [name for concept_names in course_concepts.values() for name in concept_names]
+        _copy(
+            cursor, Question.__tablename__,
+            ("id", "concept_name", "question_type", "question_text", "points_possible"),
+            (
+                (first + i, name, QuestionTypes.multiple_choice.name, f"Synthetic question {first + i} about {name}", 1)
+                for i, name in enumerate(name for name in names for _ in range(self.volumes.questions_per_concept))
+            ),
+            self.chunk_size
+            )
+        self._sync_sequence(cursor, Question.__tablename__)
+
+    def _students(self, cursor, course_ids: List[int]) -> Dict[int, int]:
+        first = self._next_id(cursor, Client.__tablename__)
+        ids = range(first, first + self.volumes.students)
+        _copy(cursor, Client.__tablename__, ("id", "platform_id"), ((i, f"{SYNTHETIC_PLATFORM_PREFIX}{i}") for i in ids), self.chunk_size)
+        self._sync_sequence(cursor, Client.__tablename__)
+
+        student_courses = {i: course_ids[i % len(course_ids)] for i in ids}
+        _copy(cursor, ClientToCourse.__tablename__, ("client_id", "course_id"), student_courses.items(), self.chunk_size)
+        return student_courses
+
+    def _events(self, cursor, student_courses: Dict[int, int], course_concepts: Dict[int, List[str]], commit):
+        """
+        Every student gets a hidden ability, answers are correct with that probability so the reduced scores converge
+        to something meaningful. Timestamps are spread over the last volumes.days days.
+        """
+        students = list(student_courses)
+        ability = {student_id: self.rng.betavariate(2, 2) for student_id in students}
+        now = datetime.now()
+        span = self.volumes.days * 86400.0
+        rng = self.rng
+
+        def events() -> Iterator[tuple]:
+            for _ in range(self.volumes.events):
+                student_id = rng.choice(students)
+                concept = rng.choice(course_concepts[student_courses[student_id]])
+                value = 1.0 if rng.random() < ability[student_id] else 0.0
+                stamp = now - timedelta(seconds=rng.random() * span)
+                yield (stamp.isoformat(sep=" "), student_id, concept, value, rng.choice((0.5, 1.0, 2.0)))
+
+        _copy(
+            cursor, TriggerEvent.__tablename__,
+            ("datetime_stamp", "student_id", "concept", "value", "weight"),
+            events(),
+            self.chunk_size,
+            commit=commit
+            )
+
+
+def clean():
+    """
+    Deletes the synthetic courses, concepts and students. Collections, junctions, questions, knowledge rows and
+    trigger events go with them through their cascading foreign keys.
+    """
+    _execute(
+        f"DELETE FROM client WHERE id IN ({_SYNTHETIC_STUDENTS})",
+        "DELETE FROM concept WHERE name LIKE 'Synthetic Concept %'",
+        "DELETE FROM course WHERE name LIKE 'Synthetic Course %'"
+        )
+
+
+def _execute(*statements: str) -> Any:
+    """
+    Runs statements in one transaction and returns the first column of the first row of the last one, if any.
+    """
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        row = cursor.fetchone() if cursor.description else None
+        connection.commit()
+        cursor.close()
+        return row[0] if row else None
+    finally:
+        connection.close()
+
+
+def replay():
+    """
+    Marks the synthetic trigger events unprocessed again and forgets what was learnt from them.
+    """
+    _execute(
+        f"DELETE FROM {StudentKnowledge.__tablename__} WHERE student_id IN ({_SYNTHETIC_STUDENTS})",
+        f"DELETE FROM {StudentKnowledgeHistory.__tablename__} WHERE student_id IN ({_SYNTHETIC_STUDENTS})",
+        f"DELETE FROM {StudentKnowledgeRollup.__tablename__} WHERE student_id IN ({_SYNTHETIC_STUDENTS})",
+        f"UPDATE trigger_event SET processed_at = NULL WHERE processed_at IS NOT NULL AND student_id IN ({_SYNTHETIC_STUDENTS})"
+        )
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def bench(mode: str, workers: int, batch_size: int, partitions: int, strategy: str, replay_events: bool, timeout: float) -> dict:
+    """
+    Drains the trigger event queue with workers Process_Managers running in their own threads, as the application does,
+    and reports the drain rate and the latency of the batches written to student_knowledge.
+    """
+    from app.domain.services.knowledge_engine import get_knowledge_engine
+    from app.infrastructure.event_processor.process_manager import Process_Manager
+
+    if replay_events:
+        replay()
+    queued = _execute("SELECT count(*) FROM trigger_event WHERE processed_at IS NULL")
+    knowledge_rows = _execute(f"SELECT count(*) FROM {StudentKnowledge.__tablename__}")
+
+    process_managers = [
+        Process_Manager(
+            max_batch_size=batch_size,
+            mode=mode,
+            worker_index=index,
+            partitions=partitions,
+            engine=get_knowledge_engine(strategy)
+            )
+        for index in range(workers)
+    ]
+    deadline = time.monotonic() + timeout
+
+    async def drain_until_empty(process_manager: Process_Manager):
+        while time.monotonic() < deadline and await process_manager.event_repo.queue_check():
+            before = process_manager.events_processed
+            if mode == "per_group":
+                await process_manager.run(await process_manager.event_repo.get_queue(max_batch_size=batch_size))
+            else:
+                await process_manager.drain()
+            if process_manager.events_processed == before:
+                # the remaining partitions are leased by other workers
+                await asyncio.sleep(0.05)
+
+    def work(process_manager: Process_Manager):
+        try:
+            asyncio.run(drain_until_empty(process_manager))
+        finally:
+            process_manager.event_repo.db.close()
+
+    threads = [Thread(target=work, args=(pm,), name=f"bench-worker-{pm.worker_index}") for pm in process_managers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    processed = queued - _execute("SELECT count(*) FROM trigger_event WHERE processed_at IS NULL")
+    latencies = sorted(seconds for pm in process_managers for _, seconds in pm.batch_latencies)
+    batch_events = sum(events for pm in process_managers for events, _ in pm.batch_latencies)
+
+    return {
+        "mode": mode if mode != "engine" else f"engine ({strategy})",
+        "workers": workers,
+        "batch_size": batch_size,
+        "queued_events": queued,
+        "processed_events": processed,
+        "seconds": round(elapsed, 3),
+        "events_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+        "batches": len(latencies),
+        "batch_ms_p50": round(_percentile(latencies, 0.50) * 1000, 2),
+        "batch_ms_p95": round(_percentile(latencies, 0.95) * 1000, 2),
+        "batch_ms_p99": round(_percentile(latencies, 0.99) * 1000, 2),
+        "batch_ms_max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "us_per_event": round(sum(latencies) / batch_events * 1e6, 2) if batch_events else 0.0,
+        "student_knowledge_rows": f"{knowledge_rows} -> {_execute(f'SELECT count(*) FROM {StudentKnowledge.__tablename__}')}",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic data generator and trigger event pipeline benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="COPY a synthetic data set into the database")
+    defaults = SyntheticVolumes()
+    for field, value in vars(defaults).items():
+        generate_parser.add_argument(f"--{field.replace('_', '-')}", dest=field, type=int, default=value)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per COPY, events are committed per chunk")
+
+    bench_parser = commands.add_parser("bench", help="Drain the trigger event queue and report throughput and write latency")
+    bench_parser.add_argument("--mode", choices=("reduce", "engine", "per_group"), default=_SETTINGS.TRIGGER_EVENT_PROCESS_MODE)
+    bench_parser.add_argument("--strategy", default=_SETTINGS.KNOWLEDGE_UPDATE_STRATEGY, help="Knowledge update strategy of --mode engine")
+    bench_parser.add_argument("--workers", type=int, default=_SETTINGS.TRIGGER_EVENT_WORKERS)
+    bench_parser.add_argument("--batch-size", type=int, default=_SETTINGS.TRIGGER_EVENT_BATCH_SIZE)
+    bench_parser.add_argument("--partitions", type=int, default=_SETTINGS.TRIGGER_EVENT_PARTITIONS)
+    bench_parser.add_argument("--replay", action="store_true", help="Mark the synthetic events unprocessed and drop their knowledge rows first")
+    bench_parser.add_argument("--timeout", type=float, default=3600.0)
+    bench_parser.add_argument("--verbose", action="store_true", help="Log every batch")
+
+    commands.add_parser("clean", help="Delete the synthetic data set")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "generate":
+        volumes = SyntheticVolumes(**{field: getattr(args, field) for field in vars(defaults)})
+        if volumes.courses < 1 or volumes.concepts < volumes.courses:
+            parser.error("every course needs at least one concept, use --concepts >= --courses >= 1")
+        SyntheticDataGenerator(volumes, seed=args.seed, chunk_size=args.chunk_size).run()
+
+    elif args.command == "bench":
+        if not args.verbose:
+            logging.getLogger("app.infrastructure.event_processor.process_manager").setLevel(logging.WARNING)
+        if args.mode == "per_group" and args.workers > 1:
+            parser.error("--mode per_group does not claim rows, run it with --workers 1")
+        results = bench(args.mode, args.workers, args.batch_size, args.partitions, args.strategy, args.replay, args.timeout)
+        for key, value in results.items():
+            print(f"{key:>24}: {value}")
+
+    else:
+        clean()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import asyncio
+import glob
+import logging
+import os
+import time
+from typing import List, Optional
+
+from app.app.errors.buffer_full_error import BufferFullError
+from app.config.environment import get_settings
+from app.domain.models.trigger_event import TriggerEventCreate
+from ..database.db import get_async_db
+from ..database.repositories.trigger_event import TriggerEventRepository
+from .process_manager import notify_trigger_events
+
+logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+
+class TriggerEventBuffer:
+    """
+    Write-behind buffer for trigger events submitted on the request path.
+
+    Submissions are queued in memory and a background task writes them with one bulk insert once flush_size events
+    are waiting or flush_interval seconds have passed. When the buffer is full submit waits up to put_timeout seconds
+    for room and then raises BufferFullError.
+
+    A batch that fails to write max_retries times in a row, and on shutdown everything that can't be written, is spilled
+    to an NDJSON file of this process in spill_dir. Point spill_dir at a persistent volume. On start a process claims
+    the spill files found there, including those of other processes, and re-queues their events.
+    """
+    def __init__(
+            self,
+            max_size: int = _SETTINGS.TRIGGER_EVENT_BUFFER_SIZE,
+            flush_size: int = _SETTINGS.TRIGGER_EVENT_BUFFER_FLUSH_SIZE,
+            flush_interval: float = _SETTINGS.TRIGGER_EVENT_BUFFER_FLUSH_INTERVAL,
+            put_timeout: float = _SETTINGS.TRIGGER_EVENT_BUFFER_PUT_TIMEOUT,
+            spill_dir: str = _SETTINGS.TRIGGER_EVENT_BUFFER_SPILL_DIR,
+            max_retries: int = _SETTINGS.TRIGGER_EVENT_BUFFER_MAX_RETRIES,
+    ):
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.spill_dir = spill_dir
+        self.max_retries = max(max_retries, 1)
+        self.events_flushed = 0
+        self.events_rejected = 0
+        self.events_spilled = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        spilled = self._load_spilled()
+        self._queue = asyncio.Queue(maxsize=max(self.max_size, len(spilled)))
+        self._stopping = False
+        for event in spilled:
+            self._queue.put_nowait(event)
+        self._flusher = asyncio.create_task(self._run(), name="trigger-event-buffer")
+
+    async def stop(self):
+        """
+        Stops accepting events, flushes what is queued and waits for the background task to exit.
+        """
+        self._stopping = True
+        if self._flusher is not None:
+            await self._flusher
+            self._flusher = None
+
+    async def submit(self, event: TriggerEventCreate):
+        if self._queue is None or self._stopping:
+            raise BufferFullError(message="Trigger event buffer is not accepting events.")
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                self.events_rejected += 1
+                raise BufferFullError(message="Trigger event buffer is full, try again later.")
+
+    async def _collect(self) -> List[TriggerEventCreate]:
+        """
+        Waits until flush_size events are queued or flush_interval has passed since the first one arrived.
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.flush_size:
+            if self._stopping and self._queue.empty():
+                break
+
+            timeout = self.flush_interval if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if batch or self._stopping:
+                    break
+                continue
+
+            batch.append(event)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+
+        return batch
+
+    async def _run(self):
+        batch: List[TriggerEventCreate] = []
+        retry_delay = self.flush_interval
+        attempts = 0
+        while True:
+            if not batch:
+                batch = await self._collect()
+
+            if not batch:
+                if self._stopping:
+                    return
+                continue
+
+            try:
+                await self._flush(batch)
+                batch = []
+                retry_delay = self.flush_interval
+                attempts = 0
+
+            except Exception as e:
+                attempts += 1
+                logger.exception(f"Failed to write {len(batch)} trigger events (attempt {attempts}/{self.max_retries})")
+                if self._stopping:
+                    self._spill(batch + self._drain_queue())
+                    return
+                if attempts >= self.max_retries:
+                    # set the batch aside so one bad batch can't block ingestion, it is re-queued on the next start
+                    self._spill(batch)
+                    batch = []
+                    retry_delay = self.flush_interval
+                    attempts = 0
+                    continue
+                # keep the batch and retry, the queue filling up pushes back on submitters in the meantime
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+
+    async def _flush(self, batch: List[TriggerEventCreate]):
+        db = get_async_db()
+        try:
+            written = await TriggerEventRepository(db=db).bulk_insert(events=batch)
+        finally:
+            await db.close()
+
+        self.events_flushed += written
+        notify_trigger_events()
+
+    def _drain_queue(self) -> List[TriggerEventCreate]:
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    @property
+    def spill_path(self) -> str:
+        # one file per process, uvicorn workers sharing spill_dir don't interleave their writes
+        return os.path.join(self.spill_dir, f"trigger_event_buffer.{os.getpid()}.ndjson")
+
+    def _spill(self, events: List[TriggerEventCreate]):
+        if not events:
+            return
+        lines = [event.model_dump_json() + "\n" for event in events]
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, "a") as file:
+                file.writelines(lines)
+        except OSError:
+            # last resort, the events can still be recovered from the log
+            logger.exception(f"Failed to spill {len(events)} trigger events to {self.spill_path}, events:\n{''.join(lines)}")
+            return
+
+        self.events_spilled += len(events)
+        logger.error(f"Spilled {len(events)} unwritten trigger events to {self.spill_path}")
+
+    def _load_spilled(self) -> List[TriggerEventCreate]:
+        events = []
+        for path in glob.glob(os.path.join(self.spill_dir, "trigger_event_buffer.*.ndjson")):
+            # renaming claims the file, processes starting together don't both re-queue it
+            claimed = f"{path}.{os.getpid()}.claimed"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+
+            with open(claimed) as file:
+                spilled = [TriggerEventCreate.model_validate_json(line) for line in file if line.strip()]
+            os.remove(claimed)
+
+            logger.info(f"Re-queued {len(spilled)} spilled trigger events from {path}")
+            events.extend(spilled)
+        return events
+
+
+_trigger_event_buffer = TriggerEventBuffer()
+
+
+def get_trigger_event_buffer() -> TriggerEventBuffer:
+    """
+    Returns the process-wide trigger event buffer, usable as a FastAPI dependency.
+    """
+    return _trigger_event_buffer
+
+
+async def start_trigger_event_buffer():
+    await _trigger_event_buffer.start()
+
+
+async def stop_trigger_event_buffer():
+    await _trigger_event_buffer.stop()
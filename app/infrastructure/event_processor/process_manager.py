@@ -3,24 +3,126 @@ from app.domain.models.client import StudentKnowledgeCreate
 from ..database.repositories.trigger_event import TriggerEventRepository
 from app.domain.protocols.repositories.trigger_event import TriggerEventRepository as TriggerEventRepoProtocol
 from ..database.repositories.client import StudentKnowledgeRepository
+from ..database.db import get_db, get_async_db
+from app.config.environment import get_settings
+from app.domain.services.knowledge_engine import KnowledgeEngine, get_knowledge_engine
 import time
 import logging 
 import asyncio
+from collections import deque
 from threading import Thread
+from typing import Any, Deque, Dict, List, Literal, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
+_SETTINGS = get_settings()
+
+_process_managers: List["Process_Manager"] = []
+_workers: List[Thread] = []
+
+async def migrate_trigger_event_table():
+    """
+    Converts a trigger_event table created before it was partitioned, before anything reads or writes trigger events.
+    A failure stops the startup, the workers and the ingestion buffer can't run against the old table.
+    """
+    db = get_async_db()
+    try:
+        repo = TriggerEventRepository(db=db)
+        await repo.migrate_table(days_ahead=_SETTINGS.TRIGGER_EVENT_PARTITION_DAYS_AHEAD)
+        await repo.create_dead_letter_table()
+    finally:
+        await db.close()
 
 def start_process_worker():
-    process_manger = Process_Manager(max_batch_size=100)
-    worker = Thread(target=process_manger.worker)
-    worker.start()
+    """
+    Starts TRIGGER_EVENT_WORKERS worker threads. Workers lease partitions in the database, so any number of them
+    can run across processes and nodes.
+    """
+    for index in range(_SETTINGS.TRIGGER_EVENT_WORKERS):
+        process_manager = Process_Manager(
+            max_batch_size=_SETTINGS.TRIGGER_EVENT_BATCH_SIZE, 
+            mode=_SETTINGS.TRIGGER_EVENT_PROCESS_MODE, 
+            worker_index=index
+            )
+        worker = Thread(target=process_manager.worker, name=f"trigger-event-worker-{index}")
+        _process_managers.append(process_manager)
+        _workers.append(worker)
+        worker.start()
+
+async def stop_process_worker(timeout: float = 30.0):
+    """
+    Asks the workers to stop once their current batch is applied and waits for the threads to exit.
+    """
+    for process_manager in _process_managers:
+        process_manager.stop()
+
+    for worker in _workers:
+        await asyncio.to_thread(worker.join, timeout)
+        if worker.is_alive():
+            logger.warning("%s did not stop within %ss", worker.name, timeout)
+
+    _process_managers.clear()
+    _workers.clear()
+
+def get_process_worker_stats() -> List[dict]:
+    """
+    Returns the stats of the trigger event workers of this process, see Process_Manager.stats.
+    """
+    return [process_manager.stats() for process_manager in _process_managers]
+
+def notify_trigger_events():
+    """
+    Wakes the workers of this process so newly queued trigger events are applied without waiting for the next poll.
+    Safe to call from any thread or event loop.
+    """
+    for process_manager in _process_managers:
+        process_manager.notify()
 
 class Process_Manager:
-    def __init__(self, max_batch_size: int = 250):
+    def __init__(
+            self, 
+            max_batch_size: int = 250, 
+            mode: Literal["reduce", "engine", "per_group"] = "reduce", 
+            worker_index: int = 0, 
+            partitions: int = _SETTINGS.TRIGGER_EVENT_PARTITIONS,
+            engine: Optional[KnowledgeEngine] = None,
+            latency_window: int = 10_000
+    ):
+        """
+        mode='reduce' folds each batch into student_knowledge with one set-based statement (TriggerEventRepository.reduce_queue),
+        weighted mean only. mode='engine' applies each batch with the KnowledgeEngine (KNOWLEDGE_UPDATE_STRATEGY by default)
+        through TriggerEventRepository.apply_queue. Both are safe to run as many workers.
+        mode='per_group' applies every (student_id, concept) group with its own reads and writes and does not claim rows,
+        only run it as a single worker.
+        The (events, seconds) of the last latency_window batches are kept in batch_latencies.
+        A batch failing TRIGGER_EVENT_MAX_BATCH_FAILURES times in a row is moved to trigger_event_dead_letter.
+        """
         self.max_batch_size = max_batch_size
-        self.event_repo: TriggerEventRepoProtocol = TriggerEventRepository()
-        self.s_k_repo = StudentKnowledgeRepository()
+        self.mode = mode
+        self.engine = engine or get_knowledge_engine()
+        self.worker_index = worker_index
+        self.partitions = max(partitions, 1)
+        self.events_processed = 0
+        self.processing_time = 0.0
+        self.batch_latencies: Deque[Tuple[int, float]] = deque(maxlen=latency_window)
+        self.min_interval = _SETTINGS.TRIGGER_EVENT_POLL_MIN_INTERVAL
+        self.max_interval = _SETTINGS.TRIGGER_EVENT_POLL_MAX_INTERVAL
+        self.wakeup_delay = _SETTINGS.TRIGGER_EVENT_WAKEUP_DELAY
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._maintained_at: Optional[float] = None
+        self.max_batch_failures = max(_SETTINGS.TRIGGER_EVENT_MAX_BATCH_FAILURES, 1)
+        # consecutive failures per partition, or per (student_id, concept) group in per_group mode
+        self.batch_failures: Dict[Any, int] = {}
+        self.dead_lettered = 0
+        self._failed = False
+        self.maintenance_failures = 0
+        self.maintenance_error: Optional[str] = None
+        self.maintenance_failed_at: Optional[float] = None
+        db = get_db()
+        self.event_repo: TriggerEventRepoProtocol = TriggerEventRepository(db=db)
+        self.s_k_repo = StudentKnowledgeRepository(db=db)
 
     def worker(self):
         loop = asyncio.new_event_loop()
@@ -28,29 +130,219 @@ class Process_Manager:
 
         loop.run_until_complete(self.start())
         loop.close()
+        self.s_k_repo.db.close()
+
+    def notify(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # worker loop already closed
+            pass
+
+    def stop(self):
+        self._stopping = True
+        self.notify()
+
+    async def wait_for_work(self, interval: float) -> bool:
+        """
+        Sleeps until notified or until interval seconds have passed, returns True when woken by a notification.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            return False
+
+        self._wakeup.clear()
+        if self.wakeup_delay and not self._stopping:
+            # lets a burst of submissions accumulate into one batch
+            await asyncio.sleep(self.wakeup_delay)
+        return True
 
     async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        interval = self.min_interval
         paused = True
-        while True:
+        while not self._stopping:
+            self._failed = False
+            await self.maintain()
             try:
                 queue_exists = await self.event_repo.queue_check()
             except Exception as e:
+                logger.exception("Failed to check the trigger event queue")
                 queue_exists = False
+                self._failed = True
 
             if queue_exists:
                 if paused:
                     logger.info("Processing trigger events")
                     paused = False
 
-                events = await self.event_repo.get_queue(max_batch_size=self.max_batch_size)
-                await self.run(events=events)
+                if self.mode in ("reduce", "engine"):
+                    await self.drain()
+                else:
+                    try:
+                        events = await self.event_repo.get_queue(max_batch_size=self.max_batch_size)
+                    except Exception as e:
+                        logger.exception("Failed to read the trigger event queue")
+                        self._failed = True
+                    else:
+                        await self.run(events=events)
+
+                if not self._failed:
+                    interval = self.min_interval
 
             else:
                 if not paused:
                     paused = True
                     logger.info("Queue empty process paused")
 
-            time.sleep(60)
+            # The worker owns its session, ending it returns the connection to the pool instead of idling in a
+            # transaction until the next poll. The session stays usable.
+            self.event_repo.db.close()
+
+            if self._stopping:
+                break
+
+            # Notifications from this process wake the worker immediately, events queued by other processes
+            # are picked up by the poll, which backs off while the queue stays empty.
+            woken = await self.wait_for_work(interval)
+            if self._failed:
+                # failing batches are retried with the same back off as an empty queue
+                interval = min(interval * 2, self.max_interval)
+            elif woken:
+                interval = self.min_interval
+            elif not queue_exists:
+                interval = min(interval * 2, self.max_interval)
+
+        logger.info("Trigger event worker stopped")
+
+    async def maintain(self):
+        """
+        Runs the daily partition maintenance of the trigger_event table every TRIGGER_EVENT_MAINTENANCE_INTERVAL seconds,
+        only from the first worker of each process.
+        """
+        if self.worker_index != 0:
+            return
+        if self._maintained_at is not None and time.monotonic() - self._maintained_at < _SETTINGS.TRIGGER_EVENT_MAINTENANCE_INTERVAL:
+            return
+
+        self._maintained_at = time.monotonic()
+        try:
+            result = await self.event_repo.maintain_partitions(
+                days_ahead=_SETTINGS.TRIGGER_EVENT_PARTITION_DAYS_AHEAD,
+                retention_days=_SETTINGS.TRIGGER_EVENT_RETENTION_DAYS,
+                archive_mode=_SETTINGS.TRIGGER_EVENT_ARCHIVE_MODE
+                )
+        except Exception as e:
+            # inserts fall into trigger_event_default once the daily partitions run out, stats() reports the failure
+            cause = e.__cause__ or e
+            self.maintenance_failures += 1
+            self.maintenance_error = f"{cause.__class__.__name__}: {cause}"
+            self.maintenance_failed_at = time.time()
+            logger.exception("Failed to maintain the trigger event partitions")
+            return
+
+        self.maintenance_error = None
+        if result.created or result.archived:
+            logger.info(f"Trigger event partitions created: {result.created}, archived ({_SETTINGS.TRIGGER_EVENT_ARCHIVE_MODE}): {result.archived}")
+
+    async def drain(self):
+        """
+        Visits every partition, starting at an offset per worker so workers spread out, and reduces each one until
+        a batch comes back smaller than max_batch_size.
+        """
+        for step in range(self.partitions):
+            if self._stopping:
+                return
+            await self.drain_partition((self.worker_index + step) % self.partitions)
+
+    async def drain_partition(self, partition: int):
+        """
+        Reduces batches of one partition back to back, logging throughput per batch.
+        """
+        while True:
+            start = time.perf_counter()
+            try:
+                if self.mode == "engine":
+                    result = await self.event_repo.apply_queue(
+                        update=self.engine.update,
+                        max_batch_size=self.max_batch_size, 
+                        partition=partition, 
+                        partitions=self.partitions
+                        )
+                else:
+                    result = await self.event_repo.reduce_queue(
+                        max_batch_size=self.max_batch_size, 
+                        partition=partition, 
+                        partitions=self.partitions
+                        )
+            except Exception as e:
+                logger.exception(f"Failed to apply a trigger event batch of partition {partition}")
+                await self.record_failure(key=partition, error=e, partition=partition)
+                return
+
+            self.batch_failures.pop(partition, None)
+            elapsed = time.perf_counter() - start
+            self.events_processed += result.events
+            self.processing_time += elapsed
+
+            if result.events:
+                self.batch_latencies.append((result.events, elapsed))
+                logger.info(
+                    f"Reduced {result.events} events of partition {partition} into {result.groups} knowledge scores in {elapsed:.3f}s "
+                    f"({result.events / elapsed:.0f} events/sec, {self.events_per_second():.0f} events/sec overall)"
+                    )
+
+            if result.events < self.max_batch_size or self._stopping:
+                return
+
+    async def record_failure(self, key: Any, error: Exception, partition: int = 0, event_ids: Optional[List[int]] = None):
+        """
+        Counts a failed attempt at a batch and backs the worker off. Once the batch failed max_batch_failures times in a row
+        its events (event_ids, or the partition's next batch) are moved to trigger_event_dead_letter so the queue keeps moving.
+        """
+        self._failed = True
+        failures = self.batch_failures.get(key, 0) + 1
+        self.batch_failures[key] = failures
+        if failures < self.max_batch_failures:
+            return
+
+        cause = error.__cause__ or error
+        try:
+            moved = await self.event_repo.dead_letter_batch(
+                error=f"{cause.__class__.__name__}: {cause}",
+                max_batch_size=self.max_batch_size,
+                partition=partition,
+                partitions=self.partitions,
+                event_ids=event_ids
+                )
+        except Exception as e:
+            logger.exception(f"Failed to move the failing trigger event batch {key} to the dead letter table")
+            return
+
+        self.batch_failures.pop(key, None)
+        self.dead_lettered += moved
+        logger.error(f"Moved {moved} trigger events of batch {key} to trigger_event_dead_letter after {failures} failed attempts")
+
+    def events_per_second(self) -> float:
+        return self.events_processed / self.processing_time if self.processing_time else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "worker_index": self.worker_index,
+            "mode": self.mode,
+            "events_processed": self.events_processed,
+            "events_per_second": self.events_per_second(),
+            "failing_batches": dict((str(key), failures) for key, failures in self.batch_failures.items()),
+            "dead_lettered": self.dead_lettered,
+            "maintenance_failures": self.maintenance_failures,
+            "maintenance_error": self.maintenance_error,
+            "maintenance_failed_at": self.maintenance_failed_at,
+        }
 
     async def run(self, events):
             if not events:
@@ -60,42 +352,41 @@ class Process_Manager:
                     input_count = len(event.event_ids)
                     try:
                         score = await self.s_k_repo.get(student_id=event.student_id, concept_name=event.concept)
-                        calculated_numerator = event.numerator + score.numerator
-                        calculated_denominator = event.denominator + score.denominator
-
-                        new_score = calculated_numerator / calculated_denominator
-
-                        await self.s_k_repo.update(
-                            StudentKnowledgeCreate(
-                                student_id=event.student_id, 
-                                concept_name=event.concept, 
-                                numerator=calculated_numerator,
-                                denominator=calculated_denominator,
-                                score=new_score,
-                                no_of_inputs=score.no_of_inputs + input_count
-                                ))
-                        await self.event_repo.bulk_delete(event_ids=event.event_ids)
 
-                    except Exception as e:
-                        try:
+                        if score is None:
+                            # First answers for this concept, the weighted mean starts from the prior 0.5 / 1
                             calculated_numerator = event.numerator + .5
                             calculated_denominator = event.denominator + 1
-                            new_score = calculated_numerator / calculated_denominator
-
                             await self.s_k_repo.add(
                                 StudentKnowledgeCreate(
                                     student_id=event.student_id, 
                                     concept_name=event.concept, 
                                     numerator=calculated_numerator,
                                     denominator=calculated_denominator,
-                                    score=new_score,
+                                    score=calculated_numerator / calculated_denominator,
                                     no_of_inputs=input_count
-                                    )
-                                    )
-                            await self.event_repo.bulk_delete(event_ids=event.event_ids)
+                                    ))
+                        else:
+                            calculated_numerator = event.numerator + score.numerator
+                            calculated_denominator = event.denominator + score.denominator
+                            await self.s_k_repo.update(
+                                StudentKnowledgeCreate(
+                                    student_id=event.student_id, 
+                                    concept_name=event.concept, 
+                                    numerator=calculated_numerator,
+                                    denominator=calculated_denominator,
+                                    score=calculated_numerator / calculated_denominator,
+                                    no_of_inputs=(score.no_of_inputs or 0) + input_count
+                                    ))
 
-                        except Exception as e:
-                            #Fails if student id doesn't exist in system
-                            logger.exception(msg=f"Either student with student_id: {event.student_id}, or concept with concept_name: {event.concept} does not exist.")
-                            continue
+                        await self.event_repo.mark_processed(event_ids=event.event_ids)
+                        self.batch_failures.pop((event.student_id, event.concept), None)
 
+                    except Exception as e:
+                        logger.exception(msg=f"Failed to apply events of student_id: {event.student_id}, concept_name: {event.concept}.")
+                        await self.record_failure(
+                            key=(event.student_id, event.concept), 
+                            error=e, 
+                            event_ids=[int(event_id) for event_id in event.event_ids]
+                            )
+                        continue
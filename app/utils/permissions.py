@@ -1,4 +1,7 @@
 from typing import Literal, List
+from fastapi import HTTPException, Request
+from fastapi_lti1p3 import enforce_auth
+from fastapi_lti1p3.errors import AuthValidationError, SessionExpiredError
 
 class PermissionsUtility:
     def __new__(
@@ -57,4 +60,13 @@ class StudentExclusive:
     """
     def __new__(cls) -> set:
         instance = PermissionsUtility(permissions=["student", "StudentEnrollment", "StudentViewEnrollment", "fake_student"])
-        return instance
\ No newline at end of file
+        return instance
+
+async def require_admin(request: Request):
+    """
+    Route dependency rejecting requests without an LTI session with an admin role, e.g. dependencies=[Depends(require_admin)]
+    """
+    try:
+        return await enforce_auth(request=request, accepted_roles=AdminExclusive())
+    except (AuthValidationError, SessionExpiredError) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
@@ -0,0 +1,21 @@
+import os
+
+# Settings are read from the environment when app modules are imported, the unit tests don't touch any service.
+for name in (
+    "BASE_PATH",
+    "ENV",
+    "LOG_LEVEL",
+    "WEB_APP_DEBUG",
+    "WEB_APP_VERSION",
+    "WEB_APP_TITLE",
+    "WEB_APP_DESCRIPTION",
+    "DATABASE1_URL",
+    "SSO_REDIS_SESSION_PREFIX",
+    "OPENAI_API_KEY",
+    "TRITON_API_KEY",
+    "SECRET_HASH_KEY",
+    "SESSION_ID_STORAGE_KEY",
+    "REFRESH_TOKEN_STORAGE_KEY",
+    "TIMEZONE",
+):
+    os.environ.setdefault(name, "test")
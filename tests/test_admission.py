@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.LLM import admission
+from app.infrastructure.LLM.admission import TokenBucket
+
+
+class FakeClock:
+    """
+    Replaces time.monotonic and asyncio.sleep in the admission module, sleeping advances the clock instantly.
+    """
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(admission.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_zero_rate_disables_the_bucket(clock):
+    bucket = TokenBucket(rate_per_minute=0)
+
+    asyncio.run(bucket.acquire(1_000_000))
+
+    assert clock.sleeps == []
+
+
+def test_starts_full(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+
+    asyncio.run(bucket.acquire(60))
+
+    assert clock.sleeps == []
+    assert bucket.level == 0
+
+
+def test_waits_for_the_missing_units(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    asyncio.run(bucket.acquire(60))
+
+    asyncio.run(bucket.acquire(3))
+
+    # 60 per minute refills one unit per second
+    assert sum(clock.sleeps) == pytest.approx(3.0)
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_refills_with_elapsed_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_minute=120)
+    asyncio.run(bucket.acquire(120))
+
+    clock.now += 10
+    asyncio.run(bucket.acquire(0))
+    assert bucket.level == pytest.approx(20.0)
+
+    clock.now += 3600
+    asyncio.run(bucket.acquire(0))
+    assert bucket.level == pytest.approx(120.0)
+
+
+def test_requests_bigger_than_the_bucket_wait_for_a_full_bucket(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    asyncio.run(bucket.acquire(30))
+
+    asyncio.run(bucket.acquire(500))
+
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_concurrent_acquires_are_served_in_turn(clock):
+    bucket = TokenBucket(rate_per_minute=60)
+    asyncio.run(bucket.acquire(60))
+
+    async def acquire_all():
+        await asyncio.gather(*(bucket.acquire(2) for _ in range(5)))
+
+    asyncio.run(acquire_all())
+
+    assert sum(clock.sleeps) == pytest.approx(10.0)
+    assert bucket.level == pytest.approx(0.0)
@@ -0,0 +1,163 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.domain.services.knowledge_engine import (
+    BKTStrategy,
+    EloStrategy,
+    KnowledgeEngine,
+    KnowledgeState,
+    KnowledgeUpdateStrategy,
+    STRATEGIES,
+    WeightedMeanStrategy,
+    get_knowledge_engine,
+)
+
+
+def event(event_id, value, weight=1.0, student_id=1, concept="Fractions"):
+    return {"event_id": event_id, "student_id": student_id, "concept": concept, "value": value, "weight": weight}
+
+
+def row(numerator, denominator, score, no_of_inputs, student_id=1, concept_name="Fractions"):
+    return {
+        "student_id": student_id,
+        "concept_name": concept_name,
+        "numerator": numerator,
+        "denominator": denominator,
+        "score": score,
+        "no_of_inputs": no_of_inputs,
+    }
+
+
+def by_pair(rows):
+    return {(val["student_id"], val["concept_name"]): val for val in rows}
+
+
+def test_no_events_returns_no_rows():
+    assert KnowledgeEngine(strategy=WeightedMeanStrategy()).update(events=[], knowledge=[row(1, 2, 0.5, 1)]) == []
+
+
+def test_weighted_mean_starts_new_pairs_from_the_prior():
+    result = KnowledgeEngine(strategy=WeightedMeanStrategy()).update(
+        events=[event(1, 1.0), event(2, 0.0, weight=2.0)],
+        knowledge=[]
+    )
+
+    assert result == [row(1.5, 4.0, 0.375, 2)]
+
+
+def test_weighted_mean_continues_from_the_stored_row():
+    result = KnowledgeEngine(strategy=WeightedMeanStrategy()).update(
+        events=[event(1, 1.0)],
+        knowledge=[row(3.0, 4.0, 0.75, 3), row(0.0, 1.0, 0.0, 1, student_id=2)]
+    )
+
+    assert result == [row(4.0, 5.0, 0.8, 4)]
+
+
+def test_every_pair_in_the_batch_gets_a_row():
+    result = by_pair(KnowledgeEngine(strategy=WeightedMeanStrategy()).update(
+        events=[event(1, 1.0), event(2, 0.0, student_id=2), event(3, 1.0, concept="Decimals")],
+        knowledge=[]
+    ))
+
+    assert set(result) == {(1, "Fractions"), (2, "Fractions"), (1, "Decimals")}
+    assert result[(2, "Fractions")]["score"] == pytest.approx(0.25)
+    assert all(val["no_of_inputs"] == 1 for val in result.values())
+
+
+def test_weighted_mean_one_pass_matches_the_round_by_round_fold():
+    rng = np.random.default_rng(7)
+    pairs = rng.integers(0, 5, size=200)
+    values = rng.random(200)
+    weights = rng.random(200) + 0.1
+    order = np.arange(200)
+
+    def state():
+        return KnowledgeState(
+            numerator=np.full(5, 0.5),
+            denominator=np.ones(5),
+            score=np.full(5, 0.5),
+            no_of_inputs=np.zeros(5, dtype=np.int64)
+        )
+
+    strategy = WeightedMeanStrategy()
+    one_pass, rounds = state(), state()
+    strategy.apply(one_pass, pairs, values, weights, order)
+    KnowledgeUpdateStrategy.apply(strategy, rounds, pairs, values, weights, order)
+
+    np.testing.assert_allclose(one_pass.numerator, rounds.numerator)
+    np.testing.assert_allclose(one_pass.denominator, rounds.denominator)
+    np.testing.assert_allclose(one_pass.score, rounds.score)
+    np.testing.assert_array_equal(one_pass.no_of_inputs, rounds.no_of_inputs)
+
+
+def test_elo_first_correct_answer():
+    result = KnowledgeEngine(strategy=EloStrategy()).update(events=[event(1, 1.0)], knowledge=[])
+
+    # logit(0.5) + k * weight * (1 - 0.5) with k = 1 / (1 + decay * 0)
+    assert result[0]["score"] == pytest.approx(1 / (1 + math.exp(-0.5)))
+    assert result[0]["numerator"] == pytest.approx(1.5)
+    assert result[0]["no_of_inputs"] == 1
+
+
+@pytest.mark.parametrize("strategy", [EloStrategy, BKTStrategy])
+def test_order_dependent_strategies_follow_event_ids(strategy):
+    events = [event(event_id, value) for event_id, value in enumerate([1.0, 1.0, 0.0, 1.0, 0.0, 0.0, 1.0])]
+    shuffled = events[:]
+    random.Random(3).shuffle(shuffled)
+
+    engine = KnowledgeEngine(strategy=strategy())
+    assert engine.update(events=shuffled, knowledge=[]) == engine.update(events=events, knowledge=[])
+
+    reordered = [dict(val, event_id=len(events) - val["event_id"]) for val in events]
+    assert engine.update(events=reordered, knowledge=[])[0]["score"] != pytest.approx(
+        engine.update(events=events, knowledge=[])[0]["score"])
+
+
+@pytest.mark.parametrize("strategy", [EloStrategy, BKTStrategy])
+def test_answers_move_the_score_in_their_direction(strategy):
+    engine = KnowledgeEngine(strategy=strategy())
+    stored = [row(2.0, 4.0, 0.5, 3)]
+
+    correct = engine.update(events=[event(1, 1.0)], knowledge=stored)[0]["score"]
+    incorrect = engine.update(events=[event(1, 0.0)], knowledge=stored)[0]["score"]
+
+    assert incorrect < 0.5 < correct
+
+
+def test_bkt_zero_weight_only_applies_the_chance_of_learning():
+    result = KnowledgeEngine(strategy=BKTStrategy(p_transit=0.1)).update(events=[event(1, 0.0, weight=0.0)], knowledge=[])
+
+    assert result[0]["score"] == pytest.approx(0.5 + 0.5 * 0.1)
+
+
+def test_bkt_correct_answer_posterior():
+    p, slip, guess, transit = 0.5, 0.1, 0.2, 0.1
+    posterior = p * (1 - slip) / (p * (1 - slip) + (1 - p) * guess)
+
+    result = KnowledgeEngine(strategy=BKTStrategy(p_transit=transit, p_slip=slip, p_guess=guess)).update(
+        events=[event(1, 1.0)],
+        knowledge=[]
+    )
+
+    assert result[0]["score"] == pytest.approx(posterior + (1 - posterior) * transit)
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_scores_stay_in_range(name):
+    events = [event(event_id, value, weight=5.0) for event_id, value in enumerate([1.0] * 50 + [0.0] * 50)]
+
+    scores = [val["score"] for val in get_knowledge_engine(strategy=name).update(events=events, knowledge=[])]
+
+    assert all(0.0 <= score <= 1.0 for score in scores)
+
+
+def test_get_knowledge_engine_selects_the_strategy_by_name():
+    assert {name: type(get_knowledge_engine(strategy=name).strategy) for name in STRATEGIES} == {
+        "weighted_mean": WeightedMeanStrategy,
+        "elo": EloStrategy,
+        "bkt": BKTStrategy,
+    }
@@ -0,0 +1,17 @@
+import axios from 'axios';
+
+const JOBS_URL = 'http://localhost:8080/qas/jobs';
+
+/**
+ * Polls an LLM job returned by the qas routes until it finishes and resolves with its result,
+ * which has the shape the route used to answer with directly. Failed jobs reject like a failed request.
+ */
+export async function awaitJobResult(job, interval = 1000) {
+  for (;;) {
+    const response = await axios.get(`${JOBS_URL}/${job.id}/result`);
+    if (response.status !== 202) {
+      return response.data.result;
+    }
+    await new Promise(resolve => setTimeout(resolve, interval));
+  }
+}